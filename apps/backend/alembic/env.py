@@ -12,6 +12,7 @@ from app.core.database import Base
 from app.models.resume import Resume
 from app.models.candidate import Candidate
 from app.models import interview  # 👈 import your new interview models
+from app.models import job, llm_cache, cohort, rate_limit, idempotency
 
 # ✅ Alembic target metadata
 target_metadata = Base.metadata
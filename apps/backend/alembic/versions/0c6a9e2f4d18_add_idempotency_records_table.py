@@ -0,0 +1,42 @@
+"""add idempotency_records table
+
+Revision ID: 0c6a9e2f4d18
+Revises: 5f1b8d3c7a92
+Create Date: 2026-10-20 09:47:05.118392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c6a9e2f4d18'
+down_revision: Union[str, Sequence[str], None] = '5f1b8d3c7a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'idempotency_records',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('scope', sa.String(length=100), nullable=False),
+        sa.Column('value', sa.Text(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_idempotency_records_expires_at'), 'idempotency_records', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_idempotency_records_created_at'), 'idempotency_records', ['created_at'], unique=False)
+    # short-lived replay records previously shared the LLM cache table
+    op.execute("DELETE FROM llm_cache_entries WHERE template_id LIKE 'idempotency:%'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_idempotency_records_created_at'), table_name='idempotency_records')
+    op.drop_index(op.f('ix_idempotency_records_expires_at'), table_name='idempotency_records')
+    op.drop_table('idempotency_records')
@@ -0,0 +1,34 @@
+"""add scoring_mode to interview_sessions
+
+Revision ID: 2d9e6b4a8f10
+Revises: 8c3f5a1e6d27
+Create Date: 2026-10-19 18:41:37.205144
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9e6b4a8f10'
+down_revision: Union[str, Sequence[str], None] = '8c3f5a1e6d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_sessions', sa.Column('scoring_mode', sa.String(length=10), nullable=False, server_default='live'))
+    op.add_column('interview_sessions', sa.Column('batch_scoring_status', sa.String(length=20), nullable=True))
+    op.add_column('interview_sessions', sa.Column('scoring_callback_url', sa.String(length=500), nullable=True))
+    op.create_index(op.f('ix_interview_sessions_batch_scoring_status'), 'interview_sessions', ['batch_scoring_status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_interview_sessions_batch_scoring_status'), table_name='interview_sessions')
+    op.drop_column('interview_sessions', 'scoring_callback_url')
+    op.drop_column('interview_sessions', 'batch_scoring_status')
+    op.drop_column('interview_sessions', 'scoring_mode')
@@ -0,0 +1,34 @@
+"""add rolling summary columns to interview_sessions
+
+Revision ID: 3f8e2a6c4b71
+Revises: 7a3c1e5b9d20
+Create Date: 2026-10-19 10:48:03.270415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8e2a6c4b71'
+down_revision: Union[str, Sequence[str], None] = '7a3c1e5b9d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_sessions', sa.Column('rolling_summary', sa.Text(), nullable=True))
+    op.add_column('interview_sessions', sa.Column('summary_message_id', sa.Integer(), nullable=True))
+    op.add_column('interview_sessions', sa.Column('answers_scored', sa.Integer(), nullable=True, server_default='0'))
+    op.add_column('interview_sessions', sa.Column('answer_score_total', sa.Integer(), nullable=True, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interview_sessions', 'answer_score_total')
+    op.drop_column('interview_sessions', 'answers_scored')
+    op.drop_column('interview_sessions', 'summary_message_id')
+    op.drop_column('interview_sessions', 'rolling_summary')
@@ -0,0 +1,34 @@
+"""add llm_rate_buckets table
+
+Revision ID: 4e7a2c9d1b63
+Revises: 9b4c1d7e3f58
+Create Date: 2026-10-19 17:22:41.308517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e7a2c9d1b63'
+down_revision: Union[str, Sequence[str], None] = '9b4c1d7e3f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'llm_rate_buckets',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('tokens', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('llm_rate_buckets')
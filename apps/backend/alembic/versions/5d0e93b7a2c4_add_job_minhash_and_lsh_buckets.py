@@ -0,0 +1,45 @@
+"""add job minhash signature, canonical job and lsh buckets
+
+Revision ID: 5d0e93b7a2c4
+Revises: c2b7f49e8a16
+Create Date: 2026-10-19 14:02:51.307114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0e93b7a2c4'
+down_revision: Union[str, Sequence[str], None] = 'c2b7f49e8a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_postings', sa.Column('minhash', sa.Text(), nullable=True))
+    op.add_column('job_postings', sa.Column('canonical_job_id', sa.Integer(), sa.ForeignKey('job_postings.id'), nullable=True))
+    op.create_index(op.f('ix_job_postings_canonical_job_id'), 'job_postings', ['canonical_job_id'], unique=False)
+
+    op.create_table(
+        'job_lsh_buckets',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('band', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.String(length=16), nullable=False),
+        sa.Column('job_id', sa.Integer(), sa.ForeignKey('job_postings.id'), nullable=False),
+    )
+    op.create_index('ix_job_lsh_buckets_band_bucket', 'job_lsh_buckets', ['band', 'bucket'], unique=False)
+    op.create_index(op.f('ix_job_lsh_buckets_job_id'), 'job_lsh_buckets', ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_lsh_buckets_job_id'), table_name='job_lsh_buckets')
+    op.drop_index('ix_job_lsh_buckets_band_bucket', table_name='job_lsh_buckets')
+    op.drop_table('job_lsh_buckets')
+    op.drop_index(op.f('ix_job_postings_canonical_job_id'), table_name='job_postings')
+    op.drop_column('job_postings', 'canonical_job_id')
+    op.drop_column('job_postings', 'minhash')
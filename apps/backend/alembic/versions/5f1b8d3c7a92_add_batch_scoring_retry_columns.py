@@ -0,0 +1,30 @@
+"""add batch scoring retry columns to interview_sessions
+
+Revision ID: 5f1b8d3c7a92
+Revises: 2d9e6b4a8f10
+Create Date: 2026-10-20 09:12:48.301557
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f1b8d3c7a92'
+down_revision: Union[str, Sequence[str], None] = '2d9e6b4a8f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_sessions', sa.Column('batch_scoring_attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('interview_sessions', sa.Column('batch_scoring_due_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interview_sessions', 'batch_scoring_due_at')
+    op.drop_column('interview_sessions', 'batch_scoring_attempts')
@@ -0,0 +1,28 @@
+"""add resume_digest to interview_sessions
+
+Revision ID: 7a3c1e5b9d20
+Revises: d94398cff796
+Create Date: 2026-10-19 10:02:17.553091
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3c1e5b9d20'
+down_revision: Union[str, Sequence[str], None] = 'd94398cff796'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_sessions', sa.Column('resume_digest', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interview_sessions', 'resume_digest')
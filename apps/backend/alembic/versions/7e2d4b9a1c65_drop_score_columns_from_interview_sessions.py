@@ -0,0 +1,35 @@
+"""drop answers_scored and answer_score_total from interview_sessions
+
+Revision ID: 7e2d4b9a1c65
+Revises: 0c6a9e2f4d18
+Create Date: 2026-10-20 10:21:33.640917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2d4b9a1c65'
+down_revision: Union[str, Sequence[str], None] = '0c6a9e2f4d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # superseded by interview_session_analytics.simple_count / simple_score_total
+    op.drop_column('interview_sessions', 'answer_score_total')
+    op.drop_column('interview_sessions', 'answers_scored')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('interview_sessions', sa.Column('answers_scored', sa.Integer(), nullable=True, server_default='0'))
+    op.add_column('interview_sessions', sa.Column('answer_score_total', sa.Integer(), nullable=True, server_default='0'))
+    op.execute(
+        "UPDATE interview_sessions SET answers_scored = a.simple_count, answer_score_total = a.simple_score_total "
+        "FROM interview_session_analytics a WHERE a.session_id = interview_sessions.id"
+    )
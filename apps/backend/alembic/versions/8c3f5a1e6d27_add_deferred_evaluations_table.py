@@ -0,0 +1,44 @@
+"""add deferred_evaluations table
+
+Revision ID: 8c3f5a1e6d27
+Revises: 4e7a2c9d1b63
+Create Date: 2026-10-19 18:05:12.774906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f5a1e6d27'
+down_revision: Union[str, Sequence[str], None] = '4e7a2c9d1b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'deferred_evaluations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('question', sa.Text(), nullable=True),
+        sa.Column('answer', sa.Text(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['interview_sessions.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_deferred_evaluations_id'), 'deferred_evaluations', ['id'], unique=False)
+    op.create_index(op.f('ix_deferred_evaluations_session_id'), 'deferred_evaluations', ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_deferred_evaluations_session_id'), table_name='deferred_evaluations')
+    op.drop_index(op.f('ix_deferred_evaluations_id'), table_name='deferred_evaluations')
+    op.drop_table('deferred_evaluations')
@@ -0,0 +1,30 @@
+"""add resume_hash to job_matches
+
+Revision ID: 9b4c1d7e3f58
+Revises: 5d0e93b7a2c4
+Create Date: 2026-10-19 14:47:09.512633
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4c1d7e3f58'
+down_revision: Union[str, Sequence[str], None] = '5d0e93b7a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_matches', sa.Column('resume_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_job_matches_resume_hash_job_id', 'job_matches', ['resume_hash', 'job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_matches_resume_hash_job_id', table_name='job_matches')
+    op.drop_column('job_matches', 'resume_hash')
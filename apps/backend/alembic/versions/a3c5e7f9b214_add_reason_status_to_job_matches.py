@@ -0,0 +1,28 @@
+"""add reason_status to job_matches
+
+Revision ID: a3c5e7f9b214
+Revises: 7e2d4b9a1c65
+Create Date: 2026-10-20 10:48:12.905214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e7f9b214'
+down_revision: Union[str, Sequence[str], None] = '7e2d4b9a1c65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_matches', sa.Column('reason_status', sa.String(length=10), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_matches', 'reason_status')
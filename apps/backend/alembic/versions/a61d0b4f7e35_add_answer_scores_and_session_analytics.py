@@ -0,0 +1,64 @@
+"""add interview_answer_scores and interview_session_analytics tables
+
+Revision ID: a61d0b4f7e35
+Revises: 3f8e2a6c4b71
+Create Date: 2026-10-19 11:30:52.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a61d0b4f7e35'
+down_revision: Union[str, Sequence[str], None] = '3f8e2a6c4b71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'interview_answer_scores',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('session_id', sa.Integer, sa.ForeignKey('interview_sessions.id'), nullable=False),
+        sa.Column('message_id', sa.Integer, sa.ForeignKey('interview_messages.id'), nullable=True),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('question', sa.Text(), nullable=True),
+        sa.Column('sub_score', sa.Integer(), nullable=True),
+        sa.Column('clarity', sa.Integer(), nullable=True),
+        sa.Column('coherence', sa.Integer(), nullable=True),
+        sa.Column('confidence', sa.Integer(), nullable=True),
+        sa.Column('technical_depth', sa.Integer(), nullable=True),
+        sa.Column('engagement', sa.Integer(), nullable=True),
+        sa.Column('average_score', sa.Float(), nullable=True),
+        sa.Column('feedback', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP')),
+    )
+    op.create_index(op.f('ix_interview_answer_scores_id'), 'interview_answer_scores', ['id'], unique=False)
+    op.create_index('ix_interview_answer_scores_session_id_id', 'interview_answer_scores', ['session_id', 'id'], unique=False)
+
+    op.create_table(
+        'interview_session_analytics',
+        sa.Column('session_id', sa.Integer, sa.ForeignKey('interview_sessions.id'), primary_key=True),
+        sa.Column('detailed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('clarity_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('coherence_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('confidence_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('technical_depth_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('engagement_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('simple_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('simple_score_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('trend', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP')),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('interview_session_analytics')
+    op.drop_index('ix_interview_answer_scores_session_id_id', table_name='interview_answer_scores')
+    op.drop_index(op.f('ix_interview_answer_scores_id'), table_name='interview_answer_scores')
+    op.drop_table('interview_answer_scores')
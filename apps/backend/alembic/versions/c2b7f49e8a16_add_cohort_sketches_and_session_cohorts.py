@@ -0,0 +1,45 @@
+"""add cohort_sketches table and session cohort columns
+
+Revision ID: c2b7f49e8a16
+Revises: a61d0b4f7e35
+Create Date: 2026-10-19 12:14:36.481920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2b7f49e8a16'
+down_revision: Union[str, Sequence[str], None] = 'a61d0b4f7e35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interview_sessions', sa.Column('job_id', sa.Integer(), sa.ForeignKey('job_postings.id'), nullable=True))
+    op.add_column('interview_sessions', sa.Column('domain', sa.String(length=100), nullable=True))
+
+    op.create_table(
+        'cohort_sketches',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('cohort_type', sa.String(length=20), nullable=False),
+        sa.Column('cohort_key', sa.String(length=200), nullable=False),
+        sa.Column('metric', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sketch', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.UniqueConstraint('cohort_type', 'cohort_key', 'metric', name='uq_cohort_sketches_cohort_metric'),
+    )
+    op.create_index(op.f('ix_cohort_sketches_id'), 'cohort_sketches', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cohort_sketches_id'), table_name='cohort_sketches')
+    op.drop_table('cohort_sketches')
+    op.drop_column('interview_sessions', 'domain')
+    op.drop_column('interview_sessions', 'job_id')
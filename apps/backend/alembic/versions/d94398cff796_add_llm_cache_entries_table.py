@@ -0,0 +1,41 @@
+"""add llm_cache_entries table
+
+Revision ID: d94398cff796
+Revises: b5ef7edaf2b3
+Create Date: 2026-10-19 09:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd94398cff796'
+down_revision: Union[str, Sequence[str], None] = 'b5ef7edaf2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'llm_cache_entries',
+        sa.Column('key', sa.String(length=64), primary_key=True),
+        sa.Column('template_id', sa.String(length=100), nullable=False),
+        sa.Column('value', sa.Text(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP')),
+    )
+    op.create_index(op.f('ix_llm_cache_entries_template_id'), 'llm_cache_entries', ['template_id'], unique=False)
+    op.create_index(op.f('ix_llm_cache_entries_expires_at'), 'llm_cache_entries', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_llm_cache_entries_created_at'), 'llm_cache_entries', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_llm_cache_entries_created_at'), table_name='llm_cache_entries')
+    op.drop_index(op.f('ix_llm_cache_entries_expires_at'), table_name='llm_cache_entries')
+    op.drop_index(op.f('ix_llm_cache_entries_template_id'), table_name='llm_cache_entries')
+    op.drop_table('llm_cache_entries')
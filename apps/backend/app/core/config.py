@@ -12,9 +12,110 @@ if "GOOGLE_API_KEY" not in os.environ and os.getenv("GEMINI_API_KEY"):
 class Settings:
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
+
+    # LLM provider: "gemini" | "fake" (local deterministic stand-in for load tests)
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini")
+    LLM_FAKE_LATENCY: str = os.getenv("LLM_FAKE_LATENCY", "lognormal:800,0.4")
+    LLM_FAKE_ERROR_RATE: float = float(os.getenv("LLM_FAKE_ERROR_RATE", "0.0"))
+    LLM_FAKE_SEED: int = int(os.getenv("LLM_FAKE_SEED", "42"))
+
+    # LLM call cassette: "off" | "record" | "replay" (time scale 0 = replay without delays)
+    LLM_CASSETTE_MODE: str = os.getenv("LLM_CASSETTE_MODE", "off")
+    LLM_CASSETTE_PATH: str = os.getenv("LLM_CASSETTE_PATH", "llm_cassette.jsonl.gz")
+    LLM_CASSETTE_TIME_SCALE: float = float(os.getenv("LLM_CASSETTE_TIME_SCALE", "1.0"))
+
+    # LLM admission control: requests/tokens per minute (0 = unlimited), queue bounds,
+    # "memory" (per worker) or "sql" (buckets shared by all workers)
+    LLM_RPM: int = int(os.getenv("LLM_RPM", "0"))
+    LLM_TPM: int = int(os.getenv("LLM_TPM", "0"))
+    LLM_RATE_LIMIT_BACKEND: str = os.getenv("LLM_RATE_LIMIT_BACKEND", "memory")
+    LLM_QUEUE_MAX: int = int(os.getenv("LLM_QUEUE_MAX", "100"))
+    LLM_QUEUE_MAX_WAIT_SECONDS: float = float(os.getenv("LLM_QUEUE_MAX_WAIT_SECONDS", "10"))
+    LLM_BATCH_MAX_WAIT_SECONDS: float = float(os.getenv("LLM_BATCH_MAX_WAIT_SECONDS", "120"))
+    LLM_EST_OUTPUT_TOKENS: int = int(os.getenv("LLM_EST_OUTPUT_TOKENS", "400"))
+
+    # LLM circuit breaker: opens when >= FAILURE_RATE of the last WINDOW calls failed or
+    # were slower than SLOW_SECONDS; fails fast for OPEN_SECONDS, then probes
+    LLM_BREAKER_ENABLED: bool = os.getenv("LLM_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+    LLM_BREAKER_WINDOW: int = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+    LLM_BREAKER_MIN_CALLS: int = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+    LLM_BREAKER_FAILURE_RATE: float = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+    LLM_BREAKER_SLOW_SECONDS: float = float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "20"))
+    LLM_BREAKER_OPEN_SECONDS: float = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+    DEFERRED_SCORING_MAX_ATTEMPTS: int = int(os.getenv("DEFERRED_SCORING_MAX_ATTEMPTS", "5"))
+
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 
-settings = Settings()
+    # Embedding model used for new versioned collections (see reembed_service)
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+    # Embeddings: "local" (model in each process) or "server" (shared process on a Unix
+    # socket, see app.services.embedding_server); 0 threads = torch default
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "local")
+    EMBEDDING_SOCKET: str = os.getenv("EMBEDDING_SOCKET", "/tmp/hr-embeddings.sock")
+    EMBEDDING_POOL_SIZE: int = int(os.getenv("EMBEDDING_POOL_SIZE", "4"))
+    EMBEDDING_BATCH_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+    EMBEDDING_MAX_BATCH: int = int(os.getenv("EMBEDDING_MAX_BATCH", "256"))
+    TORCH_NUM_THREADS: int = int(os.getenv("TORCH_NUM_THREADS", "0"))
+
+    # Interview chat sessions kept in memory per worker (LRU)
+    CHAT_SESSION_CACHE_SIZE: int = int(os.getenv("CHAT_SESSION_CACHE_SIZE", "500"))
+
+    # LLM result cache: "memory" | "sql" | "none"
+    LLM_CACHE_BACKEND: str = os.getenv("LLM_CACHE_BACKEND", "memory")
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+    # Semantic cache for answer scoring (reuses the evaluation of near-identical answers)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+    SEMANTIC_CACHE_THRESHOLD_EVALUATE: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD_EVALUATE", "0.95"))
+    SEMANTIC_CACHE_THRESHOLD_DETAILED: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD_DETAILED", "0.97"))
+    SEMANTIC_CACHE_TTL_EVALUATE: int = int(os.getenv("SEMANTIC_CACHE_TTL_EVALUATE", "604800"))
+    SEMANTIC_CACHE_TTL_DETAILED: int = int(os.getenv("SEMANTIC_CACHE_TTL_DETAILED", "604800"))
 
-print(f"🔑 Loaded GEMINI_API_KEY: {settings.GEMINI_API_KEY[:10]}...")
-print(f"🧠 Using model: {settings.GEMINI_MODEL}")
+    # Idempotency-Key replay store for interview endpoints: "memory" | "sql"
+    IDEMPOTENCY_BACKEND: str = os.getenv("IDEMPOTENCY_BACKEND", "memory")
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
+    # KLL sketch accuracy for cohort percentiles (higher = more accurate, larger rows)
+    SKETCH_K: int = int(os.getenv("SKETCH_K", "200"))
+
+    # Near-duplicate job detection (MinHash LSH): bands must divide num_perm
+    DEDUP_NUM_PERM: int = int(os.getenv("DEDUP_NUM_PERM", "64"))
+    DEDUP_BANDS: int = int(os.getenv("DEDUP_BANDS", "16"))
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+    # Logging: "json" | "text"; raw LLM payloads are logged for a sample of calls only
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_PAYLOAD_SAMPLE_RATE: float = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+    LOG_PAYLOAD_MAX_CHARS: int = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+
+    # Load the embedding model and Chroma in the background at startup (/readyz waits for it)
+    WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+    # Admin endpoints (/api/admin/*) and on-demand profiling; empty token disables both
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0.0"))
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_KEEP: int = int(os.getenv("PROFILE_KEEP", "50"))
+
+    # Batch scoring sweep for scoring_mode="batch" sessions (0 disables the periodic sweep)
+    BATCH_SCORING_POLL_SECONDS: int = int(os.getenv("BATCH_SCORING_POLL_SECONDS", "30"))
+    BATCH_SCORING_CALLBACK_TIMEOUT: float = float(os.getenv("BATCH_SCORING_CALLBACK_TIMEOUT", "5"))
+    # scoring_callback_url must use one of these schemes and hosts (empty = callbacks disabled)
+    BATCH_SCORING_CALLBACK_HOSTS: str = os.getenv("BATCH_SCORING_CALLBACK_HOSTS", "")
+    BATCH_SCORING_CALLBACK_SCHEMES: str = os.getenv("BATCH_SCORING_CALLBACK_SCHEMES", "https")
+    BATCH_SCORING_MAX_ATTEMPTS: int = int(os.getenv("BATCH_SCORING_MAX_ATTEMPTS", "5"))
+    BATCH_SCORING_RETRY_BASE_SECONDS: float = float(os.getenv("BATCH_SCORING_RETRY_BASE_SECONDS", "30"))
+    BATCH_SCORING_RETRY_MAX_SECONDS: float = float(os.getenv("BATCH_SCORING_RETRY_MAX_SECONDS", "1800"))
+    BATCH_SCORING_LEASE_SECONDS: int = int(os.getenv("BATCH_SCORING_LEASE_SECONDS", "600"))
+
+    # Vector/SQL reconciler (0 disables the periodic run; imports and dedup
+    # backfills also run one pass when rows were left unembedded)
+    RECONCILE_INTERVAL_SECONDS: int = int(os.getenv("RECONCILE_INTERVAL_SECONDS", "900"))
+    RECONCILE_CHUNK_SIZE: int = int(os.getenv("RECONCILE_CHUNK_SIZE", "500"))
+
+settings = Settings()
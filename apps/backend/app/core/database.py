@@ -1,9 +1,10 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app.core.metrics import TimedQueuePool
 
 # Connection URL (use your local DB)
 SQLALCHEMY_DATABASE_URL = "postgresql://localhost/ai_interviewer_db"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=TimedQueuePool)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -0,0 +1,106 @@
+"""
+Request coalescing and Idempotency-Key replay for write endpoints.
+
+    return await run_once("interview.next", data.dict(), idempotency_key,
+                          lambda: _next_question(data))
+
+- Concurrent identical requests (same scope + body, or same Idempotency-Key)
+  share one in-flight call instead of each running it.
+- With an Idempotency-Key header, the successful result is stored for
+  IDEMPOTENCY_TTL_SECONDS and replayed to retries; reusing a key with a
+  different body is rejected with 422. Results for which storable(result)
+  is false (fallbacks, deferred work) are returned but not stored, so a
+  retry runs again.
+
+Stored responses live in their own store ("memory" LRU per process, or the
+idempotency_records table), so LLM cache pruning or flushing never drops them.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Callable, Optional
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.ttl_store import MemoryTTLStore, SQLTTLStore
+from app.models.idempotency import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(*parts) -> str:
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one future (per process)."""
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], dict]) -> dict:
+        existing = self._calls.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            # blocking service code runs off the event loop so followers can join
+            result = await asyncio.to_thread(fn)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._calls.pop(key, None)
+
+
+# ---------- Stores ----------
+class MemoryStore(MemoryTTLStore):
+    """Size-bounded in-process LRU with per-entry expiry."""
+
+
+class SQLStore(SQLTTLStore):
+    """Shared across workers through the idempotency_records table."""
+
+    def __init__(self, max_entries: int):
+        super().__init__(IdempotencyRecord, "scope", max_entries)
+
+
+_flight = SingleFlight()
+_store = (
+    SQLStore(settings.IDEMPOTENCY_MAX_ENTRIES)
+    if settings.IDEMPOTENCY_BACKEND == "sql"
+    else MemoryStore(settings.IDEMPOTENCY_MAX_ENTRIES)
+)
+
+
+async def run_once(scope: str, payload: dict, idempotency_key: Optional[str],
+                   fn: Callable[[], dict], storable: Optional[Callable[[dict], bool]] = None) -> dict:
+    request_hash = _hash(scope, payload)
+
+    if not idempotency_key:
+        return await _flight.do(request_hash, fn)
+
+    store_key = _hash(scope, "idempotency", idempotency_key)
+    stored = _store.get(store_key)
+    if stored is not None:
+        if stored["request_hash"] != request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request body")
+        logger.info("Replaying stored response for %s", scope, extra={"idempotency_key": idempotency_key})
+        return stored["response"]
+
+    def _run_and_store():
+        response = fn()
+        if storable is not None and not storable(response):
+            return response
+        _store.set(store_key, scope,
+                   {"request_hash": request_hash, "response": response},
+                   settings.IDEMPOTENCY_TTL_SECONDS)
+        return response
+
+    return await _flight.do(_hash(store_key, request_hash), _run_and_store)
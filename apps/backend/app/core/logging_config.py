@@ -0,0 +1,126 @@
+"""
+Structured, non-blocking logging.
+
+Records are put on an in-memory queue by a QueueHandler (cheap, no stdout
+lock on the request thread) and written by a background QueueListener as one
+JSON object per line. request_id / session_id are read from contextvars when
+the record is created, so logs of the same request or interview correlate even
+across asyncio.to_thread and background tasks.
+
+Verbose payloads (raw LLM output) go through log_payload(): sampled at
+LOG_PAYLOAD_SAMPLE_RATE and truncated to LOG_PAYLOAD_MAX_CHARS.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+from app.core.config import settings
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+session_id_var: ContextVar[Optional[int]] = ContextVar("session_id", default=None)
+
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def bind_session(session_id) -> None:
+    """Tag every log record of the current request/task with this interview id."""
+    session_id_var.set(session_id)
+
+
+class _ContextFilter(logging.Filter):
+    # runs on the caller's thread, before the record is queued
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        if getattr(record, "session_id", None) is None:  # an explicit extra= wins
+            record.session_id = session_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # keep extra fields; the stock prepare() only keeps the formatted message
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> None:
+    """Install the queue handler on the root logger (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [req=%(request_id)s session=%(session_id)s] %(message)s"
+        ))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the listener; later records go straight to stdout."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    atexit.unregister(listener.stop)
+    listener.stop()
+    handlers = list(listener.handlers)
+    for h in handlers:
+        # records now reach the stream on the caller's thread, without the queue handler's filter
+        h.addFilter(_ContextFilter())
+    logging.getLogger().handlers = handlers
+
+
+def log_payload(logger: logging.Logger, label: str, payload: str, **fields) -> None:
+    """Log a large payload for a sample of calls only, truncated."""
+    if random.random() >= settings.LOG_PAYLOAD_SAMPLE_RATE or not logger.isEnabledFor(logging.INFO):
+        return
+    payload = payload or ""
+    logger.info(label, extra={
+        "payload": payload[:settings.LOG_PAYLOAD_MAX_CHARS],
+        "payload_chars": len(payload),
+        **fields,
+    })
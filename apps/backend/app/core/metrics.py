@@ -0,0 +1,124 @@
+"""
+Prometheus metrics, exposed at GET /metrics.
+
+Per-stage timings for a request: route latency (middleware in app.main), LLM
+calls per prompt type (including retries and token usage), embedding batches,
+Chroma queries and DB pool checkout wait.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.pool import QueuePool
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=_LATENCY_BUCKETS,
+)
+SERVICE_LATENCY = Histogram(
+    "service_call_duration_seconds", "Latency of instrumented service functions",
+    ["function"], buckets=_LATENCY_BUCKETS,
+)
+LLM_LATENCY = Histogram(
+    "llm_call_duration_seconds", "Latency of a single LLM API attempt",
+    ["prompt", "outcome"], buckets=_LATENCY_BUCKETS,
+)
+LLM_RETRIES = Counter("llm_retries_total", "LLM attempts that failed and were retried or given up", ["prompt"])
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by usage_metadata", ["prompt", "kind"])
+EMBED_BATCH_SIZE = Histogram(
+    "embedding_batch_size", "Texts per encode() call",
+    ["model"], buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+EMBED_LATENCY = Histogram(
+    "embedding_duration_seconds", "Time spent in encode()", ["model"], buckets=_LATENCY_BUCKETS,
+)
+CHROMA_LATENCY = Histogram(
+    "chroma_query_duration_seconds", "Chroma collection query latency",
+    ["collection"], buckets=_LATENCY_BUCKETS,
+)
+LLM_QUEUE_WAIT = Histogram(
+    "llm_admission_wait_seconds", "Time an LLM call waited for rate-limit admission",
+    ["priority"], buckets=_LATENCY_BUCKETS,
+)
+LLM_REJECTED = Counter("llm_admission_rejected_total", "LLM calls turned away with 429", ["priority"])
+LLM_BREAKER_STATE = Gauge("llm_circuit_state", "LLM circuit breaker state (0 closed, 1 half-open, 2 open)")
+LLM_FALLBACKS = Counter("llm_fallbacks_total", "Requests served by a local fallback while the LLM was down", ["kind"])
+SEMANTIC_CACHE_LOOKUPS = Counter(
+    "semantic_cache_lookups_total", "Semantic cache lookups by outcome (hit, miss, error)", ["prompt", "result"]
+)
+SEMANTIC_CACHE_SIMILARITY = Histogram(
+    "semantic_cache_similarity", "Cosine similarity of the nearest semantic cache entry",
+    ["prompt"], buckets=(0.5, 0.7, 0.8, 0.85, 0.9, 0.93, 0.95, 0.97, 0.98, 0.99, 1.0),
+)
+DB_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time waiting for a pooled DB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+# prompt type of the LLM calls made in the current request/task
+_llm_prompt: ContextVar[str] = ContextVar("llm_prompt", default="other")
+
+
+@contextmanager
+def timed(histogram, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(**labels) if labels else histogram).observe(time.perf_counter() - started)
+
+
+def instrument(prompt: str = None):
+    """Time a service function; LLM calls made inside it are labelled with `prompt`."""
+    def decorator(fn):
+        name = fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = _llm_prompt.set(prompt) if prompt else None
+            try:
+                with timed(SERVICE_LATENCY, function=name):
+                    return fn(*args, **kwargs)
+            finally:
+                if token is not None:
+                    _llm_prompt.reset(token)
+        return wrapper
+    return decorator
+
+
+def current_prompt() -> str:
+    return _llm_prompt.get()
+
+
+def record_llm_attempt(seconds: float, ok: bool):
+    prompt = _llm_prompt.get()
+    LLM_LATENCY.labels(prompt=prompt, outcome="ok" if ok else "error").observe(seconds)
+    if not ok:
+        LLM_RETRIES.labels(prompt=prompt).inc()
+
+
+def record_llm_usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    prompt = _llm_prompt.get()
+    for kind, attr in (("prompt", "prompt_token_count"),
+                       ("completion", "candidates_token_count"),
+                       ("total", "total_token_count")):
+        count = getattr(usage, attr, None)
+        if count:
+            LLM_TOKENS.labels(prompt=prompt, kind=kind).inc(count)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_CHECKOUT_WAIT.observe(time.perf_counter() - started)
@@ -0,0 +1,150 @@
+"""
+On-demand statistical profiling of single requests.
+
+A request is profiled when it is picked by PROFILE_SAMPLE_RATE or carries
+`X-Profile: <ADMIN_TOKEN>`. While it runs, a sampler thread snapshots the
+Python stacks of every busy thread every PROFILE_INTERVAL_MS (the event loop
+for async routes, the worker pool for sync ones and to_thread work). Idle
+threads (parked in a queue or selector) are skipped.
+
+Each profile is written to PROFILE_DIR as folded stacks, one line per unique
+stack ("thread;outer;...;leaf count"), ready for flamegraph.pl, speedscope or
+inferno, with a small JSON sidecar (route, status, duration, samples). Only the
+newest PROFILE_KEEP profiles are kept, and at most one request is profiled at a
+time so the overhead stays bounded under load.
+
+Profiles are named after the request id. X-Request-ID is client-supplied, so a
+repeated id gets a random suffix instead of overwriting the earlier profile
+(the sidecar keeps the original id as client_request_id).
+"""
+import json
+import logging
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# leaf frames of a thread that is waiting for work, not doing it
+_IDLE_LEAVES = {"wait", "select", "poll", "get", "accept", "_wait_for_tstate_lock"}
+_busy = threading.Lock()
+_SAFE_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_name in _IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+def should_profile(header_value: str | None) -> bool:
+    # constant-time, like admin_routes.require_admin: no timing oracle on ADMIN_TOKEN
+    if settings.ADMIN_TOKEN and header_value and secrets.compare_digest(
+            header_value.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8")):
+        return True
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def start() -> StackSampler | None:
+    """Start sampling, or None if another request is already being profiled."""
+    if not _busy.acquire(blocking=False):
+        return None
+    sampler = StackSampler(settings.PROFILE_INTERVAL_MS / 1000)
+    sampler.start()
+    return sampler
+
+
+def finish(sampler: StackSampler, request_id: str, **meta):
+    """Stop sampling and store the profile; never raises into the request."""
+    try:
+        stacks = sampler.stop()
+    finally:
+        _busy.release()
+    if not _SAFE_ID.fullmatch(request_id):  # client-supplied X-Request-ID
+        request_id = uuid.uuid4().hex
+    try:
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        if os.path.exists(os.path.join(settings.PROFILE_DIR, request_id + ".json")):
+            meta["client_request_id"] = request_id
+            request_id = f"{request_id[:55]}-{uuid.uuid4().hex[:8]}"
+        base = os.path.join(settings.PROFILE_DIR, request_id)
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump({"request_id": request_id, "created_at": time.time(), "samples": sampler.samples,
+                       "interval_ms": settings.PROFILE_INTERVAL_MS, **meta}, f)
+        _prune()
+        logger.info("Stored profile %s (%d samples)", request_id, sampler.samples)
+    except OSError as e:
+        logger.warning("Could not store profile %s: %s", request_id, e)
+
+
+def _prune():
+    metas = sorted(
+        (name for name in os.listdir(settings.PROFILE_DIR) if name.endswith(".json")),
+        key=lambda name: os.path.getmtime(os.path.join(settings.PROFILE_DIR, name)),
+        reverse=True,
+    )
+    for name in metas[settings.PROFILE_KEEP:]:
+        for suffix in (".json", ".folded"):
+            try:
+                os.remove(os.path.join(settings.PROFILE_DIR, name[:-5] + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> list[dict]:
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    out = []
+    for name in os.listdir(settings.PROFILE_DIR):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(settings.PROFILE_DIR, name), encoding="utf-8") as f:
+                    out.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return sorted(out, key=lambda p: p.get("created_at", 0), reverse=True)
+
+
+def profile_path(request_id: str) -> str | None:
+    if not _SAFE_ID.fullmatch(request_id):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, request_id + ".folded")
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,119 @@
+"""
+Key/value stores with per-entry expiry, shared by the LLM result cache and
+Idempotency-Key replay.
+
+- MemoryTTLStore: size-bounded LRU per process.
+- SQLTTLStore: a table with key, <scope column>, value (JSON), expires_at and
+  created_at columns, shared across workers; pruned on roughly every Nth write.
+
+Both expose get(key), set(key, scope, value, ttl) and clear().
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from app.core.database import SessionLocal
+
+
+class MemoryTTLStore:
+    """Size-bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at_epoch, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, scope: str, value, ttl: int):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLTTLStore:
+    """Shared store in the app database (SQLite or Postgres). `model` is the mapped
+    table; `scope_column` names its column for set()'s scope (e.g. template_id)."""
+
+    # prune on roughly every Nth write instead of every write
+    PRUNE_EVERY = 50
+
+    def __init__(self, model, scope_column: str, max_entries: int):
+        self.model = model
+        self.scope_column = scope_column
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        db = SessionLocal()
+        try:
+            row = db.query(self.model).get(key)
+            if row is None:
+                return None
+            expires_at = row.expires_at
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            if expires_at < datetime.now(timezone.utc):
+                return None
+            return json.loads(row.value)
+        finally:
+            db.close()
+
+    def set(self, key: str, scope: str, value, ttl: int):
+        db = SessionLocal()
+        try:
+            db.merge(self.model(
+                key=key,
+                value=json.dumps(value, ensure_ascii=False, default=str),
+                expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl),
+                **{self.scope_column: scope},
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._writes += 1
+            should_prune = self._writes % self.PRUNE_EVERY == 0
+        if should_prune:
+            self.prune()
+
+    def prune(self):
+        """Drop expired rows, then the oldest ones beyond max_entries."""
+        model = self.model
+        db = SessionLocal()
+        try:
+            db.query(model).filter(model.expires_at < datetime.now(timezone.utc)).delete(synchronize_session=False)
+            excess = db.query(model).count() - self.max_entries
+            if excess > 0:
+                oldest = db.query(model.key).order_by(model.created_at).limit(excess).subquery()
+                db.query(model).filter(model.key.in_(oldest.select())).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def clear(self):
+        db = SessionLocal()
+        try:
+            db.query(self.model).delete()
+            db.commit()
+        finally:
+            db.close()
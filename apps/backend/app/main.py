@@ -1,13 +1,84 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from sqlalchemy import text
+from app.core import profiling
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.routes import resume_routes, interview_routes, job_routes
+from app.core.logging_config import request_id_var, setup_logging, shutdown_logging
+from app.core.metrics import REQUEST_LATENCY
+from app.routes import resume_routes, interview_routes, job_routes, admin_routes
 from dotenv import load_dotenv
 
 load_dotenv()
+setup_logging()
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Interviewer API")
+# 🔄 Periodic vector/SQL reconciliation (RECONCILE_INTERVAL_SECONDS, 0 disables);
+# with several workers only the one holding the run lock reconciles
+async def _reconcile_loop(interval: int):
+    from app.services.reconcile_service import reconcile_all
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(reconcile_all, exclusive=True)
+        except Exception as e:
+            logger.exception("Reconciler run failed: %s", e)
+
+# 🧮 Periodic sweep for batch-scoring sessions (opt-out via BATCH_SCORING_POLL_SECONDS=0)
+async def _batch_scoring_loop(interval: int):
+    from app.services.batch_scoring import run_pending
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(run_pending)
+        except Exception as e:
+            logger.exception("Batch scoring sweep failed: %s", e)
+
+# 🔥 Warm the embedding model and Chroma in the background; the port is bound
+# right away and /readyz turns 200 once this finishes
+async def _warmup(state: dict):
+    from app.services.embeddings_service import warmup
+    started = time.perf_counter()
+    try:
+        timings = await asyncio.to_thread(warmup)
+        state.update(done=True, timings=timings)
+        logger.info("Warmup finished in %.2fs", time.perf_counter() - started, extra={"timings": timings})
+    except Exception as e:
+        state["error"] = str(e)
+        logger.exception("Warmup failed: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.services.deferred_scoring import drain, stop_draining
+    app.state.warmup = {"done": False, "error": None, "timings": None}
+    tasks = []
+    if settings.WARMUP_ON_STARTUP:
+        tasks.append(asyncio.create_task(_warmup(app.state.warmup)))
+    if settings.BATCH_SCORING_POLL_SECONDS > 0:
+        tasks.append(asyncio.create_task(_batch_scoring_loop(settings.BATCH_SCORING_POLL_SECONDS)))
+    if settings.RECONCILE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(_reconcile_loop(settings.RECONCILE_INTERVAL_SECONDS)))
+    # ⏳ answers whose scoring was deferred during an LLM outage (before a restart)
+    deferred_drain = asyncio.create_task(asyncio.to_thread(drain))
+    try:
+        yield
+    finally:
+        stop_draining()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(deferred_drain, return_exceptions=True)
+        logger.info("Background tasks stopped")
+        shutdown_logging()
+
+app = FastAPI(title="AI Interviewer API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +88,95 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 🔬 Sampled request profiling (PROFILE_SAMPLE_RATE, or X-Profile: <ADMIN_TOKEN>)
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    if not profiling.should_profile(request.headers.get("x-profile")):
+        return await call_next(request)
+    sampler = profiling.start()
+    if sampler is None:  # another request is being profiled
+        return await call_next(request)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        await asyncio.to_thread(
+            profiling.finish, sampler, request_id_var.get() or uuid.uuid4().hex,
+            method=request.method, route=getattr(route, "path", request.url.path), status=status,
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+
+# 🔗 Request id for log correlation (client-supplied X-Request-ID is kept)
+@app.middleware("http")
+async def bind_request_id(request: Request, call_next):
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+# 📈 Request latency per route template (/api/interview/{session_id}/analytics, not per id)
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        ).observe(time.perf_counter() - started)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# 🩺 Liveness: the process is up and serving (no dependencies touched)
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    return {"status": "ok"}
+
+# 🚦 Readiness: embedding model warmed up, vector store open, database reachable
+@app.get("/readyz", include_in_schema=False)
+def readyz():
+    from app.services.embeddings_service import KINDS, active_model, get_chroma_client, model_loaded
+    warmup = app.state.warmup
+    # the models warmup() loads: the active one per kind, which may differ from
+    # EMBEDDING_MODEL after a re-embedding switch
+    checks = {"model": all(model_loaded(active_model(kind)) for kind in KINDS)
+              if settings.WARMUP_ON_STARTUP else True}
+    try:
+        get_chroma_client().heartbeat()
+        checks["vector_store"] = True
+    except Exception:
+        checks["vector_store"] = False
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1"))
+        checks["db"] = True
+    except Exception:
+        checks["db"] = False
+    finally:
+        db.close()
+    if settings.WARMUP_ON_STARTUP:
+        checks["warmup"] = warmup["done"]
+    ready = all(checks.values())
+    body = {"status": "ready" if ready else "starting", "checks": checks,
+            "warmup_ms": warmup["timings"], "warmup_error": warmup["error"]}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
 @app.get("/")
 def home():
     return {"message": "AI Interviewer backend is running 🚀"}
@@ -36,3 +196,4 @@ def test_db():
 app.include_router(resume_routes.router, prefix="/api")
 app.include_router(interview_routes.router, prefix="/api")
 app.include_router(job_routes.router, prefix="/api")  # ✅ correct name
+app.include_router(admin_routes.router, prefix="/api")
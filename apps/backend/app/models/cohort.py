@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint, func
+from app.core.database import Base
+
+
+class CohortSketch(Base):
+    """Mergeable quantile sketch of one metric within one cohort (job, domain or month)."""
+    __tablename__ = "cohort_sketches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cohort_type = Column(String(20), nullable=False)   # "job" | "domain" | "month" | "all"
+    cohort_key = Column(String(200), nullable=False)   # job id, domain name, "2026-10", "*"
+    metric = Column(String(50), nullable=False)        # "resume_score" | "interview_avg"
+    count = Column(Integer, default=0, nullable=False)
+    sketch = Column(Text, nullable=False)              # KLLSketch.to_json()
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("cohort_type", "cohort_key", "metric", name="uq_cohort_sketches_cohort_metric"),
+    )
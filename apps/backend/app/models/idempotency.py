@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Text, DateTime, func
+from app.core.database import Base
+
+
+class IdempotencyRecord(Base):
+    """Stored response for an Idempotency-Key (IDEMPOTENCY_BACKEND=sql)."""
+    __tablename__ = "idempotency_records"
+
+    key = Column(String(64), primary_key=True)           # sha256 of (scope, idempotency key)
+    scope = Column(String(100), nullable=False)          # e.g. "interview.next"
+    value = Column(Text, nullable=False)                 # JSON: request_hash + response
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -11,7 +11,22 @@ class InterviewSession(Base):
     resume_text = Column(Text, nullable=False)
     score = Column(Integer, nullable=True)
     intro = Column(Text, nullable=True)
+    resume_digest = Column(Text, nullable=True)  # JSON: skills, roles, years_experience, highlights
     status = Column(String(50), default="in_progress")
+    job_id = Column(Integer, ForeignKey("job_postings.id"), nullable=True)  # target job, if any
+    domain = Column(String(100), nullable=True)
+
+    # Rolling summary, maintained in the background after each answer
+    rolling_summary = Column(Text, nullable=True)
+    summary_message_id = Column(Integer, nullable=True)  # last message folded into rolling_summary
+
+    # "live": every answer scored as it comes in; "batch": the whole transcript is
+    # scored in one call after the interview (see batch_scoring)
+    scoring_mode = Column(String(10), default="live", nullable=False, server_default="live")
+    batch_scoring_status = Column(String(20), nullable=True, index=True)  # queued | running | done | failed
+    batch_scoring_attempts = Column(Integer, default=0, nullable=False, server_default="0")
+    batch_scoring_due_at = Column(DateTime(timezone=True), nullable=True)  # queued: retry after; running: lease end
+    scoring_callback_url = Column(String(500), nullable=True)  # POSTed the scores when batch scoring ends
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationship to interview messages
@@ -32,3 +47,56 @@ class InterviewMessage(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     session = relationship("InterviewSession", back_populates="messages")
+
+
+class InterviewAnswerScore(Base):
+    """Typed per-answer evaluation; written with its audit message in one transaction."""
+    __tablename__ = "interview_answer_scores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), nullable=False)
+    message_id = Column(Integer, ForeignKey("interview_messages.id"), nullable=True)
+    kind = Column(String(20), nullable=False)  # "simple" | "detailed"
+    question = Column(Text, nullable=True)
+    sub_score = Column(Integer, nullable=True)  # simple evaluation, 0-20
+    clarity = Column(Integer, nullable=True)
+    coherence = Column(Integer, nullable=True)
+    confidence = Column(Integer, nullable=True)
+    technical_depth = Column(Integer, nullable=True)
+    engagement = Column(Integer, nullable=True)
+    average_score = Column(Float, nullable=True)
+    feedback = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("ix_interview_answer_scores_session_id_id", "session_id", "id"),)
+
+
+class DeferredEvaluation(Base):
+    """Answer evaluation postponed while the LLM circuit was open; replayed once it closes."""
+    __tablename__ = "deferred_evaluations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), nullable=False, index=True)
+    kind = Column(String(20), nullable=False)  # "simple" | "detailed"
+    question = Column(Text, nullable=True)
+    answer = Column(Text, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class InterviewSessionAnalytics(Base):
+    """Per-session aggregates, updated incrementally with every answer score."""
+    __tablename__ = "interview_session_analytics"
+
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), primary_key=True)
+    detailed_count = Column(Integer, default=0, nullable=False)
+    clarity_sum = Column(Integer, default=0, nullable=False)
+    coherence_sum = Column(Integer, default=0, nullable=False)
+    confidence_sum = Column(Integer, default=0, nullable=False)
+    technical_depth_sum = Column(Integer, default=0, nullable=False)
+    engagement_sum = Column(Integer, default=0, nullable=False)
+    simple_count = Column(Integer, default=0, nullable=False)
+    simple_score_total = Column(Integer, default=0, nullable=False)
+    trend = Column(Text, nullable=True)  # JSON list of per-answer average scores, in order
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -15,8 +15,22 @@ class JobPosting(Base):
     url = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Near-duplicate clustering (see dedup_service): NULL canonical_job_id = canonical job
+    minhash = Column(Text, nullable=True)
+    canonical_job_id = Column(Integer, ForeignKey("job_postings.id"), nullable=True, index=True)
+
     matches = relationship("JobMatch", back_populates="job")
 
+class JobLSHBucket(Base):
+    __tablename__ = "job_lsh_buckets"
+
+    id = Column(Integer, primary_key=True)
+    band = Column(Integer, nullable=False)
+    bucket = Column(String(16), nullable=False)
+    job_id = Column(Integer, ForeignKey("job_postings.id"), nullable=False, index=True)
+
+    __table_args__ = (Index("ix_job_lsh_buckets_band_bucket", "band", "bucket"),)
+
 class JobMatch(Base):
     __tablename__ = "job_matches"
 
@@ -26,6 +40,11 @@ class JobMatch(Base):
     job_id = Column(Integer, ForeignKey("job_postings.id"), nullable=False)
     similarity = Column(Float, default=0.0)     # cosine similarity 0..1
     reason = Column(Text, nullable=True)
+    reason_status = Column(String(10), nullable=True)  # pending | done | failed (explain=true only)
+    resume_hash = Column(String(64), nullable=True)  # content_hash of the matched resume text
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     job = relationship("JobPosting", back_populates="matches")
+
+    # reasons are reused per (resume, job)
+    __table_args__ = (Index("ix_job_matches_resume_hash_job_id", "resume_hash", "job_id"),)
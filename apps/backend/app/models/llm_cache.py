@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Text, DateTime, func
+from app.core.database import Base
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache_entries"
+
+    key = Column(String(64), primary_key=True)           # sha256 of (model, template, version, inputs)
+    template_id = Column(String(100), nullable=False, index=True)
+    value = Column(Text, nullable=False)                 # JSON-encoded result
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
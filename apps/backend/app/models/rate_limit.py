@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Float, String
+from app.core.database import Base
+
+
+class LLMRateBucket(Base):
+    """Shared token bucket for LLM admission control (LLM_RATE_LIMIT_BACKEND=sql)."""
+    __tablename__ = "llm_rate_buckets"
+
+    name = Column(String(50), primary_key=True)   # "requests" | "tokens"
+    tokens = Column(Float, nullable=False)        # tokens left at updated_at
+    updated_at = Column(Float, nullable=False)    # epoch seconds of the last refill
@@ -0,0 +1,31 @@
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import FileResponse
+from app.core import profiling
+from app.core.config import settings
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(
+            x_admin_token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+def list_profiles(limit: int = 50):
+    """Most recent request profiles first."""
+    return {"profiles": profiling.list_profiles()[:limit]}
+
+
+@router.get("/profiles/{request_id}")
+def download_profile(request_id: str):
+    """Folded stacks, e.g. `flamegraph.pl profile.folded > profile.svg`."""
+    path = profiling.profile_path(request_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{request_id}.folded")
@@ -1,5 +1,14 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import logging
+from typing import Literal
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Header, Query
 from pydantic import BaseModel
+from app.core.idempotency import run_once
+from app.core.logging_config import bind_session
+from app.services.analytics_service import get_session_analytics
+from app.services.batch_scoring import callback_allowed, score_session, session_scores
+from app.services.cohort_service import session_percentiles
+from app.services.listing_service import list_response, export_response
 from app.services.interviewer_service import (
     analyze_resume,
     generate_next_question,
@@ -7,11 +16,15 @@ from app.services.interviewer_service import (
     create_session,
     save_message,
     evaluate_answer,          # existing simple scoring
-    evaluate_detailed_answer  # 🆕 detailed per-dimension scoring
+    evaluate_detailed_answer,  # 🆕 detailed per-dimension scoring
+    get_resume_context,
+    update_rolling_summary,
+    finalize_summary
 )
 
 # ✅ Prefix: /api/interview (since main.py already prefixes /api)
 router = APIRouter(prefix="/interview", tags=["Interview"])
+logger = logging.getLogger(__name__)
 
 
 # ------------------------------------------------
@@ -20,19 +33,26 @@ router = APIRouter(prefix="/interview", tags=["Interview"])
 class ResumeText(BaseModel):
     resume_text: str
     candidate_name: str | None = "Candidate"
+    job_id: int | None = None     # target job (cohort for percentile ranking)
+    domain: str | None = None     # e.g. "data science" (cohort for percentile ranking)
+    scoring_mode: Literal["live", "batch"] = "live"  # batch: score all answers after the interview
+    scoring_callback_url: str | None = None          # batch: POSTed the scores when ready (allowlisted hosts)
 
 
 class FollowUp(BaseModel):
     session_id: int
     score: int
-    resume_text: str | None = None
+    resume_text: str | None = None  # no longer needed: the session's resume digest is used
     last_answer: str | None = None
 
 
 class SummaryIn(BaseModel):
-    resume_text: str
-    score: int
-    conversation: list[dict]  # [{question, answer}]
+    # Preferred: just session_id -> finalized from the rolling summary.
+    # Legacy: resume_text + score + full conversation.
+    session_id: int | None = None
+    resume_text: str = ""
+    score: int | None = None
+    conversation: list[dict] | None = None  # [{question, answer}]
 
 
 # 🧠 Simple evaluation model
@@ -54,10 +74,13 @@ class DetailedAnswerIn(BaseModel):
 # 🧠 1️⃣ Analyze Resume → Create Interview Session
 # ------------------------------------------------
 @router.post("/analyze")
-async def analyze_resume_route(data: ResumeText):
-    try:
-        print(f"🔍 Analyzing resume for {data.candidate_name} ...")
-        result = analyze_resume(data.resume_text)
+async def analyze_resume_route(data: ResumeText, idempotency_key: str | None = Header(default=None)):
+    if data.scoring_callback_url and not callback_allowed(data.scoring_callback_url):
+        raise HTTPException(status_code=422, detail="scoring_callback_url host is not allowed.")
+
+    def _run():
+        logger.info("Analyzing resume for a new interview session")
+        result = analyze_resume(data.resume_text, use_cache=True)
 
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
@@ -67,18 +90,28 @@ async def analyze_resume_route(data: ResumeText):
             candidate_name=data.candidate_name,
             resume_text=data.resume_text,
             score=result["score"],
-            intro=result["intro"]
+            intro=result["intro"],
+            resume_digest=result.get("digest"),
+            job_id=data.job_id,
+            domain=data.domain,
+            scoring_mode=data.scoring_mode,
+            scoring_callback_url=data.scoring_callback_url
         )
+        bind_session(session.id)
 
-        print(f"✅ Session created: {session.id}")
         return {
             "session_id": session.id,
             "score": result["score"],
-            "intro": result["intro"]
+            "intro": result["intro"],
+            "digest": result.get("digest")
         }
 
+    try:
+        return await run_once("interview.analyze", data.dict(), idempotency_key, _run)
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Error in analyze_resume_route:", e)
+        logger.exception("Error in analyze_resume_route: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -86,30 +119,43 @@ async def analyze_resume_route(data: ResumeText):
 # 🗣️ 2️⃣ Generate Next Question
 # ------------------------------------------------
 @router.post("/next")
-async def next_question_route(data: FollowUp):
-    try:
-        print(f"🎯 Generating next question | Session: {data.session_id} | Score: {data.score}")
+async def next_question_route(data: FollowUp, background_tasks: BackgroundTasks,
+                              idempotency_key: str | None = Header(default=None)):
+    """
+    Retries and double-submits are safe: identical concurrent requests share one
+    generation, and an Idempotency-Key header replays the stored result.
+    """
+    bind_session(data.session_id)
 
+    def _run():
         # Save candidate answer if present
         if data.last_answer:
             save_message(data.session_id, "candidate", data.last_answer)
 
         # Generate next interviewer question
         result = generate_next_question(
-    session_id=data.session_id,
-    resume_text=data.resume_text or "",
-    score=data.score,
-    last_answer=data.last_answer
-)
+            session_id=data.session_id,
+            resume_text=data.resume_text or "",
+            score=data.score,
+            last_answer=data.last_answer
+        )
 
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
 
-        print("✅ Next question generated:", result.get("question"))
         return result
 
+    try:
+        result = await run_once("interview.next", data.dict(), idempotency_key, _run)
+        if data.last_answer:
+            background_tasks.add_task(update_rolling_summary, data.session_id)
+        if result.get("batch_scoring") == "queued":
+            background_tasks.add_task(score_session, data.session_id)
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Error in next_question_route:", e)
+        logger.exception("Error in next_question_route: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -120,12 +166,12 @@ async def next_question_route(data: FollowUp):
 async def generate_questions_route(data: ResumeText):
     from app.services.interviewer_service import generate_interview_questions
     try:
-        print("🧠 Generating static interview questions...")
         result = generate_interview_questions(data.resume_text)
-        print("✅ Static questions generated.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Error in generate_questions:", e)
+        logger.exception("Error in generate_questions: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -134,29 +180,45 @@ async def generate_questions_route(data: ResumeText):
 # ------------------------------------------------
 @router.post("/summary")
 async def interview_summary_route(data: SummaryIn):
+    bind_session(data.session_id)
     try:
-        print(f"📋 Generating summary for score {data.score} with {len(data.conversation)} Q&A pairs...")
-        result = summarize_interview(
-            data.resume_text,
-            data.score,
-            data.conversation
-        )
+        if data.session_id and not data.conversation:
+            result = await asyncio.to_thread(finalize_summary, data.session_id, True)
+        else:
+            if data.conversation is None or data.score is None:
+                raise HTTPException(status_code=422, detail="Provide session_id, or score and conversation.")
+            resume_ctx = get_resume_context(data.session_id, data.resume_text) if data.session_id else None
+            result = summarize_interview(
+                data.resume_text,
+                data.score,
+                data.conversation,
+                use_cache=True,
+                resume_ctx=resume_ctx
+            )
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
-        print("✅ Summary generated successfully.")
         return result
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Error in interview_summary:", e)
+        logger.exception("Error in interview_summary: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # ------------------------------------------------
 # 🧠 5️⃣ Real-Time Answer Evaluation (simple)
 # ------------------------------------------------
+def _final_evaluation(result: dict) -> bool:
+    # fallback and deferred evaluations are not replayed to Idempotency-Key retries
+    return not (result.get("degraded") or result.get("deferred"))
+
+
 @router.post("/score_answer")
-async def score_answer_route(data: AnswerEvaluationIn):
-    try:
-        print(f"🧠 Evaluating answer for session {data.session_id} ...")
+async def score_answer_route(data: AnswerEvaluationIn, background_tasks: BackgroundTasks,
+                             idempotency_key: str | None = Header(default=None)):
+    bind_session(data.session_id)
+
+    def _run():
         result = evaluate_answer(
             session_id=data.session_id,
             question=data.question,
@@ -167,11 +229,17 @@ async def score_answer_route(data: AnswerEvaluationIn):
         if "feedback" not in result:
             raise HTTPException(status_code=500, detail="No feedback generated.")
 
-        print(f"✅ Evaluation complete — Sub-score: {result['sub_score']}/20")
         return result
 
+    try:
+        result = await run_once("interview.score_answer", data.dict(), idempotency_key, _run,
+                                storable=_final_evaluation)
+        background_tasks.add_task(update_rolling_summary, data.session_id)
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Error in score_answer_route:", e)
+        logger.exception("Error in score_answer_route: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -179,30 +247,77 @@ async def score_answer_route(data: AnswerEvaluationIn):
 # 📊 6️⃣ Detailed Per-Question Analytics (for charts)
 # ------------------------------------------------
 @router.post("/analyze_answer_detailed")
-async def analyze_answer_detailed_route(data: DetailedAnswerIn):
+async def analyze_answer_detailed_route(data: DetailedAnswerIn, idempotency_key: str | None = Header(default=None)):
     """
     Returns per-dimension scoring for one answer:
     { clarity, coherence, confidence, technical_depth, engagement, average_score, feedback }
     """
-    try:
-        print(f"📊 Detailed evaluation for session {data.session_id} ...")
-        result = evaluate_detailed_answer(
+    bind_session(data.session_id)
+
+    def _run():
+        return evaluate_detailed_answer(
             session_id=data.session_id,
             question=data.question,
             answer=data.answer
         )
-        return result
+
+    try:
+        return await run_once("interview.analyze_answer_detailed", data.dict(), idempotency_key, _run,
+                              storable=_final_evaluation)
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Error in analyze_answer_detailed_route:", e)
+        logger.exception("Error in analyze_answer_detailed_route: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-class ResumeText(BaseModel):
-    resume_text: str
-    candidate_name: str | None = "Candidate"
-    job_id: int | None = None
-    job_description: str | None = None   # alternative free text
+# ------------------------------------------------
+# 🗂️ Session listing & export (keyset-paginated)
+# ------------------------------------------------
+@router.get("/sessions")
+async def list_sessions_route(after_id: int = 0, limit: int = Query(50, ge=1, le=500),
+                              fields: str | None = None, status: str | None = None):
+    """Pass next_after_id back as after_id; `fields` opts into large columns such as resume_text."""
+    page = await asyncio.to_thread(list_response, "sessions", after_id, limit, fields, {"status": status})
+    return {"sessions": page["items"], "next_after_id": page["next_after_id"]}
+
+
+@router.get("/sessions/export")
+async def export_sessions_route(format: str = "ndjson", fields: str | None = None, status: str | None = None):
+    return export_response("sessions", format, fields, {"status": status})
 
-# Inside analyze_resume_route, you can pass job_description into the prompt (optional)
-# E.g., prepend: f"Target Job: {loaded_job_desc}\n\nResume: {data.resume_text}"
-# and store job_id on the InterviewSession if you extend that model.
+
+# ------------------------------------------------
+# 📈 7️⃣ Session Analytics (radar chart)
+# ------------------------------------------------
+@router.get("/{session_id}/analytics")
+async def session_analytics_route(session_id: int):
+    """Per-dimension means, total and trend from the precomputed aggregates row."""
+    result = await asyncio.to_thread(get_session_analytics, session_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No scored answers for this session yet.")
+    return result
+
+
+# ------------------------------------------------
+# 🧮 Per-answer scores (batch scoring status for scoring_mode="batch")
+# ------------------------------------------------
+@router.get("/{session_id}/scores")
+async def session_scores_route(session_id: int):
+    """status: live | queued | running | done | failed, plus every recorded answer score."""
+    result = await asyncio.to_thread(session_scores, session_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
+    return result
+
+
+# ------------------------------------------------
+# 🏅 8️⃣ Cohort Percentiles
+# ------------------------------------------------
+@router.get("/{session_id}/percentiles")
+async def session_percentiles_route(session_id: int):
+    """Where the session's resume score and interview average rank within its job, domain and month cohorts."""
+    result = await asyncio.to_thread(session_percentiles, session_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
+    return result
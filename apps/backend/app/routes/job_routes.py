@@ -1,59 +1,160 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from app.schemas.job_schema import JobIn, JobOut, JobSearchOut, MatchIn, MatchOut
+import asyncio
+import queue
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from typing import List, Optional
+from app.schemas.job_schema import JobIn, JobOut, JobSearchOut, MatchIn, MatchOut, MatchReasonOut
 from app.services.job_service import (
     ingest_jobs_from_list, fetch_remoteok, fetch_muse, match_resume_to_jobs
 )
+from app.services.listing_service import list_response, export_response
+from app.services.job_import import import_stream, QueueReader, text_stream
+from app.services.match_explain_service import explain_matches, mark_pending, match_reasons
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
+def _project(saved: list, include_description: bool) -> dict:
+    # full HTML descriptions make ingest responses megabytes large; opt-in only
+    if not include_description:
+        saved = [{**j, "description": None} for j in saved]
+    return {"jobs": saved}
+
 @router.post("/ingest", response_model=JobSearchOut)
-async def ingest_jobs(jobs: List[JobIn]):
+async def ingest_jobs(jobs: List[JobIn], include_description: bool = False):
     try:
         saved = ingest_jobs_from_list([j.dict() for j in jobs])
-        return {"jobs": saved}
+        return _project(saved, include_description)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/remoteok", response_model=JobSearchOut)
-async def get_remoteok():
+async def get_remoteok(include_description: bool = False):
     try:
         jobs = fetch_remoteok()
         saved = ingest_jobs_from_list(jobs)
-        return {"jobs": saved}
+        return _project(saved, include_description)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/muse", response_model=JobSearchOut)
-async def get_muse(page: int = 1):
+async def get_muse(page: int = 1, include_description: bool = False):
     try:
         jobs = fetch_muse(page=page)
         saved = ingest_jobs_from_list(jobs)
-        return {"jobs": saved}
+        return _project(saved, include_description)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# 📥 Streaming NDJSON/CSV import: the body is parsed as it arrives and committed in chunks
+@router.post("/import")
+async def import_jobs(request: Request, format: Optional[str] = None,
+                      chunk_size: int = Query(500, ge=1, le=5000), source: Optional[str] = None):
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    chunks: queue.Queue = queue.Queue(maxsize=16)  # bounded: the upload waits for the importer
+    reader = QueueReader(chunks)
+    importer = asyncio.create_task(asyncio.to_thread(
+        import_stream, text_stream(reader), fmt, chunk_size, source
+    ))
+
+    def _put(item) -> bool:
+        while not importer.done():
+            try:
+                chunks.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        async for body_chunk in request.stream():
+            if body_chunk and not await asyncio.to_thread(_put, body_chunk):
+                break
+    except BaseException:
+        # client disconnected (or we were cancelled): stop the importer instead of
+        # letting it parse a truncated body; chunks already committed stay
+        reader.abort()
+        raise
+    finally:
+        await asyncio.to_thread(_put, None)
+        if reader.aborted:
+            await asyncio.gather(importer, return_exceptions=True)
+
+    try:
+        return await importer
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# 📄 Keyset-paginated listings: pass next_after_id back as after_id for the next page.
+# `fields` is a comma-separated projection; descriptions/reasons are opt-in.
+@router.get("")
+async def list_jobs(after_id: int = 0, limit: int = Query(50, ge=1, le=500),
+                    fields: Optional[str] = None, source: Optional[str] = None):
+    page = await asyncio.to_thread(list_response, "jobs", after_id, limit, fields, {"source": source})
+    return {"jobs": page["items"], "next_after_id": page["next_after_id"]}
+
+
+@router.get("/export")
+async def export_jobs(format: str = "ndjson", fields: Optional[str] = None, source: Optional[str] = None):
+    return export_response("jobs", format, fields, {"source": source})
+
+
+@router.get("/matches")
+async def list_matches(after_id: int = 0, limit: int = Query(50, ge=1, le=500), fields: Optional[str] = None,
+                       session_id: Optional[int] = None, job_id: Optional[int] = None):
+    page = await asyncio.to_thread(list_response, "matches", after_id, limit, fields,
+                                   {"session_id": session_id, "job_id": job_id})
+    return {"matches": page["items"], "next_after_id": page["next_after_id"]}
+
+
+@router.get("/matches/export")
+async def export_matches(format: str = "ndjson", fields: Optional[str] = None,
+                         session_id: Optional[int] = None, job_id: Optional[int] = None):
+    return export_response("matches", format, fields, {"session_id": session_id, "job_id": job_id})
+
+
 # 🧠 FIXED: Frontend-friendly match endpoint
+# With explain=true, missing reasons are generated after the response is sent
+# (one batched LLM call) and picked up via GET /match/reasons.
 @router.post("/match", response_model=List[MatchOut])
-async def match_jobs(data: MatchIn):
+async def match_jobs(data: MatchIn, background_tasks: BackgroundTasks):
     try:
-        pairs = match_resume_to_jobs(
+        pairs = await asyncio.to_thread(
+            match_resume_to_jobs,
             session_id=data.session_id,
             resume_text=data.resume_text,
             top_k=data.top_k
         )
 
+        unexplained = [job_dict["match_id"] for job_dict, _ in pairs if not job_dict.get("reason")]
+        pending = data.explain and bool(unexplained)
+        if pending:
+            await asyncio.to_thread(mark_pending, unexplained)
+            background_tasks.add_task(explain_matches, unexplained, data.session_id, data.resume_text or "")
+
         return [{
             "job_id": job_dict["id"],
             "title": job_dict["title"],
             "company": job_dict["company"],
             "similarity": round(sim * 100, 2),
             "url": job_dict.get("url"),
-            "reason": None
+            "reason": job_dict.get("reason"),
+            "match_id": job_dict.get("match_id"),
+            "reason_pending": pending and not job_dict.get("reason"),
         } for job_dict, sim in pairs]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/match/reasons", response_model=List[MatchReasonOut])
+async def get_match_reasons(match_ids: List[int] = Query(...)):
+    try:
+        return await asyncio.to_thread(match_reasons, match_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -15,14 +15,29 @@ class JobOut(JobIn):
     class Config:
         orm_mode = True
 
+class JobSummaryOut(BaseModel):
+    # description is only filled when explicitly requested (include_description=true)
+    id: int
+    title: str
+    company: Optional[str] = None
+    location: Optional[str] = None
+    url: Optional[str] = None
+    source: Optional[str] = None
+    external_id: Optional[str] = None
+    description: Optional[str] = None
+    # set when the job is a near-duplicate of an already stored posting
+    canonical_job_id: Optional[int] = None
+
 class JobSearchOut(BaseModel):
-    jobs: List[JobOut]
+    jobs: List[JobSummaryOut]
 
 class MatchIn(BaseModel):
     # choose either session_id (preferred) or raw resume text
     session_id: Optional[int] = None
     resume_text: Optional[str] = None
     top_k: int = 5
+    # generate reasons in the background (one LLM call for all matches); poll /jobs/match/reasons
+    explain: bool = False
 
 class MatchOut(BaseModel):
     job_id: int
@@ -31,3 +46,11 @@ class MatchOut(BaseModel):
     similarity: float
     url: str | None = None
     reason: str | None = None
+    match_id: int | None = None
+    reason_pending: bool = False
+
+class MatchReasonOut(BaseModel):
+    match_id: int
+    job_id: int
+    reason: str | None = None
+    pending: bool = False
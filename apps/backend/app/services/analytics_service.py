@@ -0,0 +1,106 @@
+import json
+from typing import Callable, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.interview import InterviewMessage, InterviewAnswerScore, InterviewSessionAnalytics
+
+DIMENSIONS = ["clarity", "coherence", "confidence", "technical_depth", "engagement"]
+
+
+def _locked_analytics(db, session_id: int) -> InterviewSessionAnalytics:
+    row = (
+        db.query(InterviewSessionAnalytics)
+        .filter(InterviewSessionAnalytics.session_id == session_id)
+        .with_for_update()
+        .first()
+    )
+    if row is None:
+        row = InterviewSessionAnalytics(
+            session_id=session_id, detailed_count=0, simple_count=0, simple_score_total=0,
+            trend="[]", **{f"{d}_sum": 0 for d in DIMENSIONS}
+        )
+        db.add(row)
+        db.flush()
+    return row
+
+
+def _apply_score(agg: InterviewSessionAnalytics, kind: str, scores: dict):
+    if kind == "detailed":
+        agg.detailed_count += 1
+        for d in DIMENSIONS:
+            setattr(agg, f"{d}_sum", getattr(agg, f"{d}_sum") + scores[d])
+        trend = json.loads(agg.trend or "[]")
+        trend.append(scores["average_score"])
+        agg.trend = json.dumps(trend)
+    else:
+        agg.simple_count += 1
+        agg.simple_score_total += scores["sub_score"]
+
+
+def record_answer_score(session_id: int, message: str, kind: str, question: str = None, **scores):
+    """
+    Save the audit message, the typed score row and the updated session
+    aggregates in one transaction.
+    kind="simple":   sub_score, feedback
+    kind="detailed": clarity..engagement, average_score, feedback
+    """
+    return record_answer_scores(session_id, [(message, kind, question, scores)])[0]
+
+
+def record_answer_scores(session_id: int, items: list[tuple],
+                         guard: Optional[Callable[[Session], bool]] = None) -> list[int] | None:
+    """Bulk variant: items are (message, kind, question, scores) in answer order;
+    every row and the aggregates update land in a single transaction.
+    guard(db) runs in that transaction before the commit; when it returns False
+    nothing is written and None is returned."""
+    for attempt in range(2):
+        db = SessionLocal()
+        try:
+            msgs = [InterviewMessage(session_id=session_id, role="system", content=message)
+                    for message, _, _, _ in items]
+            db.add_all(msgs)
+            db.flush()
+            agg = _locked_analytics(db, session_id)
+            for msg, (_, kind, question, scores) in zip(msgs, items):
+                db.add(InterviewAnswerScore(session_id=session_id, message_id=msg.id, kind=kind,
+                                            question=question, **scores))
+                _apply_score(agg, kind, scores)
+
+            if guard is not None and not guard(db):
+                db.rollback()
+                return None
+            db.commit()
+            return [msg.id for msg in msgs]
+        except IntegrityError:
+            # two first scores raced to create the aggregates row; retry once
+            db.rollback()
+            if attempt:
+                raise
+        finally:
+            db.close()
+
+
+def get_session_analytics(session_id: int) -> dict | None:
+    """Radar-chart payload from the single aggregates row."""
+    db = SessionLocal()
+    try:
+        agg = db.query(InterviewSessionAnalytics).get(session_id)
+        if agg is None:
+            return None
+        n = agg.detailed_count
+        means = {d: round(getattr(agg, f"{d}_sum") / n, 2) if n else None for d in DIMENSIONS}
+        trend = json.loads(agg.trend or "[]")
+        return {
+            "session_id": session_id,
+            "labels": DIMENSIONS,
+            "means": means,
+            "overall_average": round(sum(trend) / len(trend), 2) if trend else None,
+            "detailed_answers": n,
+            "simple_answers": agg.simple_count,
+            "total_score": agg.simple_score_total,
+            "trend": trend,
+            "trend_delta": round(trend[-1] - trend[0], 2) if len(trend) > 1 else 0.0,
+        }
+    finally:
+        db.close()
@@ -0,0 +1,343 @@
+"""
+Deferred batch scoring for sessions with scoring_mode="batch".
+
+Live /score_answer and /analyze_answer_detailed calls skip the LLM for these
+sessions. When the interview completes, the session is marked "queued"; a
+worker then scores every answer of the transcript in ONE structured LLM call
+(simple sub-score plus the five detailed dimensions per answer), writes all
+score rows and the aggregates in one transaction, and notifies the client:
+GET /api/interview/{id}/scores reports the status, and scoring_callback_url,
+when set, receives the same payload as a POST. Callback URLs are restricted to
+BATCH_SCORING_CALLBACK_SCHEMES and BATCH_SCORING_CALLBACK_HOSTS (checked when
+the session is created and again before posting, redirects are not followed);
+with no hosts configured, callbacks are refused.
+
+Queued sessions are claimed atomically (queued -> running, with a lease of
+BATCH_SCORING_LEASE_SECONDS), so the completion background task and the
+periodic sweep in app.main never score a session twice; a RUNNING row whose
+lease ran out (worker crash) is claimed again. Each claim owns the attempt
+number it set: the score rows and the DONE transition are written in one
+transaction only while the row is still RUNNING with that attempt, so a run
+that outlived its lease discards its results instead of writing them twice. Failed runs are requeued with
+exponential backoff: admission rejections and an open circuit always retry,
+other errors give up (FAILED) after BATCH_SCORING_MAX_ATTEMPTS runs.
+
+    python -m app.services.batch_scoring            # score everything queued now
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+import requests
+from sqlalchemy import and_, or_
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging_config import bind_session, log_payload, setup_logging
+from app.core.metrics import instrument
+from app.models.interview import InterviewAnswerScore, InterviewSession
+from app.services.analytics_service import record_answer_scores
+from app.services.interviewer_service import (
+    DETAILED_DIMENSIONS, _gen_with_retry, _record_cohort_metric, parse_batch_evaluation, resume_context,
+)
+from app.services.llm_breaker import LLMUnavailable
+from app.services.llm_limiter import LLMRateLimited
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _claimable(now: datetime):
+    """Queued and due, or running with an expired lease and attempts left."""
+    return or_(
+        and_(
+            InterviewSession.batch_scoring_status == QUEUED,
+            or_(InterviewSession.batch_scoring_due_at.is_(None), InterviewSession.batch_scoring_due_at <= now),
+        ),
+        and_(
+            InterviewSession.batch_scoring_status == RUNNING,
+            InterviewSession.batch_scoring_due_at < now,
+            InterviewSession.batch_scoring_attempts < settings.BATCH_SCORING_MAX_ATTEMPTS,
+        ),
+    )
+
+
+def _claim(session_id: int) -> int | None:
+    """Claim the session; returns the attempt number that owns the lease, or None."""
+    now = _now()
+    db = SessionLocal()
+    try:
+        claimed = (
+            db.query(InterviewSession)
+            .filter(InterviewSession.id == session_id, _claimable(now))
+            .update({
+                InterviewSession.batch_scoring_status: RUNNING,
+                InterviewSession.batch_scoring_due_at: now + timedelta(seconds=settings.BATCH_SCORING_LEASE_SECONDS),
+                InterviewSession.batch_scoring_attempts: InterviewSession.batch_scoring_attempts + 1,
+            }, synchronize_session=False)
+        )
+        if not claimed:
+            db.rollback()
+            return None
+        attempt = db.query(InterviewSession.batch_scoring_attempts).filter(
+            InterviewSession.id == session_id).scalar()
+        db.commit()
+        return attempt
+    finally:
+        db.close()
+
+
+def _update_status(db, session_id: int, status: str, due_at: datetime | None = None,
+                   attempt: int | None = None) -> bool:
+    """With `attempt`, only while that claim still owns the row; False if it does not."""
+    query = db.query(InterviewSession).filter(InterviewSession.id == session_id)
+    if attempt is not None:
+        query = query.filter(InterviewSession.batch_scoring_status == RUNNING,
+                             InterviewSession.batch_scoring_attempts == attempt)
+    updated = query.update(
+        {InterviewSession.batch_scoring_status: status, InterviewSession.batch_scoring_due_at: due_at},
+        synchronize_session=False
+    )
+    return bool(updated)
+
+
+def _set_status(session_id: int, status: str, due_at: datetime | None = None,
+                attempt: int | None = None) -> bool:
+    db = SessionLocal()
+    try:
+        updated = _update_status(db, session_id, status, due_at, attempt)
+        db.commit()
+        return updated
+    finally:
+        db.close()
+
+
+def _retry_delay(attempts: int) -> float:
+    return min(settings.BATCH_SCORING_RETRY_MAX_SECONDS,
+               settings.BATCH_SCORING_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+def _requeue_or_fail(session_id: int, attempt: int, error: Exception, transient: bool):
+    if not transient and attempt >= settings.BATCH_SCORING_MAX_ATTEMPTS:
+        logger.error("Batch scoring failed after %d attempts: %s", attempt, error)
+        _set_status(session_id, FAILED, attempt=attempt)
+        return
+    delay = _retry_delay(attempt)
+    if isinstance(error, LLMRateLimited):
+        delay = max(delay, error.retry_after)
+    logger.warning("Batch scoring attempt %d failed, retrying in %.0fs: %s", attempt, delay, error)
+    _set_status(session_id, QUEUED, due_at=_now() + timedelta(seconds=delay), attempt=attempt)
+
+
+def _transcript(messages: list) -> list[tuple[str, str]]:
+    """(question, answer) pairs in order; an answer belongs to the latest question before it."""
+    pairs, question = [], None
+    for m in sorted(messages, key=lambda m: m.id):
+        if m.role == "interviewer":
+            question = m.content
+        elif m.role == "candidate" and question is not None:
+            pairs.append((question, m.content))
+            question = None
+    return pairs
+
+
+def _build_prompt(profile: str, pairs: list[tuple[str, str]]) -> str:
+    answers = "\n\n".join(f"[answer={i}]\nQuestion: {q}\nAnswer: {a}" for i, (q, a) in enumerate(pairs, start=1))
+    return f"""
+    You are an expert interview assessor. Score EVERY answer of this interview transcript.
+
+    For each answer give:
+    - sub_score: overall quality 0-20
+    - clarity, coherence, confidence, technical_depth, engagement: 0-20 each
+    - feedback: 1 short sentence of constructive feedback
+
+    Candidate profile:
+    {profile}
+
+    Transcript:
+    {answers}
+
+    Return STRICT JSON ONLY (no prose), one entry per answer, shape:
+    {{"answers": [{{"index": 1, "sub_score": <0-20>, "clarity": <0-20>, "coherence": <0-20>,
+      "confidence": <0-20>, "technical_depth": <0-20>, "engagement": <0-20>, "feedback": "<sentence>"}}, ...]}}
+    """
+
+
+@instrument("batch_score")
+def score_session(session_id: int) -> dict | None:
+    """Score a queued session; None if another worker claimed it (before or during the run)."""
+    attempt = _claim(session_id)
+    if attempt is None:
+        return None
+    bind_session(session_id)
+    try:
+        db = SessionLocal()
+        try:
+            session = db.query(InterviewSession).get(session_id)
+            pairs = _transcript(session.messages)
+            profile = resume_context(session, limit=1500)
+        finally:
+            db.close()
+
+        if pairs:
+            response = _gen_with_retry(_build_prompt(profile, pairs))
+            log_payload(logger, "Batch scoring raw output", response.text)
+            results = parse_batch_evaluation(response.text or "", len(pairs))
+            items = []
+            for (question, _), r in zip(pairs, results):
+                items.append((f"Feedback: {r['feedback']} (Score: {r['sub_score']}/20)", "simple", question,
+                              {"sub_score": r["sub_score"], "feedback": r["feedback"]}))
+                items.append((
+                    f"[DetailedEval] C:{r['clarity']} Co:{r['coherence']} Conf:{r['confidence']} "
+                    f"Tech:{r['technical_depth']} Eng:{r['engagement']} | Avg:{r['average_score']} | {r['feedback']}",
+                    "detailed", question,
+                    {**{d: r[d] for d in DETAILED_DIMENSIONS}, "average_score": r["average_score"],
+                     "feedback": r["feedback"]},
+                ))
+            # scores and DONE commit together, only while this claim still owns the row
+            done = record_answer_scores(
+                session_id, items, guard=lambda db: _update_status(db, session_id, DONE, attempt=attempt)
+            ) is not None
+        else:
+            done = _set_status(session_id, DONE, attempt=attempt)
+        if not done:
+            logger.warning("Batch scoring lease of attempt %d was reclaimed, results discarded", attempt)
+            return None
+        _record_cohort_metric(session_id, "interview_avg")
+        logger.info("Batch scoring done (%d answers in one call)", len(pairs))
+    except (LLMRateLimited, LLMUnavailable) as e:
+        _requeue_or_fail(session_id, attempt, e, transient=True)
+    except Exception as e:
+        logger.exception("Batch scoring failed: %s", e)
+        _requeue_or_fail(session_id, attempt, e, transient=False)
+    finally:
+        bind_session(None)
+
+    payload = session_scores(session_id)
+    if payload["status"] in (DONE, FAILED):
+        _notify(payload)
+    return payload
+
+
+def _csv(value: str) -> set[str]:
+    return {part.strip().lower() for part in value.split(",") if part.strip()}
+
+
+def callback_allowed(url: str) -> bool:
+    """Only allowlisted scheme + host pairs: the URL comes from an unauthenticated request."""
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        return False
+    if parts.username or parts.password:
+        return False
+    return (parts.scheme.lower() in _csv(settings.BATCH_SCORING_CALLBACK_SCHEMES)
+            and host in _csv(settings.BATCH_SCORING_CALLBACK_HOSTS))
+
+
+def _notify(payload: dict):
+    db = SessionLocal()
+    try:
+        url = db.query(InterviewSession.scoring_callback_url).filter(
+            InterviewSession.id == payload["session_id"]).scalar()
+    finally:
+        db.close()
+    if not url:
+        return
+    if not callback_allowed(url):
+        logger.warning("Scoring callback host not allowed, skipped", extra={"session_id": payload["session_id"]})
+        return
+    try:
+        requests.post(url, json=payload, timeout=settings.BATCH_SCORING_CALLBACK_TIMEOUT, allow_redirects=False)
+    except requests.RequestException as e:
+        logger.warning("Scoring callback to %s failed: %s", url, e, extra={"session_id": payload["session_id"]})
+
+
+def session_scores(session_id: int) -> dict | None:
+    """Scoring status plus the per-answer scores recorded so far (live or batch)."""
+    db = SessionLocal()
+    try:
+        session = db.query(InterviewSession).get(session_id)
+        if session is None:
+            return None
+        rows = (
+            db.query(InterviewAnswerScore)
+            .filter(InterviewAnswerScore.session_id == session_id)
+            .order_by(InterviewAnswerScore.id)
+            .all()
+        )
+        return {
+            "session_id": session_id,
+            "scoring_mode": session.scoring_mode,
+            "status": session.batch_scoring_status or "live",
+            "answers": [{
+                "kind": r.kind,
+                "question": r.question,
+                "sub_score": r.sub_score,
+                **{d: getattr(r, d) for d in DETAILED_DIMENSIONS},
+                "average_score": r.average_score,
+                "feedback": r.feedback,
+            } for r in rows],
+        }
+    finally:
+        db.close()
+
+
+def queued_sessions(limit: int = 20) -> list[int]:
+    """Sessions ready to be claimed (due retries and expired leases included)."""
+    db = SessionLocal()
+    try:
+        return [sid for (sid,) in (
+            db.query(InterviewSession.id)
+            .filter(_claimable(_now()))
+            .order_by(InterviewSession.id)
+            .limit(limit)
+        )]
+    finally:
+        db.close()
+
+
+def fail_exhausted_leases() -> int:
+    """RUNNING rows whose lease expired with no attempts left (repeated worker crashes)."""
+    db = SessionLocal()
+    try:
+        rows = db.query(InterviewSession.id, InterviewSession.batch_scoring_attempts).filter(
+            InterviewSession.batch_scoring_status == RUNNING,
+            InterviewSession.batch_scoring_due_at < _now(),
+            InterviewSession.batch_scoring_attempts >= settings.BATCH_SCORING_MAX_ATTEMPTS,
+        ).all()
+    finally:
+        db.close()
+    failed = 0
+    for session_id, attempt in rows:
+        # a late last attempt may still finish first; then its result stands
+        if not _set_status(session_id, FAILED, attempt=attempt):
+            continue
+        logger.error("Batch scoring lease expired after the last attempt", extra={"session_id": session_id})
+        _notify(session_scores(session_id))
+        failed += 1
+    return failed
+
+
+def run_pending() -> int:
+    """Score every claimable session; returns how many this worker scored."""
+    fail_exhausted_leases()
+    scored, seen = 0, set()
+    while True:
+        ids = [sid for sid in queued_sessions() if sid not in seen]  # retries wait for the next sweep
+        if not ids:
+            return scored
+        for session_id in ids:
+            seen.add(session_id)
+            result = score_session(session_id)
+            if result is not None and result["status"] == DONE:
+                scored += 1
+
+
+if __name__ == "__main__":
+    setup_logging()
+    print({"scored": run_pending()})
@@ -0,0 +1,207 @@
+"""
+Cohort percentile ranking backed by KLL quantile sketches.
+
+Each (cohort, metric) pair owns one cohort_sketches row. Cohorts are the target
+job, the candidate domain, the interview month and "all". Metrics:
+  - resume_score:  InterviewSession.score, recorded when the session is created
+  - interview_avg: mean answer score (0-20), recorded when the interview completes
+
+Percentile lookups read one small row per cohort instead of sorting all sessions.
+
+Rebuild from existing rows:  python -m app.services.cohort_service --backfill
+"""
+import argparse
+import json
+from collections import defaultdict
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging_config import setup_logging
+from app.models.cohort import CohortSketch
+from app.models.interview import InterviewSession, InterviewSessionAnalytics
+from app.services.quantile_sketch import KLLSketch
+
+METRICS = ("resume_score", "interview_avg")
+
+
+def session_cohorts(session: InterviewSession) -> list[tuple[str, str]]:
+    cohorts = [("all", "*")]
+    if session.job_id:
+        cohorts.append(("job", str(session.job_id)))
+    if session.domain:
+        cohorts.append(("domain", session.domain.strip().lower()))
+    if session.created_at:
+        cohorts.append(("month", session.created_at.strftime("%Y-%m")))
+    return cohorts
+
+
+def _interview_average(agg: Optional[InterviewSessionAnalytics]) -> Optional[float]:
+    if agg is None:
+        return None
+    trend = json.loads(agg.trend or "[]")
+    if trend:
+        return sum(trend) / len(trend)
+    if agg.simple_count:
+        return agg.simple_score_total / agg.simple_count
+    return None
+
+
+def _metric_value(db, session: InterviewSession, metric: str) -> Optional[float]:
+    if metric == "resume_score":
+        return float(session.score) if session.score is not None else None
+    return _interview_average(db.query(InterviewSessionAnalytics).get(session.id))
+
+
+# ---------- Writes ----------
+def _merge_into_rows(updates: dict, replace: bool = False):
+    """updates: {(cohort_type, cohort_key, metric): KLLSketch}. Rows are locked while merged."""
+    for (cohort_type, cohort_key, metric), sketch in sorted(updates.items()):
+        for attempt in range(2):
+            db = SessionLocal()
+            try:
+                row = (
+                    db.query(CohortSketch)
+                    .filter_by(cohort_type=cohort_type, cohort_key=cohort_key, metric=metric)
+                    .with_for_update()
+                    .first()
+                )
+                if row is None:
+                    row = CohortSketch(cohort_type=cohort_type, cohort_key=cohort_key, metric=metric,
+                                       count=0, sketch=KLLSketch(settings.SKETCH_K).to_json())
+                    db.add(row)
+                merged = KLLSketch(settings.SKETCH_K) if replace else KLLSketch.from_json(row.sketch)
+                merged.merge(sketch)
+                row.sketch = merged.to_json()
+                row.count = merged.n
+                db.commit()
+                break
+            except IntegrityError:
+                # another worker created the row first; merge into theirs
+                db.rollback()
+                if attempt:
+                    raise
+            finally:
+                db.close()
+
+
+def record_session_metric(session_id: int, metric: str):
+    db = SessionLocal()
+    try:
+        session = db.query(InterviewSession).get(session_id)
+        if session is None:
+            return
+        value = _metric_value(db, session, metric)
+        cohorts = session_cohorts(session)
+    finally:
+        db.close()
+    if value is None:
+        return
+
+    updates = {}
+    for cohort_type, cohort_key in cohorts:
+        sketch = KLLSketch(settings.SKETCH_K)
+        sketch.update(value)
+        updates[(cohort_type, cohort_key, metric)] = sketch
+    _merge_into_rows(updates)
+
+
+# ---------- Reads ----------
+def percentile(cohort_type: str, cohort_key: str, metric: str, value: float) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        row = db.query(CohortSketch).filter_by(
+            cohort_type=cohort_type, cohort_key=cohort_key, metric=metric
+        ).first()
+    finally:
+        db.close()
+    if row is None or not row.count:
+        return None
+    return {
+        "cohort_type": cohort_type,
+        "cohort_key": cohort_key,
+        "metric": metric,
+        "value": value,
+        "percentile": round(KLLSketch.from_json(row.sketch).rank(value) * 100, 1),
+        "cohort_size": row.count,
+    }
+
+
+def session_percentiles(session_id: int) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        session = db.query(InterviewSession).get(session_id)
+        if session is None:
+            return None
+        values = {m: _metric_value(db, session, m) for m in METRICS}
+        cohorts = session_cohorts(session)
+    finally:
+        db.close()
+
+    ranks = []
+    for metric, value in values.items():
+        if value is None:
+            continue
+        for cohort_type, cohort_key in cohorts:
+            result = percentile(cohort_type, cohort_key, metric, value)
+            if result:
+                ranks.append(result)
+    return {"session_id": session_id, "percentiles": ranks}
+
+
+# ---------- Backfill ----------
+def _scores_final(session: InterviewSession) -> bool:
+    """Completed, and for batch scoring also scored (mirrors when interview_avg is recorded live)."""
+    if session.status != "completed":
+        return False
+    return session.scoring_mode != "batch" or session.batch_scoring_status == "done"
+
+
+def backfill(chunk_size: int = 1000) -> dict:
+    """Rebuild every sketch from interview_sessions (keyset-paginated) and replace the rows."""
+    sketches = defaultdict(lambda: KLLSketch(settings.SKETCH_K))
+    db = SessionLocal()
+    sessions_seen, last_id = 0, 0
+    try:
+        while True:
+            rows = (
+                db.query(InterviewSession, InterviewSessionAnalytics)
+                .outerjoin(InterviewSessionAnalytics,
+                           InterviewSessionAnalytics.session_id == InterviewSession.id)
+                .filter(InterviewSession.id > last_id)
+                .order_by(InterviewSession.id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0].id
+            for session, agg in rows:
+                sessions_seen += 1
+                values = {
+                    "resume_score": float(session.score) if session.score is not None else None,
+                    # the live path records it only once the interview's scores are final
+                    "interview_avg": _interview_average(agg) if _scores_final(session) else None,
+                }
+                for cohort_type, cohort_key in session_cohorts(session):
+                    for metric, value in values.items():
+                        if value is not None:
+                            sketches[(cohort_type, cohort_key, metric)].update(value)
+            db.expunge_all()
+    finally:
+        db.close()
+
+    _merge_into_rows(dict(sketches), replace=True)
+    return {"sessions": sessions_seen, "sketches": len(sketches)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cohort quantile sketches.")
+    parser.add_argument("--backfill", action="store_true", help="rebuild all sketches from existing sessions")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    setup_logging()
+    if args.backfill:
+        print(backfill(chunk_size=args.chunk_size))
+    else:
+        parser.print_help()
@@ -0,0 +1,164 @@
+"""
+Near-duplicate job detection with MinHash + LSH.
+
+Each job gets a MinHash signature over word shingles of its normalized title,
+company and description. The signature is split into bands; jobs that share a
+band bucket are candidates, and a candidate whose estimated Jaccard similarity
+is >= DEDUP_THRESHOLD becomes the job's canonical. Only canonical jobs are
+bucketed and embedded, so duplicates never reach the vector index.
+
+Cluster existing rows:  python -m app.services.dedup_service --backfill
+(ends with a reconcile pass: vectors of new duplicates are dropped and new
+canonicals embedded)
+"""
+import argparse
+import hashlib
+import html
+import json
+import random
+import re
+from typing import Optional
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging_config import setup_logging
+from app.models.job import JobPosting, JobLSHBucket
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+_rng = random.Random(1337)  # fixed seed: signatures must be stable across processes
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(settings.DEDUP_NUM_PERM)]
+_ROWS_PER_BAND = settings.DEDUP_NUM_PERM // settings.DEDUP_BANDS
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# ---------- Signatures ----------
+def _normalize(text: str) -> list[str]:
+    text = html.unescape(_TAG_RE.sub(" ", text or "")).lower()
+    return _WORD_RE.findall(text)
+
+
+def shingles(title: str, company: Optional[str], description: str, size: int = 3) -> set[str]:
+    words = _normalize(f"{title} {company or ''} {description}")
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(items: set[str]) -> list[int]:
+    if not items:
+        return [_MAX_HASH] * len(_PERMS)
+    base = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in items]
+    return [min((a * x + b) % _PRIME for x in base) for a, b in _PERMS]
+
+
+def job_signature(job: JobPosting) -> list[int]:
+    return minhash(shingles(job.title, job.company, job.description))
+
+
+def similarity(sig_a: list[int], sig_b: list[int]) -> float:
+    """Estimated Jaccard similarity of the underlying shingle sets."""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def band_buckets(sig: list[int]) -> list[tuple[int, str]]:
+    out = []
+    for band in range(settings.DEDUP_BANDS):
+        rows = sig[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]
+        digest = hashlib.blake2b(",".join(map(str, rows)).encode(), digest_size=8).hexdigest()
+        out.append((band, digest))
+    return out
+
+
+# ---------- Clustering ----------
+def assign_cluster(db: Session, job: JobPosting) -> Optional[int]:
+    """
+    Compute the job's signature and attach it to a canonical near-duplicate, or
+    register it as a canonical itself. The job must already have an id (flush
+    first). Returns the canonical id when the job is a duplicate, else None.
+    """
+    sig = job_signature(job)
+    job.minhash = json.dumps(sig)
+    buckets = band_buckets(sig)
+
+    # re-clustering an updated job: drop its previous buckets first
+    db.query(JobLSHBucket).filter(JobLSHBucket.job_id == job.id).delete(synchronize_session=False)
+
+    candidate_ids = {
+        job_id for (job_id,) in db.query(JobLSHBucket.job_id).filter(
+            tuple_(JobLSHBucket.band, JobLSHBucket.bucket).in_(buckets)
+        )
+    }
+    candidate_ids.discard(job.id)
+
+    best_id, best_sim = None, 0.0
+    if candidate_ids:
+        for cand_id, cand_sig in db.query(JobPosting.id, JobPosting.minhash).filter(
+            JobPosting.id.in_(candidate_ids)
+        ):
+            sim = similarity(sig, json.loads(cand_sig or "[]"))
+            if sim > best_sim:
+                best_id, best_sim = cand_id, sim
+
+    if best_id is not None and best_sim >= settings.DEDUP_THRESHOLD:
+        job.canonical_job_id = best_id
+        db.flush()
+        return best_id
+
+    job.canonical_job_id = None
+    db.add_all([JobLSHBucket(band=band, bucket=bucket, job_id=job.id) for band, bucket in buckets])
+    # the session does not autoflush: make the buckets visible to later jobs in this batch
+    db.flush()
+    return None
+
+
+def backfill(chunk_size: int = 500) -> dict:
+    """Cluster every job in id order (earliest posting becomes canonical)."""
+    db = SessionLocal()
+    report = {"jobs": 0, "duplicates": 0}
+    last_id = 0
+    try:
+        # start from scratch so the earliest posting of each cluster stays canonical
+        db.query(JobLSHBucket).delete(synchronize_session=False)
+        db.query(JobPosting).update({JobPosting.canonical_job_id: None}, synchronize_session=False)
+        db.flush()
+        while True:
+            jobs = (
+                db.query(JobPosting)
+                .filter(JobPosting.id > last_id)
+                .order_by(JobPosting.id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not jobs:
+                break
+            last_id = jobs[-1].id
+            for job in jobs:
+                report["jobs"] += 1
+                if assign_cluster(db, job) is not None:
+                    report["duplicates"] += 1
+            db.commit()
+            db.expunge_all()
+    finally:
+        db.close()
+    from app.services.reconcile_service import reconcile
+    sync = reconcile("jobs", chunk_size=chunk_size)
+    report["embedded"], report["vectors_deleted"] = sync["embedded"], sync["deleted"]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Near-duplicate job clustering.")
+    parser.add_argument("--backfill", action="store_true", help="cluster all existing jobs")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+    setup_logging()
+    if args.backfill:
+        print(backfill(args.chunk_size))
+    else:
+        parser.print_help()
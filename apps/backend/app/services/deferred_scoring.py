@@ -0,0 +1,117 @@
+"""
+Deferred answer scoring.
+
+While the LLM circuit is open, evaluate_answer / evaluate_detailed_answer
+store the answer in deferred_evaluations instead of returning a fake score.
+drain() replays them oldest first once the circuit closes (registered as a
+breaker listener), at startup, or by hand:
+
+    python -m app.services.deferred_scoring
+
+The replayed score is written exactly as a live one (record_answer_score).
+Entries failing DEFERRED_SCORING_MAX_ATTEMPTS times are dropped with an error log.
+"""
+import logging
+import threading
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging_config import bind_session, setup_logging
+from app.models.interview import DeferredEvaluation
+from app.services.llm_breaker import LLMUnavailable, breaker
+from app.services.llm_limiter import LLMRateLimited, batch_priority
+
+logger = logging.getLogger(__name__)
+
+_drain_lock = threading.Lock()
+_stopping = threading.Event()
+
+
+def stop_draining():
+    """Make a running drain() return after its current entry (app shutdown)."""
+    _stopping.set()
+
+
+def defer_evaluation(session_id: int, kind: str, question: str, answer: str) -> int:
+    db = SessionLocal()
+    try:
+        entry = DeferredEvaluation(session_id=session_id, kind=kind, question=question, answer=answer)
+        db.add(entry)
+        db.commit()
+        logger.info("Answer evaluation deferred (%s)", kind, extra={"session_id": session_id})
+        return entry.id
+    finally:
+        db.close()
+
+
+def pending_count() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(DeferredEvaluation).count()
+    finally:
+        db.close()
+
+
+def _evaluate(entry: DeferredEvaluation):
+    from app.services.interviewer_service import evaluate_answer, evaluate_detailed_answer
+    if entry.kind == "detailed":
+        evaluate_detailed_answer(entry.session_id, entry.question, entry.answer, degrade=False)
+    else:
+        evaluate_answer(entry.session_id, entry.question, entry.answer, degrade=False)
+
+
+@breaker.on_close
+def drain(chunk_size: int = 50) -> dict:
+    """Score queued answers until the queue is empty or the LLM fails again."""
+    if not _drain_lock.acquire(blocking=False):
+        return {"skipped": "drain already running"}
+    done = failed = 0
+    try:
+        with batch_priority():
+            last_id = 0
+            while True:
+                db = SessionLocal()
+                try:
+                    entries = (
+                        db.query(DeferredEvaluation)
+                        .filter(DeferredEvaluation.id > last_id)
+                        .order_by(DeferredEvaluation.id)
+                        .limit(chunk_size)
+                        .all()
+                    )
+                    if not entries:
+                        break
+                    for entry in entries:
+                        if _stopping.is_set():
+                            return {"scored": done, "failed": failed, "paused": True}
+                        last_id = entry.id
+                        bind_session(entry.session_id)
+                        try:
+                            _evaluate(entry)
+                        except (LLMUnavailable, LLMRateLimited) as e:
+                            logger.warning("Deferred scoring paused: %s", e)
+                            return {"scored": done, "failed": failed, "paused": True}
+                        except Exception as e:
+                            failed += 1
+                            entry.attempts += 1
+                            entry.last_error = str(e)
+                            if entry.attempts >= settings.DEFERRED_SCORING_MAX_ATTEMPTS:
+                                logger.error("Dropping deferred evaluation %s after %d attempts: %s",
+                                             entry.id, entry.attempts, e)
+                                db.delete(entry)
+                            db.commit()
+                            continue
+                        db.delete(entry)
+                        db.commit()
+                        done += 1
+                finally:
+                    db.close()
+        logger.info("Deferred scoring drained: %d scored, %d failed", done, failed)
+        return {"scored": done, "failed": failed, "paused": False}
+    finally:
+        bind_session(None)
+        _drain_lock.release()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    print(drain())
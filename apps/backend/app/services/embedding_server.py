@@ -0,0 +1,257 @@
+"""
+Local embedding server for multi-worker deployments.
+
+With `uvicorn --workers N` every worker would otherwise load its own copy of the
+sentence-transformer and its own torch thread pool (N models in memory, N×cores
+threads fighting for the CPU). Instead, one server process owns the model(s)
+and the API workers talk to it over a Unix socket:
+
+    python -m app.services.embedding_server            # listens on EMBEDDING_SOCKET
+    EMBEDDING_BACKEND=server uvicorn app.main:app --workers 4
+
+Requests from all connections are micro-batched: the batcher waits up to
+EMBEDDING_BATCH_WAIT_MS (or EMBEDDING_MAX_BATCH texts) and runs one encode per
+model. Torch runs with TORCH_NUM_THREADS threads in this process only.
+
+Wire format, both directions: 8-byte header (JSON length, payload length, big
+endian), a JSON object, then a binary payload. Vectors travel as little-endian
+float32 rows: {"n": rows, "dim": dim} + n*dim*4 bytes.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from array import array
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">II")
+
+
+class EmbeddingServerError(RuntimeError):
+    """The embedding server rejected a request or could not be reached."""
+
+
+# ---------- framing ----------
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("embedding server connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def send_frame(sock: socket.socket, header: dict, payload: bytes = b""):
+    body = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body), len(payload)) + body + payload)
+
+
+def recv_frame(sock: socket.socket) -> tuple[dict, bytes]:
+    header_len, payload_len = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    header = json.loads(_recv_exact(sock, header_len))
+    return header, _recv_exact(sock, payload_len) if payload_len else b""
+
+
+# ---------- server ----------
+class _Pending:
+    __slots__ = ("model", "texts", "done", "vectors", "error")
+
+    def __init__(self, model: str, texts: list[str]):
+        self.model = model
+        self.texts = texts
+        self.done = threading.Event()
+        self.vectors = None
+        self.error = None
+
+
+class MicroBatcher(threading.Thread):
+    """Coalesces concurrent encode requests into one model call per model."""
+
+    def __init__(self, max_batch: int, wait: float):
+        super().__init__(name="embed-batcher", daemon=True)
+        self.max_batch = max_batch
+        self.wait = wait
+        self.requests = queue.Queue()
+
+    def submit(self, model: str, texts: list[str]):
+        item = _Pending(model, texts)
+        self.requests.put(item)
+        item.done.wait()
+        if item.error:
+            raise EmbeddingServerError(item.error)
+        return item.vectors
+
+    def run(self):
+        while True:
+            batch = [self.requests.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item.texts)
+            self._encode(batch)
+
+    def _encode(self, batch: list[_Pending]):
+        from app.services.embeddings_service import get_model
+        by_model = {}
+        for item in batch:
+            by_model.setdefault(item.model, []).append(item)
+        for model_name, items in by_model.items():
+            try:
+                texts = [t for item in items for t in item.texts]
+                vectors = get_model(model_name).encode(texts, batch_size=min(len(texts), 128))
+                start = 0
+                for item in items:
+                    item.vectors = vectors[start:start + len(item.texts)]
+                    start += len(item.texts)
+            except Exception as e:
+                logger.exception("Embedding batch failed for %s", model_name)
+                for item in items:
+                    item.error = str(e)
+            for item in items:
+                item.done.set()
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                header, _ = recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                if header.get("op") == "ping":
+                    from app.services.embeddings_service import _models
+                    send_frame(self.request, {"ok": True, "models": sorted(_models)})
+                    continue
+                vectors = self.server.batcher.submit(header.get("model") or settings.EMBEDDING_MODEL, header["texts"])
+                payload = vectors.astype("<f4").tobytes()
+                send_frame(self.request, {"ok": True, "n": len(vectors), "dim": int(vectors.shape[1]) if len(vectors) else 0},
+                           payload)
+            except Exception as e:
+                send_frame(self.request, {"ok": False, "error": str(e)})
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, batcher: MicroBatcher):
+        if os.path.exists(path):
+            os.remove(path)  # stale socket from a previous run
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o660)
+        self.batcher = batcher
+
+
+def serve(path: str = None, models: list[str] = None):
+    from app.services.embeddings_service import KINDS, active_model, get_model
+    path = path or settings.EMBEDDING_SOCKET
+    # load before binding: a connectable socket means the model is ready
+    for model_name in models or sorted({settings.EMBEDDING_MODEL, *(active_model(k) for k in KINDS)}):
+        get_model(model_name)
+        logger.info("Embedding model loaded: %s", model_name)
+    batcher = MicroBatcher(settings.EMBEDDING_MAX_BATCH, settings.EMBEDDING_BATCH_WAIT_MS / 1000)
+    batcher.start()
+    server = EmbeddingServer(path, batcher)
+    logger.info("Embedding server listening on %s", path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ---------- client ----------
+class EmbeddingClient:
+    """Thread-safe client with a small pool of persistent connections."""
+
+    def __init__(self, path: str, pool_size: int = 4, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        return sock
+
+    def _request(self, header: dict) -> tuple[dict, bytes]:
+        # a pooled connection may have been closed by a server restart: retry once on a fresh one
+        for attempt in range(2):
+            try:
+                sock = self._pool.get_nowait()
+            except queue.Empty:
+                try:
+                    sock = self._connect()
+                except OSError as e:
+                    raise EmbeddingServerError(f"embedding server unavailable at {self.path}: {e}") from e
+            try:
+                send_frame(sock, header)
+                response, payload = recv_frame(sock)
+            except (ConnectionError, OSError) as e:
+                sock.close()
+                if attempt:
+                    raise EmbeddingServerError(f"embedding server connection failed: {e}") from e
+                continue
+            try:
+                self._pool.put_nowait(sock)
+            except queue.Full:
+                sock.close()
+            if not response.get("ok"):
+                raise EmbeddingServerError(response.get("error", "unknown error"))
+            return response, payload
+
+    def encode(self, texts: list[str], model_name: str = None) -> list[list[float]]:
+        response, payload = self._request({"op": "encode", "model": model_name, "texts": list(texts)})
+        values = array("f")
+        values.frombytes(payload)
+        if sys.byteorder == "big":
+            values.byteswap()
+        dim = response["dim"]
+        return [values[i * dim:(i + 1) * dim].tolist() for i in range(response["n"])]
+
+    def ping(self) -> list[str]:
+        """Models loaded by the server; raises EmbeddingServerError when it is down."""
+        return self._request({"op": "ping"})[0]["models"]
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> EmbeddingClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = EmbeddingClient(settings.EMBEDDING_SOCKET, settings.EMBEDDING_POOL_SIZE)
+    return _client
+
+
+if __name__ == "__main__":
+    from app.core.logging_config import setup_logging
+    parser = argparse.ArgumentParser(description="Serve sentence-transformer embeddings over a Unix socket.")
+    parser.add_argument("--socket", default=settings.EMBEDDING_SOCKET)
+    parser.add_argument("--models", nargs="+", help="models to preload (default: configured + active ones)")
+    args = parser.parse_args()
+    setup_logging()
+    serve(args.socket, args.models)
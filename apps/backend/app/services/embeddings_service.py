@@ -1,32 +1,202 @@
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from app.core.config import settings
+from app.core.metrics import CHROMA_LATENCY, EMBED_BATCH_SIZE, EMBED_LATENCY, timed
 
-# Initialize Chroma client (persistent local store)
-chroma_client = chromadb.PersistentClient(path="chroma_data")
+logger = logging.getLogger(__name__)
 
-# Initialize the model
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# Persistent local Chroma store. sentence_transformers (torch) and chromadb take
+# seconds to import, so both are loaded on first use or by warmup(), never at
+# import time: the API binds its port immediately and /readyz reports when
+# the heavy parts are in place.
+CHROMA_PATH = "chroma_data"
+_chroma_client = None
+_chroma_lock = threading.Lock()
+
+
+def get_chroma_client():
+    global _chroma_client
+    if _chroma_client is None:
+        with _chroma_lock:
+            if _chroma_client is None:
+                import chromadb
+                _chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
+    return _chroma_client
+
+# ---------- Versioned collections ----------
+# Every embedding model gets its own collection per kind ("resumes__all-minilm-l6-v2"),
+# so vectors from different models never mix. Reads go to the *active* collection
+# recorded in INDEX_STATE_PATH; a re-embedding run fills a *pending* collection and
+# then switches the pointer atomically (see app.services.reembed_service).
+INDEX_STATE_PATH = os.path.join(CHROMA_PATH, "active_collections.json")
+KINDS = ("resumes", "jobs")
+
+# Collections created before versioning hold all-MiniLM-L6-v2 vectors
+_LEGACY_INDEX = {kind: {"model": "all-MiniLM-L6-v2", "collection": kind} for kind in KINDS}
+
+_state_lock = threading.Lock()
+_state_cache = {"mtime": None, "state": None}
+_models = {}
+_models_lock = threading.Lock()
+
+
+def collection_name(kind: str, model_name: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", model_name.split("/")[-1].lower()).strip("-")
+    return f"{kind}__{slug}"[:63]
+
+
+def _read_state() -> dict:
+    try:
+        mtime = os.path.getmtime(INDEX_STATE_PATH)
+    except OSError:
+        return {kind: {"active": dict(_LEGACY_INDEX[kind])} for kind in KINDS}
+    if _state_cache["mtime"] != mtime:
+        with open(INDEX_STATE_PATH) as f:
+            _state_cache["state"] = json.load(f)
+        _state_cache["mtime"] = mtime
+    return json.loads(json.dumps(_state_cache["state"]))
+
+
+def _write_state(state: dict):
+    # write-then-rename keeps the switch atomic for readers in other processes
+    os.makedirs(CHROMA_PATH, exist_ok=True)
+    tmp_path = f"{INDEX_STATE_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, INDEX_STATE_PATH)
+
+
+def update_index_state(kind: str, fn):
+    """Apply fn(kind_state) under the state lock and persist the result"""
+    with _state_lock:
+        state = _read_state()
+        state.setdefault(kind, {"active": dict(_LEGACY_INDEX[kind])})
+        fn(state[kind])
+        _write_state(state)
+        return state[kind]
+
+
+def index_state(kind: str) -> dict:
+    return _read_state().get(kind) or {"active": dict(_LEGACY_INDEX[kind])}
+
+
+def get_model(model_name: str = None):
+    model_name = model_name or settings.EMBEDDING_MODEL
+    if model_name not in _models:
+        with _models_lock:
+            if model_name not in _models:
+                if settings.TORCH_NUM_THREADS > 0:
+                    import torch
+                    torch.set_num_threads(settings.TORCH_NUM_THREADS)
+                from sentence_transformers import SentenceTransformer
+                _models[model_name] = SentenceTransformer(model_name)
+    return _models[model_name]
+
+
+def model_loaded(model_name: str = None) -> bool:
+    model_name = model_name or settings.EMBEDDING_MODEL
+    if settings.EMBEDDING_BACKEND == "server":
+        from app.services.embedding_server import EmbeddingServerError, get_client
+        try:
+            return model_name in get_client().ping()
+        except EmbeddingServerError:
+            return False
+    return model_name in _models
+
+
+def encode(texts: list[str], model_name: str = None, batch_size: int = 32) -> list[list[float]]:
+    label = model_name or settings.EMBEDDING_MODEL
+    EMBED_BATCH_SIZE.labels(model=label).observe(len(texts))
+    if settings.EMBEDDING_BACKEND == "server":
+        # the model lives in the shared embedding server process (app.services.embedding_server)
+        from app.services.embedding_server import get_client
+        with timed(EMBED_LATENCY, model=label):
+            return get_client().encode(texts, model_name=label)
+    model = get_model(model_name)
+    with timed(EMBED_LATENCY, model=label):
+        vectors = model.encode(texts, batch_size=batch_size)
+    return [v.tolist() for v in vectors]
+
+
+def get_collection(kind: str, pending: bool = False):
+    entry = index_state(kind)["pending" if pending else "active"]
+    return get_chroma_client().get_or_create_collection(name=entry["collection"])
+
+
+def active_model(kind: str) -> str:
+    return index_state(kind)["active"]["model"]
+
+
+def write_targets(kind: str) -> list[tuple]:
+    """(collection, model_name) pairs every write must reach: the active index, plus
+    the pending one while a re-embedding run is filling it."""
+    state = index_state(kind)
+    targets = [state["active"]]
+    if state.get("pending"):
+        targets.append(state["pending"])
+    return [
+        (get_chroma_client().get_or_create_collection(name=t["collection"]), t["model"])
+        for t in targets
+    ]
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of the embedded text, stored in vector metadata to detect drift"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def upsert_vectors(kind: str, ids: list[str], documents: list[str], metadatas: list[dict]):
+    """Embed and upsert documents into every write target of a kind"""
+    for col, model_name in write_targets(kind):
+        col.upsert(
+            ids=ids,
+            embeddings=encode(documents, model_name=model_name),
+            documents=documents,
+            metadatas=metadatas
+        )
 
-# Get or create the collection
-collection = chroma_client.get_or_create_collection(name="resumes")
 
 def add_resume_to_vector_db(resume_id: int, text_content: str):
     """Store resume embeddings persistently"""
-    embedding = model.encode(text_content)
-    collection.add(
+    upsert_vectors(
+        "resumes",
         ids=[str(resume_id)],
-        embeddings=[embedding.tolist()],
-        documents=[text_content]
+        documents=[text_content],
+        metadatas=[{"resume_id": resume_id, "content_hash": content_hash(text_content)}]
     )
-    print(f"✅ Resume {resume_id} embedded and saved in ChromaDB.")
+    logger.info("Resume %s embedded and saved in ChromaDB", resume_id)
     return {"message": f"Resume {resume_id} embedded successfully"}
 
 def query_similar_resumes(query_text: str, top_k: int = 3):
     """Retrieve similar resumes"""
-    query_embedding = model.encode(query_text)
-    results = collection.query(
-        query_embeddings=[query_embedding.tolist()],
-        n_results=top_k
-    )
+    query_embedding = encode([query_text], model_name=active_model("resumes"))[0]
+    with timed(CHROMA_LATENCY, collection="resumes"):
+        results = get_collection("resumes").query(
+            query_embeddings=[query_embedding],
+            n_results=top_k
+        )
     return results
+
+
+def warmup() -> dict:
+    """Load the active models, open Chroma and run one encode + query per kind,
+    so the first real request does not pay for it. Returns timings in ms."""
+    timings = {}
+    for kind in KINDS:
+        model_name = active_model(kind)
+        started = time.perf_counter()
+        vector = encode(["warmup"], model_name=model_name)[0]
+        timings[f"{kind}_encode_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        started = time.perf_counter()
+        col = get_collection(kind)
+        if col.count():
+            col.query(query_embeddings=[vector], n_results=1)
+        timings[f"{kind}_query_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
@@ -1,32 +1,57 @@
-import os, time, re, json
-import google.generativeai as genai
+import os, time, re, json, threading, logging
+from collections import OrderedDict
 from app.core.config import settings
 from app.models.interview import InterviewSession, InterviewMessage
 from app.core.database import SessionLocal
-
-# ===== GEMINI CONFIGURATION =====
-print("🔑 GEMINI_API_KEY loaded:", settings.GEMINI_API_KEY[:10] + "...")
-print("🧠 GEMINI_MODEL:", settings.GEMINI_MODEL)
-genai.configure(api_key=settings.GEMINI_API_KEY)
+from app.core.logging_config import log_payload
+from app.core.metrics import LLM_FALLBACKS, instrument, record_llm_attempt, record_llm_usage
+from app.services import llm_cache, question_bank, semantic_cache
+from app.services.deferred_scoring import defer_evaluation
+from app.services.llm_cache import PromptTemplate
+from app.services.llm_breaker import LLMUnavailable
+from app.services.llm_limiter import LLMRateLimited
+from app.services.llm_provider import get_llm
+from app.services.analytics_service import get_session_analytics, record_answer_score
+from app.services.cohort_service import record_session_metric
+
+logger = logging.getLogger(__name__)
+
+# ===== PROMPT TEMPLATES (bump the version whenever a prompt changes) =====
+ANALYZE_PROMPT = PromptTemplate("analyze_resume", 3)  # v3: fallbacks no longer cached
+SUMMARY_PROMPT = PromptTemplate("summarize_interview", 2)
+FINAL_SUMMARY_PROMPT = PromptTemplate("finalize_summary", 1)
 
 # ===== HELPER: RETRY WRAPPER =====
-def _gen_with_retry(model, prompt, retries=3, delay=2):
-    """Retry wrapper for Gemini API calls"""
+def _gen_with_retry(prompt, retries=3, delay=2):
+    """Retry wrapper for LLM calls (provider selected by LLM_PROVIDER)"""
+    return _call_with_retry(lambda: get_llm().generate(prompt), retries, delay)
+
+def _send_with_retry(chat, message, retries=3, delay=2):
+    """Retry wrapper for a turn in a Gemini ChatSession (history only grows on success)"""
+    return _call_with_retry(lambda: chat.send_message(message), retries, delay)
+
+def _call_with_retry(call, retries=3, delay=2):
     last_error = None
     for attempt in range(retries):
+        started = time.perf_counter()
         try:
-            print(f"🧠 Attempt {attempt+1}: Sending prompt to Gemini...")
-            response = model.generate_content(prompt)
-            print("✅ Gemini responded successfully.")
+            logger.debug("LLM call attempt %d", attempt + 1)
+            response = call()
+            record_llm_attempt(time.perf_counter() - started, ok=True)
+            record_llm_usage(response)
             return response
+        except (LLMRateLimited, LLMUnavailable):
+            raise  # admission control already waited / circuit open: retrying would only pile up
         except Exception as e:
-            print(f"⚠️ Gemini error on attempt {attempt+1}: {e}")
+            record_llm_attempt(time.perf_counter() - started, ok=False)
+            logger.warning("LLM error on attempt %d: %s", attempt + 1, e)
             last_error = e
             time.sleep(delay)
     raise last_error
 
 # ===== DATABASE HELPERS =====
-def create_session(candidate_name, resume_text, score, intro):
+def create_session(candidate_name, resume_text, score, intro, resume_digest=None,
+                   job_id=None, domain=None, scoring_mode="live", scoring_callback_url=None):
     """Create a new interview session in DB"""
     db = SessionLocal()
     try:
@@ -34,16 +59,35 @@ def create_session(candidate_name, resume_text, score, intro):
             candidate_name=candidate_name,
             resume_text=resume_text,
             score=score,
-            intro=intro
+            intro=intro,
+            resume_digest=json.dumps(resume_digest) if resume_digest else None,
+            job_id=job_id,
+            domain=domain,
+            scoring_mode=scoring_mode,
+            scoring_callback_url=scoring_callback_url
         )
         db.add(session)
         db.commit()
         db.refresh(session)
-        print(f"✅ Interview session created (ID: {session.id})")
-        return session
+        logger.info("Interview session created", extra={"session_id": session.id})
+    finally:
+        db.close()
+    _record_cohort_metric(session.id, "resume_score")
+    return session
+
+def _scoring_mode(session_id) -> str:
+    db = SessionLocal()
+    try:
+        return db.query(InterviewSession.scoring_mode).filter(InterviewSession.id == session_id).scalar() or "live"
     finally:
         db.close()
 
+def _record_cohort_metric(session_id, metric):
+    try:
+        record_session_metric(session_id, metric)
+    except Exception as e:
+        logger.warning("Could not update cohort sketches (%s) for session %s: %s", metric, session_id, e)
+
 def save_message(session_id, role, content):
     """Save interviewer/candidate messages"""
     db = SessionLocal()
@@ -52,18 +96,250 @@ def save_message(session_id, role, content):
         db.add(msg)
         db.commit()
         db.refresh(msg)
-        print(f"💬 Saved message ({role}) for session {session_id}")
+        logger.debug("Saved %s message for session %s", role, session_id)
         return msg
     finally:
         db.close()
 
+# ===== RESUME DIGEST =====
+# A compact, structured view of the resume extracted once at /analyze time and
+# stored on the session; later prompts use it instead of truncated raw text.
+def _normalize_digest(raw) -> dict | None:
+    if not isinstance(raw, dict):
+        return None
+
+    def _str_list(v, limit):
+        if isinstance(v, str):
+            v = [v]
+        if not isinstance(v, list):
+            return []
+        return [str(x).strip() for x in v if str(x).strip()][:limit]
+
+    try:
+        years = round(float(raw.get("years_experience") or 0), 1)
+    except (TypeError, ValueError):
+        years = 0
+    digest = {
+        "skills": _str_list(raw.get("skills"), 15),
+        "roles": _str_list(raw.get("roles"), 6),
+        "years_experience": max(0, min(years, 60)),
+        "highlights": _str_list(raw.get("highlights"), 5),
+    }
+    return digest if any([digest["skills"], digest["roles"], digest["highlights"]]) else None
+
+def digest_to_text(digest: dict) -> str:
+    """Render a digest as a short prompt block."""
+    return "\n".join([
+        f"Roles: {'; '.join(digest.get('roles') or []) or 'n/a'}",
+        f"Years of experience: {digest.get('years_experience', 'n/a')}",
+        f"Skills: {', '.join(digest.get('skills') or []) or 'n/a'}",
+        "Highlights:",
+        *[f"- {h}" for h in digest.get("highlights") or []],
+    ])
+
+def resume_context(session: InterviewSession, resume_text: str = "", limit: int = 1500) -> str:
+    """Digest text when the session has one, else the legacy truncated resume."""
+    if session is not None and session.resume_digest:
+        try:
+            return digest_to_text(json.loads(session.resume_digest))
+        except (TypeError, ValueError):
+            pass
+    text = resume_text or (session.resume_text if session is not None else "")
+    return (text or "")[:limit]
+
+def get_resume_context(session_id: int, resume_text: str = "", limit: int = 2000) -> str:
+    db = SessionLocal()
+    try:
+        return resume_context(db.query(InterviewSession).get(session_id), resume_text, limit)
+    finally:
+        db.close()
+
+# ===== OUTPUT PARSING (parse + clamp raw model text) =====
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_LOOSE_SCORE_RE = re.compile(r'"?score"?\s*[:\-]?\s*(\d{1,3})', re.IGNORECASE)
+_LOOSE_INTRO_RE = re.compile(r'"?intro"?\s*[:\-]?\s*(.*)', re.IGNORECASE | re.DOTALL)
+_SIMPLE_SCORE_RE = re.compile(r"Score\s*\(0-20\)\s*:\s*(\d+)")
+_SIMPLE_FEEDBACK_RE = re.compile(r"Feedback\s*:\s*(.*)")
+DETAILED_DIMENSIONS = ("clarity", "coherence", "confidence", "technical_depth", "engagement")
+
+def _clamp_int(value, low: int, high: int, default: int) -> int:
+    try:
+        return max(low, min(int(value), high))
+    except Exception:
+        return default
+
+def parse_resume_analysis(text: str) -> tuple[int, str, dict | None]:
+    """(score 0-100, intro, digest) from the analyze prompt output; tolerates non-JSON replies."""
+    json_match = _JSON_OBJECT_RE.search(text)
+    if json_match:
+        parsed = json.loads(json_match.group(0))
+        score = int(parsed.get("score", 75))
+        intro = parsed.get("intro", "").strip()
+        digest = _normalize_digest(parsed.get("digest"))
+    else:
+        digest = None
+        score_match = _LOOSE_SCORE_RE.search(text)
+        intro_match = _LOOSE_INTRO_RE.search(text)
+        score = int(score_match.group(1)) if score_match else 75
+        intro = intro_match.group(1).strip() if intro_match else "No summary generated."
+    return max(0, min(score, 100)), intro, digest
+
+def resume_analysis_complete(text: str) -> bool:
+    """False when parse_resume_analysis fell back to its default score or intro."""
+    m = _JSON_OBJECT_RE.search(text)
+    try:
+        data = json.loads(m.group(0)) if m else None
+    except ValueError:
+        return False
+    if not isinstance(data, dict) or not str(data.get("intro") or "").strip():
+        return False
+    return _clamp_int(data.get("score"), 0, 100, None) is not None
+
+def parse_simple_evaluation(content: str) -> tuple[int, str]:
+    """(sub_score, feedback) from the 'Score (0-20): n / Feedback: ...' format."""
+    score_match = _SIMPLE_SCORE_RE.search(content)
+    feedback_match = _SIMPLE_FEEDBACK_RE.search(content)
+    sub_score = int(score_match.group(1)) if score_match else 10
+    feedback = feedback_match.group(1).strip() if feedback_match else "Good response."
+    return sub_score, feedback
+
+def simple_evaluation_complete(content: str) -> bool:
+    """False when parse_simple_evaluation fell back to its default score or feedback."""
+    return bool(_SIMPLE_SCORE_RE.search(content) and _SIMPLE_FEEDBACK_RE.search(content))
+
+def parse_detailed_evaluation(raw: str) -> dict:
+    """Per-dimension scores clamped to 0-20, their average and feedback. Raises if no JSON."""
+    m = _JSON_OBJECT_RE.search(raw)
+    if not m:
+        raise ValueError("No JSON found in model output")
+    data = json.loads(m.group(0))
+    scores = {d: _clamp_int(data.get(d, 10), 0, 20, 10) for d in DETAILED_DIMENSIONS}
+    feedback = (data.get("feedback") or "").strip() or "Good answer — consider adding a concrete example."
+    return {**scores, "average_score": round(sum(scores.values()) / len(scores), 2), "feedback": feedback}
+
+def detailed_evaluation_complete(raw: str) -> bool:
+    """False when parse_detailed_evaluation filled in a default dimension or feedback."""
+    m = _JSON_OBJECT_RE.search(raw)
+    try:
+        data = json.loads(m.group(0)) if m else None
+    except ValueError:
+        return False
+    if not isinstance(data, dict) or not (data.get("feedback") or "").strip():
+        return False
+    return all(_clamp_int(data.get(d), 0, 20, None) is not None for d in DETAILED_DIMENSIONS)
+
+def parse_batch_evaluation(raw: str, count: int) -> list[dict]:
+    """One dict per answer (sub_score plus the detailed dimensions) from the batch scoring
+    output {"answers": [{"index": 1, ...}, ...]}. Raises if an answer is missing."""
+    m = _JSON_OBJECT_RE.search(raw)
+    if not m:
+        raise ValueError("No JSON found in model output")
+    by_index = {}
+    for item in json.loads(m.group(0)).get("answers") or []:
+        if isinstance(item, dict):
+            by_index[_clamp_int(item.get("index"), 0, count + 1, 0)] = item
+    missing = [i for i in range(1, count + 1) if i not in by_index]
+    if missing:
+        raise ValueError(f"Batch evaluation is missing answers {missing}")
+    results = []
+    for i in range(1, count + 1):
+        item = by_index[i]
+        parsed = parse_detailed_evaluation(json.dumps(item))
+        parsed["sub_score"] = _clamp_int(item.get("sub_score", round(parsed["average_score"])), 0, 20, 10)
+        results.append(parsed)
+    return results
+
+# ===== INTERVIEW CHAT SESSIONS =====
+# One Gemini ChatSession per interview, so every turn shares the same stable
+# prefix (interviewer instructions + candidate profile) and only the new answer
+# is added. Kept in an LRU; on a miss, or when another worker served a turn,
+# the chat is rebuilt from interview_messages.
+INTERVIEWER_PRIMER = """
+You are an experienced interviewer conducting a first-round interview.
+The candidate's resume was rated {score}/100.
+
+Candidate profile:
+{resume_ctx}
+
+Rules for every question you ask:
+- Only ONE question, no preamble
+- Friendly and conversational
+- Natural follow-ups on the candidate's answers; never repeat a question
+- Max 25 words
+
+Reply "Understood." to this message, then ask one question per turn.
+"""
+FIRST_TURN = "Ask the first question to begin the interview, focusing on motivation, career goals, or achievements."
+FOLLOW_UP_TURN = "Candidate's answer:\n{answer}\n\nAsk one natural follow-up question."
+
+_chat_sessions = OrderedDict()  # session_id -> (chat, interviewer_turns)
+_chat_lock = threading.Lock()
+
+def _history_from_messages(messages: list, primer: str) -> list[dict]:
+    history = [
+        {"role": "user", "parts": [primer]},
+        {"role": "model", "parts": ["Understood."]},
+    ]
+    pending_first = True
+    for m in sorted(messages, key=lambda m: m.id):
+        if m.role == "interviewer":
+            if pending_first and history[-1]["role"] == "model":
+                history.append({"role": "user", "parts": [FIRST_TURN]})
+            pending_first = False
+            role, text = "model", m.content
+        elif m.role == "candidate":
+            role, text = "user", FOLLOW_UP_TURN.format(answer=m.content)
+        else:
+            continue
+        if history[-1]["role"] == role:
+            # Gemini needs alternating turns; fold repeats into one
+            history[-1]["parts"][0] += "\n\n" + text
+        else:
+            history.append({"role": role, "parts": [text]})
+    if history[-1]["role"] == "user":
+        # the latest answer is sent as the new turn, not replayed from history
+        history.pop()
+    return history
+
+def _get_chat(session: InterviewSession, messages: list, resume_text: str, score: int):
+    interviewer_turns = sum(1 for m in messages if m.role == "interviewer")
+    with _chat_lock:
+        cached = _chat_sessions.get(session.id)
+        if cached and cached[1] == interviewer_turns:
+            _chat_sessions.move_to_end(session.id)
+            return cached[0]
+
+    primer = INTERVIEWER_PRIMER.format(score=score, resume_ctx=resume_context(session, resume_text))
+    chat = get_llm().start_chat(_history_from_messages(messages, primer))
+    logger.info("Chat session rebuilt for interview %s (%d prior questions)", session.id, interviewer_turns)
+    return chat
+
+def _remember_chat(session_id: int, chat, interviewer_turns: int):
+    with _chat_lock:
+        _chat_sessions[session_id] = (chat, interviewer_turns)
+        _chat_sessions.move_to_end(session_id)
+        while len(_chat_sessions) > settings.CHAT_SESSION_CACHE_SIZE:
+            _chat_sessions.popitem(last=False)
+
+def drop_chat(session_id: int):
+    with _chat_lock:
+        _chat_sessions.pop(session_id, None)
+
 # ===== 1️⃣ ANALYZE RESUME: AI-BASED SCORING =====
-def analyze_resume(resume_text: str):
+@instrument("analyze")
+def analyze_resume(resume_text: str, use_cache: bool = False):
     """Use AI to realistically evaluate the resume and generate a professional intro."""
-    print(f"📊 Analyzing resume (length: {len(resume_text)} chars)")
+    if use_cache:
+        # parser fallbacks (default score 75, "No summary generated.") are not stored
+        return llm_cache.cached(
+            ANALYZE_PROMPT, {"resume_text": resume_text},
+            lambda: analyze_resume(resume_text),
+            cacheable=lambda r: r.get("complete", False)
+        )
+
+    logger.info("Analyzing resume (%d chars)", len(resume_text))
 
     try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL)
         prompt = f"""
         You are an experienced HR recruiter and AI career evaluator.
         Analyze the following candidate resume carefully and evaluate their professional profile.
@@ -78,130 +354,176 @@ def analyze_resume(resume_text: str):
 
         2️⃣ Then write a short 2–3 sentence introduction describing the candidate's profile, strengths, and overall impression.
 
+        3️⃣ Extract a compact digest of the resume for the interviewer:
+            • skills: up to 15 key skills
+            • roles: up to 6 recent roles as "Title @ Company"
+            • years_experience: total professional years (number)
+            • highlights: up to 5 concrete achievements, one short line each
+
         🎯 Output strictly in this JSON format:
         {{
           "score": <number between 0 and 100>,
-          "intro": "<short professional introduction>"
+          "intro": "<short professional introduction>",
+          "digest": {{
+            "skills": ["<skill>", ...],
+            "roles": ["<title @ company>", ...],
+            "years_experience": <number>,
+            "highlights": ["<achievement>", ...]
+          }}
         }}
 
         Resume:
         {resume_text}
         """
 
-        response = _gen_with_retry(model, prompt)
+        response = _gen_with_retry(prompt)
         text = response.text.strip()
-        print("🧩 Gemini scoring raw output:", text)
-
-        # Try to extract JSON response
-        json_match = re.search(r'\{.*\}', text, re.DOTALL)
-        if json_match:
-            parsed = json.loads(json_match.group(0))
-            score = int(parsed.get("score", 75))
-            intro = parsed.get("intro", "").strip()
-        else:
-            score_match = re.search(r'"?score"?\s*[:\-]?\s*(\d{1,3})', text, re.IGNORECASE)
-            intro_match = re.search(r'"?intro"?\s*[:\-]?\s*(.*)', text, re.IGNORECASE | re.DOTALL)
-            score = int(score_match.group(1)) if score_match else 75
-            intro = intro_match.group(1).strip() if intro_match else "No summary generated."
+        log_payload(logger, "Gemini scoring raw output", text)
 
-        score = max(0, min(score, 100))  # Clamp safely
+        score, intro, digest = parse_resume_analysis(text)
+        logger.info("Resume scored: %d", score)
 
-        print(f"✅ Final extracted score: {score}")
-        print(f"✅ Final intro: {intro}")
-
-        return {"score": score, "intro": intro}
+        return {"score": score, "intro": intro, "digest": digest, "complete": resume_analysis_complete(text)}
 
+    except LLMRateLimited:
+        raise
     except Exception as e:
-        print(f"❌ Error analyzing resume: {e}")
+        logger.exception("Error analyzing resume: %s", e)
         return {"error": str(e)}
 
 # ===== 2️⃣ GENERATE FIRST OR NEXT QUESTION =====
+# Striped per-process locks serialize turns of the same session in a worker.
+# Across workers a row lock guards the question count read and, separately,
+# the save of the new question: it is released while the LLM is called (that
+# can take minutes of retries and rate-limit waits, and must not pin a pooled
+# connection), and the count is re-checked before saving.
+_SESSION_LOCKS = [threading.Lock() for _ in range(64)]
+MAX_QUESTION_ATTEMPTS = 3
+
+def _lock_session(db, session_id: int) -> InterviewSession:
+    # FOR NO KEY UPDATE: blocks concurrent turns in other workers without
+    # blocking the FK checks of message inserts
+    return (
+        db.query(InterviewSession)
+        .filter(InterviewSession.id == session_id)
+        .with_for_update(key_share=True)
+        .first()
+    )
+
+@instrument("next")
 def generate_next_question(session_id: int, resume_text: str, score: int, last_answer: str = None):
     """Generate the next interview question, enforcing a 5-question limit."""
+    with _SESSION_LOCKS[session_id % len(_SESSION_LOCKS)]:
+        return _generate_next_question_locked(session_id, resume_text, score, last_answer)
+
+def _generate_next_question_locked(session_id: int, resume_text: str, score: int, last_answer: str = None):
     db = SessionLocal()
     try:
-        session = db.query(InterviewSession).get(session_id)
-        model = genai.GenerativeModel(settings.GEMINI_MODEL)
-
-        previous_qs = [m.content for m in session.messages if m.role == "interviewer"]
+        session = _lock_session(db, session_id)
+        messages = list(session.messages)
+        previous_qs = [m.content for m in messages if m.role == "interviewer"]
         question_count = len(previous_qs)
-        print(f"🧾 Current question count: {question_count}")
+        logger.debug("Current question count: %d", question_count)
 
         # ✅ Stop at 5 questions
         if question_count >= 5:
-            print("✅ Interview limit reached (5 questions).")
+            logger.info("Interview limit reached (5 questions)")
             closing_message = (
                 "🤖 Thank you for completing the interview! "
                 "Please hold on while I generate your performance summary..."
             )
-            save_message(session_id, "system", closing_message)
-            return {
+            db.add(InterviewMessage(session_id=session_id, role="system", content=closing_message))
+            newly_completed = session.status != "completed"
+            session.status = "completed"
+            batch = session.scoring_mode == "batch"
+            if batch and newly_completed:
+                session.batch_scoring_status = "queued"  # picked up by batch_scoring
+            db.commit()
+            drop_chat(session_id)
+            if newly_completed and not batch:
+                _record_cohort_metric(session_id, "interview_avg")
+            result = {
                 "completed": True,
                 "question": None,
                 "message": closing_message
             }
-
-        # Build the dynamic question prompt
-        if not last_answer:
-            prompt = f"""
-            You are an experienced interviewer conducting a first-round interview.
-            Based on this resume (score: {score}/100),
-            ask the first question to begin the interview.
-
-            Rules:
-            - Only ONE question
-            - Friendly and conversational
-            - Focus on motivation, career goals, or achievements
-            - Max 25 words
-
-            Resume:
-            {resume_text[:1500]}
-            """
-        else:
-            prev_text = "\n".join([f"- {q}" for q in previous_qs[-3:]])
-            prompt = f"""
-            Continue the interview (score: {score}/100).
-
-            Resume excerpt:
-            {resume_text[:1500]}
-
-            Previous questions:
-            {prev_text}
-
-            Candidate's last answer:
-            {last_answer}
-
-            TASK:
-            - Ask one natural follow-up question
-            - Avoid repetition
-            - Stay under 25 words
-            """
-
-        response = _gen_with_retry(model, prompt)
-        question = response.text.strip().split("\n")[0].lstrip("1234567890. -").strip()
-
-        if not question or question in previous_qs:
-            print("⚠️ Duplicate or empty question detected. Regenerating...")
-            return generate_next_question(session_id, resume_text, score, last_answer)
-
-        save_message(session_id, "interviewer", question)
-        print(f"🧩 New question: {question}")
+            if batch:
+                result["batch_scoring"] = session.batch_scoring_status
+            return result
+
+        # Only the new turn is sent; instructions and profile live in the chat history
+        chat = _get_chat(session, messages, resume_text, score)
+        turn = FOLLOW_UP_TURN.format(answer=last_answer) if last_answer and previous_qs else FIRST_TURN
+        fallback_ctx = resume_context(session, resume_text)
+        db.commit()  # release the row lock (and the connection) for the LLM call
+
+        question = None
+        degraded = False
+        try:
+            for _ in range(MAX_QUESTION_ATTEMPTS):
+                response = _send_with_retry(chat, turn)
+                question = response.text.strip().split("\n")[0].lstrip("1234567890. -").strip()
+                if question and question not in previous_qs:
+                    break
+                logger.warning("Duplicate or empty question detected, regenerating")
+                chat.rewind()
+                question = None
+        except LLMUnavailable:
+            # LLM circuit open: ask the closest unasked question from the local bank
+            question = question_bank.pick_question(fallback_ctx, previous_qs)
+            degraded = True
+            LLM_FALLBACKS.labels(kind="question_bank").inc()
+            logger.warning("LLM unavailable, serving a question-bank question")
+
+        if not question:
+            return {"error": "Could not generate a new question."}
+
+        session = _lock_session(db, session_id)
+        asked = sum(1 for m in session.messages if m.role == "interviewer")
+        if asked != question_count or session.status == "completed":
+            # another worker saved a turn of this session while we were waiting on the LLM
+            db.rollback()
+            drop_chat(session_id)
+            logger.warning("Concurrent turn saved first for session %s, discarding question", session_id)
+            return {"error": "Another turn of this interview was saved first; please retry."}
+
+        # saved in the locked transaction; commit releases the row lock
+        db.add(InterviewMessage(session_id=session_id, role="interviewer", content=question))
+        db.commit()
+        if degraded:
+            drop_chat(session_id)  # rebuilt from the saved messages on the next turn
+            return {"completed": False, "question": question, "degraded": True}
+        _remember_chat(session_id, chat, question_count + 1)
+        logger.info("New question generated (#%d)", question_count + 1)
 
         return {"completed": False, "question": question}
 
+    except LLMRateLimited:
+        raise
     except Exception as e:
-        print(f"❌ Error generating next question: {e}")
+        logger.exception("Error generating next question: %s", e)
         return {"error": str(e)}
     finally:
         db.close()
 
 # ===== 3️⃣ SUMMARIZE INTERVIEW =====
-def summarize_interview(resume_text: str, score: int, conversation: list[dict]):
-    """Generate a final HR-style summary of the interview."""
-    print(f"🧾 Summarizing interview ({len(conversation)} Q&A pairs)...")
+@instrument("summary")
+def summarize_interview(resume_text: str, score: int, conversation: list[dict], use_cache: bool = False,
+                        resume_ctx: str | None = None):
+    """Generate a final HR-style summary of the interview.
+    resume_ctx (e.g. the session digest) replaces the truncated resume when given."""
+    resume_ctx = resume_ctx or (resume_text or "")[:2000]
+    if use_cache:
+        return llm_cache.cached(
+            SUMMARY_PROMPT,
+            {"resume": resume_ctx, "score": score, "conversation": conversation},
+            lambda: summarize_interview(resume_text, score, conversation, resume_ctx=resume_ctx),
+            cacheable=lambda r: bool(r.get("summary"))
+        )
+
+    logger.info("Summarizing interview (%d Q&A pairs)", len(conversation))
 
     try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL)
         convo_text = "\n".join([f"Q: {c.get('question')}\nA: {c.get('answer')}" for c in conversation])
 
         prompt = f"""
@@ -217,28 +539,165 @@ def summarize_interview(resume_text: str, score: int, conversation: list[dict]):
         **Key Strengths:** (•)
         **Areas for Improvement:** (•)
 
-        Resume excerpt:
-        {resume_text[:2000]}
+        Candidate profile:
+        {resume_ctx}
 
         Interview Conversation:
         {convo_text}
         """
 
-        response = _gen_with_retry(model, prompt)
+        response = _gen_with_retry(prompt)
         summary_text = response.text.strip()
-        print("🧾 Gemini summary generated successfully.")
         return {"summary": summary_text}
 
+    except LLMRateLimited:
+        raise
     except Exception as e:
-        print(f"❌ Error summarizing interview: {e}")
+        logger.exception("Error summarizing interview: %s", e)
         return {"error": str(e)}
 
-# ===== 4️⃣ REAL-TIME ANSWER SCORING (Simple) =====
-def evaluate_answer(session_id: str, question: str, answer: str, total_score: float = 0):
-    """Analyze the candidate's answer and give feedback and a sub-score."""
+# ===== 3️⃣b ROLLING SUMMARY =====
+# After each answer a background task folds the new exchanges into short running
+# notes on the session, so the final /summary call only finalizes a small prompt
+# instead of the whole transcript. Score aggregates live in interview_session_analytics.
+_SUMMARY_LOCKS = [threading.Lock() for _ in range(64)]
+
+@instrument("rolling_summary")
+def update_rolling_summary(session_id: int):
+    """Fold messages newer than session.summary_message_id into the rolling summary."""
+    with _SUMMARY_LOCKS[session_id % len(_SUMMARY_LOCKS)]:
+        db = SessionLocal()
+        try:
+            session = db.query(InterviewSession).get(session_id)
+            if session is None:
+                return None
+            last_id = session.summary_message_id or 0
+            new_msgs = (
+                db.query(InterviewMessage)
+                .filter(InterviewMessage.session_id == session_id, InterviewMessage.id > last_id)
+                .order_by(InterviewMessage.id)
+                .all()
+            )
+            if not new_msgs:
+                return session.rolling_summary
+
+            exchanges = []
+            for m in new_msgs:
+                if m.role == "candidate":
+                    question = (
+                        db.query(InterviewMessage.content)
+                        .filter(InterviewMessage.session_id == session_id,
+                                InterviewMessage.role == "interviewer",
+                                InterviewMessage.id < m.id)
+                        .order_by(InterviewMessage.id.desc())
+                        .limit(1)
+                        .scalar()
+                    )
+                    exchanges.append((question or "(no question)", m.content))
+
+            if exchanges:
+                delta = "\n".join(f"Q: {q}\nA: {a}" for q, a in exchanges)
+                prompt = f"""
+                You keep running notes on a candidate during an interview.
+
+                Current notes:
+                {session.rolling_summary or "(none yet)"}
+
+                New exchanges:
+                {delta}
+
+                Rewrite the notes to include the new exchanges: key evidence of strengths,
+                weaknesses and notable claims. Max 120 words, plain bullet points.
+                """
+                session.rolling_summary = _gen_with_retry(prompt).text.strip()
+
+            session.summary_message_id = new_msgs[-1].id
+            db.commit()
+            logger.info("Rolling summary updated for session %s (+%d exchanges)", session_id, len(exchanges))
+            return session.rolling_summary
+        except Exception as e:
+            db.rollback()
+            logger.warning("Rolling summary update failed for session %s: %s", session_id, e)
+            return None
+        finally:
+            db.close()
+
+@instrument("summary")
+def finalize_summary(session_id: int, use_cache: bool = False):
+    """Final HR summary from the rolling notes; only the unsummarized tail is folded in first."""
+    update_rolling_summary(session_id)
+
+    db = SessionLocal()
     try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        session = db.query(InterviewSession).get(session_id)
+        if session is None:
+            return {"error": f"Session {session_id} not found"}
+        notes = session.rolling_summary or "(no answers recorded)"
+        score = session.score or 0
+        resume_ctx = resume_context(session, limit=2000)
+    finally:
+        db.close()
+
+    # same aggregates row as /analytics, whether answers were scored live or in batch
+    analytics = get_session_analytics(session_id) or {}
+    answers_scored = analytics.get("simple_answers", 0)
+    avg = round(analytics["total_score"] / answers_scored, 1) if answers_scored else None
+
+    def _finalize():
+        logger.info("Finalizing summary for session %s from rolling notes", session_id)
+        try:
+            prompt = f"""
+            You are an expert HR interviewer assistant.
+
+            Summarize the candidate's interview performance based on:
+            - Candidate profile
+            - Resume score: {score}/100
+            - Average answer score: {f"{avg}/20 over {answers_scored} answers" if avg is not None else "n/a"}
+            - Interviewer notes taken during the interview
+
+            Respond with:
+            **Overall Impression:** 3–4 sentences
+            **Key Strengths:** (•)
+            **Areas for Improvement:** (•)
 
+            Candidate profile:
+            {resume_ctx}
+
+            Interviewer notes:
+            {notes}
+            """
+            response = _gen_with_retry(prompt)
+            return {"summary": response.text.strip(), "answers_scored": answers_scored, "average_answer_score": avg}
+        except LLMRateLimited:
+            raise
+        except Exception as e:
+            logger.exception("Error finalizing summary: %s", e)
+            return {"error": str(e)}
+
+    if use_cache:
+        return llm_cache.cached(
+            FINAL_SUMMARY_PROMPT,
+            {"resume": resume_ctx, "score": score, "notes": notes, "avg": avg},
+            _finalize,
+            cacheable=lambda r: bool(r.get("summary"))
+        )
+    return _finalize()
+
+# ===== 4️⃣ REAL-TIME ANSWER SCORING (Simple) =====
+@instrument("evaluate")
+def evaluate_answer(session_id: str, question: str, answer: str, total_score: float = 0,
+                    degrade: bool = True):
+    """Analyze the candidate's answer and give feedback and a sub-score.
+    degrade=False raises instead of deferring or falling back (deferred-scoring replay)."""
+    if degrade and _scoring_mode(session_id) == "batch":
+        # scored with the whole transcript once the interview completes
+        return {
+            "sub_score": None,
+            "feedback": "Answers are scored together at the end of the interview.",
+            "total_score": total_score,
+            "scoring_mode": "batch"
+        }
+    try:
         prompt = f"""
         You are an interview evaluator. Assess the candidate's answer based on:
         1. Clarity
@@ -254,21 +713,25 @@ def evaluate_answer(session_id: str, question: str, answer: str, total_score: fl
         Feedback: <short constructive comment (1 sentence)>
         """
 
-        response = _gen_with_retry(model, prompt)
-        content = response.text.strip()
-
-        score_match = re.search(r"Score\s*\(0-20\)\s*:\s*(\d+)", content)
-        feedback_match = re.search(r"Feedback\s*:\s*(.*)", content)
-
-        sub_score = int(score_match.group(1)) if score_match else 10
-        feedback = feedback_match.group(1).strip() if feedback_match else "Good response."
+        def _score():
+            content = _gen_with_retry(prompt).text.strip()
+            sub_score, feedback = parse_simple_evaluation(content)
+            return {"sub_score": sub_score, "feedback": feedback, "complete": simple_evaluation_complete(content)}
 
+        # near-identical answers to the same question reuse an earlier evaluation
+        # (never one the parser had to fill with defaults)
+        evaluation = semantic_cache.cached("evaluate", question, answer, _score,
+                                           cacheable=lambda r: r["complete"])
+        sub_score, feedback = evaluation["sub_score"], evaluation["feedback"]
         total_score += sub_score
 
-        print(f"✅ Evaluated Answer | Sub-score: {sub_score} | Feedback: {feedback}")
+        logger.info("Answer evaluated, sub-score %s", sub_score)
 
-        # Save evaluation as system message
-        save_message(session_id, "system", f"Feedback: {feedback} (Score: {sub_score}/20)")
+        # Save evaluation as system message + typed score row
+        record_answer_score(
+            session_id, f"Feedback: {feedback} (Score: {sub_score}/20)", "simple",
+            question=question, sub_score=sub_score, feedback=feedback
+        )
 
         return {
             "sub_score": sub_score,
@@ -276,23 +739,48 @@ def evaluate_answer(session_id: str, question: str, answer: str, total_score: fl
             "total_score": total_score
         }
 
+    except LLMRateLimited:
+        raise
+    except LLMUnavailable:
+        if not degrade:
+            raise
+        defer_evaluation(session_id, "simple", question, answer)
+        LLM_FALLBACKS.labels(kind="deferred_scoring").inc()
+        return {
+            "sub_score": None,
+            "feedback": "Scoring is delayed and will be added to your report shortly.",
+            "total_score": total_score,
+            "deferred": True
+        }
     except Exception as e:
-        print(f"❌ Error evaluating answer: {e}")
+        if not degrade:
+            raise
+        logger.exception("Error evaluating answer: %s", e)
         return {
             "sub_score": 0,
             "feedback": "Evaluation failed due to an internal error.",
-            "total_score": total_score
+            "total_score": total_score,
+            "degraded": True
         }
 
 # ===== 5️⃣ DETAILED ANSWER SCORING (Per-dimension for charts) =====
-def evaluate_detailed_answer(session_id: int, question: str, answer: str):
+@instrument("detailed")
+def evaluate_detailed_answer(session_id: int, question: str, answer: str, degrade: bool = True):
     """
     Returns per-dimension scoring for a single answer:
     { clarity, coherence, confidence, technical_depth, engagement, average_score, feedback }
-    All sub-scores expected 0–20.
+    All sub-scores expected 0–20. While the LLM circuit is open the answer is queued
+    for deferred scoring and {"deferred": True, ...} comes back with null scores.
+    Sessions in batch scoring mode get null scores without an LLM call.
     """
+    if degrade and _scoring_mode(session_id) == "batch":
+        return {
+            **{d: None for d in DETAILED_DIMENSIONS},
+            "average_score": None,
+            "feedback": "Answers are scored together at the end of the interview.",
+            "scoring_mode": "batch"
+        }
     try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL)
         prompt = f"""
         You are an expert interview assessor. Score the candidate's answer across 5 dimensions (0–20 each):
 
@@ -316,38 +804,27 @@ def evaluate_detailed_answer(session_id: int, question: str, answer: str):
         }}
         """
 
-        response = _gen_with_retry(model, prompt)
-        raw = (response.text or "").strip()
-        print("🧪 Detailed eval raw:", raw)
-
-        # Extract JSON robustly
-        m = re.search(r'\{.*\}', raw, re.DOTALL)
-        if not m:
-            raise ValueError("No JSON found in model output")
+        def _score():
+            response = _gen_with_retry(prompt)
+            raw = (response.text or "").strip()
+            log_payload(logger, "Detailed eval raw output", raw)
+            return {**parse_detailed_evaluation(raw), "complete": detailed_evaluation_complete(raw)}
 
-        data = json.loads(m.group(0))
+        parsed = semantic_cache.cached("detailed", question, answer, _score,
+                                       cacheable=lambda r: r["complete"])
+        clarity, coherence, confidence = parsed["clarity"], parsed["coherence"], parsed["confidence"]
+        technical_depth, engagement = parsed["technical_depth"], parsed["engagement"]
+        avg, feedback = parsed["average_score"], parsed["feedback"]
 
-        # Coerce and clamp
-        def clamp_int(v):
-            try:
-                return max(0, min(int(v), 20))
-            except Exception:
-                return 10
-
-        clarity = clamp_int(data.get("clarity", 10))
-        coherence = clamp_int(data.get("coherence", 10))
-        confidence = clamp_int(data.get("confidence", 10))
-        technical_depth = clamp_int(data.get("technical_depth", 10))
-        engagement = clamp_int(data.get("engagement", 10))
-        feedback = (data.get("feedback") or "").strip() or "Good answer — consider adding a concrete example."
-
-        avg = round((clarity + coherence + confidence + technical_depth + engagement) / 5, 2)
-
-        # Save a compact record into messages (optional, useful for audits)
-        save_message(
+        # Save a compact record into messages (useful for audits) + typed score row
+        record_answer_score(
             session_id,
-            "system",
-            f"[DetailedEval] C:{clarity} Co:{coherence} Conf:{confidence} Tech:{technical_depth} Eng:{engagement} | Avg:{avg} | {feedback}"
+            f"[DetailedEval] C:{clarity} Co:{coherence} Conf:{confidence} Tech:{technical_depth} Eng:{engagement} | Avg:{avg} | {feedback}",
+            "detailed",
+            question=question,
+            clarity=clarity, coherence=coherence, confidence=confidence,
+            technical_depth=technical_depth, engagement=engagement,
+            average_score=avg, feedback=feedback
         )
 
         return {
@@ -360,8 +837,23 @@ def evaluate_detailed_answer(session_id: int, question: str, answer: str):
             "feedback": feedback
         }
 
+    except LLMRateLimited:
+        raise
+    except LLMUnavailable:
+        if not degrade:
+            raise
+        defer_evaluation(session_id, "detailed", question, answer)
+        LLM_FALLBACKS.labels(kind="deferred_scoring").inc()
+        return {
+            **{d: None for d in DETAILED_DIMENSIONS},
+            "average_score": None,
+            "feedback": "Scoring is delayed and will be added to your report shortly.",
+            "deferred": True
+        }
     except Exception as e:
-        print(f"❌ Error in evaluate_detailed_answer: {e}")
+        if not degrade:
+            raise
+        logger.exception("Error in evaluate_detailed_answer: %s", e)
         # Reasonable fallback
         return {
             "clarity": 10,
@@ -370,5 +862,6 @@ def evaluate_detailed_answer(session_id: int, question: str, answer: str):
             "technical_depth": 10,
             "engagement": 10,
             "average_score": 10.0,
-            "feedback": "Evaluation failed; returning neutral scores."
+            "feedback": "Evaluation failed; returning neutral scores.",
+            "degraded": True
         }
@@ -0,0 +1,242 @@
+"""
+Streaming NDJSON/CSV job import with chunked commits.
+
+Rows are parsed and validated one at a time, written and embedded every
+`chunk_size` rows, and bad rows are skipped with a per-row error entry, so
+memory stays bounded regardless of feed size.
+
+    python -m app.services.job_import feed.ndjson [--chunk-size 500]
+    curl -X POST --data-binary @feed.csv -H 'Content-Type: text/csv' /api/jobs/import
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Iterable, Optional
+from pydantic import ValidationError
+from app.core.database import SessionLocal
+from app.core.logging_config import setup_logging
+from app.models.job import JobPosting
+from app.schemas.job_schema import JobIn
+from app.services.dedup_service import assign_cluster
+from app.services.embeddings_service import upsert_vectors
+from app.services.job_service import _job_metadata
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 1000
+
+
+# ---------- Parsing ----------
+def iter_records(stream: Iterable[str], fmt: str):
+    """Yield (line_no, record dict | None, parse error | None) from a text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # empty CSV cells mean "not provided"
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in record.items() if k}, None
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+# ---------- Writing ----------
+def _write_chunk(rows: list[dict]) -> list[JobPosting]:
+    """Upsert one chunk by (source, external_id) in a single transaction."""
+    db = SessionLocal()
+    try:
+        keyed = [(r["source"], r["external_id"]) for r in rows if r.get("source") and r.get("external_id")]
+        existing = {}
+        if keyed:
+            for job in db.query(JobPosting).filter(
+                JobPosting.source.in_({k[0] for k in keyed}),
+                JobPosting.external_id.in_({k[1] for k in keyed}),
+            ):
+                existing[(job.source, job.external_id)] = job
+
+        saved = []
+        for r in rows:
+            job = existing.get((r.get("source"), r.get("external_id")))
+            if job is not None:
+                for k, v in r.items():
+                    setattr(job, k, v)
+            else:
+                job = JobPosting(**r)
+                db.add(job)
+                if r.get("source") and r.get("external_id"):
+                    existing[(r["source"], r["external_id"])] = job
+            saved.append(job)
+        # cluster in row order so earlier rows of the feed become canonical
+        db.flush()
+        for job in {id(j): j for j in saved}.values():
+            assign_cluster(db, job)
+        db.commit()
+        for job in saved:
+            db.refresh(job)
+        db.expunge_all()
+        return saved
+    finally:
+        db.close()
+
+
+def _embed_chunk(jobs: list[JobPosting]):
+    # near-duplicates are represented by their canonical job's vector
+    unique = [j for j in {j.id: j for j in jobs}.values() if j.canonical_job_id is None]
+    if not unique:
+        return
+    upsert_vectors(
+        "jobs",
+        ids=[f"job:{j.id}" for j in unique],
+        documents=[j.description for j in unique],
+        metadatas=[_job_metadata(j) for j in unique],
+    )
+
+
+def import_stream(stream: Iterable[str], fmt: str = "ndjson", chunk_size: int = 500,
+                  default_source: Optional[str] = None, embed: bool = True) -> dict:
+    fmt = fmt.lower()
+    if fmt not in ("ndjson", "csv"):
+        raise ValueError("format must be 'ndjson' or 'csv'")
+    default_source = default_source or ("csv" if fmt == "csv" else "manual")
+    report = {"imported": 0, "failed": 0, "chunks": 0, "embed_failures": 0, "errors": []}
+    started = time.time()
+
+    def _error(line_no, message):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line_no, "error": message})
+
+    def _flush(rows):
+        saved = _write_chunk(rows)
+        report["imported"] += len(saved)
+        report["chunks"] += 1
+        if embed:
+            try:
+                _embed_chunk(saved)
+            except Exception as e:
+                # rows are committed; the reconciler will embed them later
+                report["embed_failures"] += len(saved)
+                logger.warning("Embedding failed for import chunk %d: %s", report["chunks"], e)
+
+    chunk = []
+    for line_no, record, parse_error in iter_records(stream, fmt):
+        if parse_error:
+            _error(line_no, parse_error)
+            continue
+        if not record.get("source"):
+            record["source"] = default_source
+        try:
+            chunk.append(JobIn(**record).dict())
+        except ValidationError as e:
+            _error(line_no, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+            continue
+        if len(chunk) >= chunk_size:
+            try:
+                _flush(chunk)
+            except Exception as e:
+                _error(line_no, f"chunk ending here was not saved: {e}")
+            chunk = []
+    if chunk:
+        try:
+            _flush(chunk)
+        except Exception as e:
+            _error(None, f"final chunk was not saved: {e}")
+
+    if embed and report["embed_failures"]:
+        # one catch-up pass now instead of waiting for the periodic reconciler
+        from app.services.reconcile_service import reconcile
+        try:
+            report["reconciled"] = reconcile("jobs")["embedded"]
+        except Exception as e:
+            logger.warning("Post-import reconcile failed, rows stay unembedded until the next run: %s", e)
+
+    report["elapsed_s"] = round(time.time() - started, 2)
+    logger.info("Import finished: %d imported, %d failed, %d chunks",
+                report["imported"], report["failed"], report["chunks"])
+    return report
+
+
+# ---------- Request body bridge ----------
+class QueueReader(io.RawIOBase):
+    """Blocking file-like view over a queue of byte chunks (None marks the end).
+    Lets an async request-body reader feed the synchronous parser with backpressure.
+
+    abort() (or `idle_timeout` seconds without a chunk) makes the next read raise,
+    so the importer thread never waits on a producer that has gone away."""
+
+    POLL_SECONDS = 1.0
+
+    def __init__(self, q: queue.Queue, idle_timeout: float = 300.0):
+        self._q = q
+        self._buf = b""
+        self._eof = False
+        self._idle_timeout = idle_timeout
+        self._aborted = threading.Event()
+
+    def readable(self):
+        return True
+
+    def abort(self):
+        self._aborted.set()
+
+    @property
+    def aborted(self) -> bool:
+        return self._aborted.is_set()
+
+    def readinto(self, b):
+        idle_since = time.monotonic()
+        while not self._buf and not self._eof:
+            if self._aborted.is_set():
+                raise IOError("upload aborted")
+            try:
+                item = self._q.get(timeout=self.POLL_SECONDS)
+            except queue.Empty:
+                if time.monotonic() - idle_since > self._idle_timeout:
+                    raise IOError(f"no upload data for {self._idle_timeout:.0f}s")
+                continue
+            if item is None:
+                self._eof = True
+            else:
+                self._buf = item
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def text_stream(raw: io.RawIOBase) -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BufferedReader(raw), encoding="utf-8", errors="replace", newline="")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import jobs from an NDJSON or CSV file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default=None,
+                        help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--source", default=None, help="source for rows that do not set one")
+    parser.add_argument("--no-embed", action="store_true", help="skip embedding (run the reconciler later)")
+    args = parser.parse_args()
+    setup_logging()
+
+    fmt = args.format or ("csv" if os.path.splitext(args.path)[1].lower() == ".csv" else "ndjson")
+    with open(args.path, encoding="utf-8", errors="replace", newline="") as f:
+        result = import_stream(f, fmt, args.chunk_size, args.source, embed=not args.no_embed)
+    print(json.dumps(result, indent=2))
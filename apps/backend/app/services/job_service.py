@@ -3,21 +3,28 @@ import math
 import requests
 from typing import List, Tuple, Optional
 from sqlalchemy.orm import Session
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
 from app.core.database import SessionLocal
+from app.core.metrics import CHROMA_LATENCY, instrument, timed
 from app.models.job import JobPosting, JobMatch
 from app.models.interview import InterviewSession
 from app.models.resume import Resume
+from app.services.dedup_service import assign_cluster
+from app.services.embeddings_service import (
+    content_hash, encode, get_collection, active_model, upsert_vectors
+)
 
 # ---------- Embedding + Vector DB (separate 'jobs' collection) ----------
-_chroma = chromadb.PersistentClient(path="chroma_data")
-_jobs_col = _chroma.get_or_create_collection(name="jobs")
-_model = SentenceTransformer("all-MiniLM-L6-v2")  # lightweight & fast
-
 def _embed(text: str):
-    return _model.encode(text).tolist()
+    # queries must use the model the active 'jobs' collection was built with
+    return encode([text], model_name=active_model("jobs"))[0]
+
+def _job_metadata(job: JobPosting) -> dict:
+    return {
+        "job_id": job.id,
+        "title": job.title,
+        "company": job.company or "",
+        "content_hash": content_hash(job.description),
+    }
 
 # ---------- CRUD / Ingest ----------
 def upsert_job(db: Session, job: dict) -> JobPosting:
@@ -29,18 +36,22 @@ def upsert_job(db: Session, job: dict) -> JobPosting:
     if not db_obj:
         db_obj = JobPosting(**job)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        db.flush()
     else:
         for k,v in job.items():
             setattr(db_obj, k, v)
-        db.commit()
-    # embed to Chroma
-    _jobs_col.add(
+    canonical_id = assign_cluster(db, db_obj)
+    db.commit()
+    db.refresh(db_obj)
+    if canonical_id is not None:
+        # near-duplicate of an indexed job: nothing to embed
+        return db_obj
+    # embed to Chroma (upsert so an updated row replaces its old vector)
+    upsert_vectors(
+        "jobs",
         ids=[f"job:{db_obj.id}"],
         documents=[db_obj.description],
-        metadatas=[{"job_id": db_obj.id, "title": db_obj.title, "company": db_obj.company or ""}],
-        embeddings=[_embed(db_obj.description)]
+        metadatas=[_job_metadata(db_obj)]
     )
     return db_obj
 
@@ -52,8 +63,10 @@ def ingest_jobs_from_list(jobs: list):
             job = JobPosting(**job_data)
             db.add(job)
             db.flush()  # ensures IDs are generated
+            assign_cluster(db, job)
             saved.append({
                 "id": job.id,
+                "canonical_job_id": job.canonical_job_id,
                 "title": job.title,
                 "company": job.company,
                 "location": job.location,
@@ -114,6 +127,7 @@ def _get_resume_text_for_session(db: Session, session_id: int) -> Optional[str]:
     sess = db.query(InterviewSession).get(session_id)
     return sess.resume_text if sess else None
 
+@instrument()
 def match_resume_to_jobs(session_id: Optional[int] = None,
                          resume_text: Optional[str] = None,
                          top_k: int = 5) -> List[Tuple[dict, float]]:
@@ -125,7 +139,8 @@ def match_resume_to_jobs(session_id: Optional[int] = None,
             return []
 
         q = _embed(resume_text)
-        res = _jobs_col.query(query_embeddings=[q], n_results=top_k)
+        with timed(CHROMA_LATENCY, collection="jobs"):
+            res = get_collection("jobs").query(query_embeddings=[q], n_results=top_k)
         ids = [int(i.replace("job:", "")) for i in res["ids"][0]]
 
         # Convert distance to similarity if applicable
@@ -136,11 +151,21 @@ def match_resume_to_jobs(session_id: Optional[int] = None,
 
         jobs = db.query(JobPosting).filter(JobPosting.id.in_(ids)).all()
         id_to_job = {j.id: j for j in jobs}
+        # vectors of jobs that became duplicates may linger until the next
+        # reconcile: report each cluster once, as its canonical job
+        canonical_ids = {j.canonical_job_id for j in jobs if j.canonical_job_id} - id_to_job.keys()
+        if canonical_ids:
+            id_to_job.update({j.id: j for j in db.query(JobPosting).filter(JobPosting.id.in_(canonical_ids))})
 
         out = []
+        seen_clusters = set()
         for job_id, sim in zip(ids, sims):
             if job_id in id_to_job:
                 j = id_to_job[job_id]
+                j = id_to_job.get(j.canonical_job_id, j)
+                if j.id in seen_clusters:
+                    continue
+                seen_clusters.add(j.id)
                 out.append((
                     {
                         "id": j.id,
@@ -153,9 +178,25 @@ def match_resume_to_jobs(session_id: Optional[int] = None,
                     float(sim)
                 ))
 
-        # persist matches
+        # persist matches, reusing reasons already generated for this (resume, job)
+        resume_hash = content_hash(resume_text)
+        cached_reasons = dict(
+            db.query(JobMatch.job_id, JobMatch.reason).filter(
+                JobMatch.resume_hash == resume_hash,
+                JobMatch.job_id.in_([job_dict["id"] for job_dict, _ in out]),
+                JobMatch.reason.isnot(None),
+            )
+        ) if out else {}
+        rows = []
         for job_dict, sim in out:
-            db.add(JobMatch(session_id=session_id, job_id=job_dict["id"], similarity=sim))
+            row = JobMatch(session_id=session_id, job_id=job_dict["id"], similarity=sim,
+                           resume_hash=resume_hash, reason=cached_reasons.get(job_dict["id"]))
+            db.add(row)
+            rows.append(row)
+        db.flush()
+        for (job_dict, _), row in zip(out, rows):
+            job_dict["match_id"] = row.id
+            job_dict["reason"] = row.reason
         db.commit()
         return out
     finally:
@@ -0,0 +1,148 @@
+"""
+Keyset-paginated listing and streaming export for sessions, jobs and matches.
+
+Listing:  WHERE id > :after_id ORDER BY id LIMIT :limit, selecting only the
+          requested columns (large text columns are opt-in via `fields`).
+Export:   the same projection read through a server-side cursor in chunks and
+          streamed out as NDJSON or CSV, so memory stays flat.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterator, Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from app.core.database import SessionLocal
+from app.models.interview import InterviewSession
+from app.models.job import JobPosting, JobMatch
+
+# kind -> (model, default fields, opt-in fields)
+LISTABLE = {
+    "sessions": (
+        InterviewSession,
+        ["id", "candidate_name", "score", "status", "job_id", "domain", "scoring_mode", "batch_scoring_status",
+         "created_at"],
+        ["intro", "resume_text", "resume_digest", "rolling_summary"],
+    ),
+    "jobs": (
+        JobPosting,
+        ["id", "source", "external_id", "title", "company", "location", "url", "canonical_job_id", "created_at"],
+        ["description"],
+    ),
+    "matches": (
+        JobMatch,
+        ["id", "session_id", "resume_id", "job_id", "similarity", "created_at"],
+        ["reason"],
+    ),
+}
+MAX_PAGE_SIZE = 500
+
+
+def parse_fields(kind: str, fields: Optional[str]) -> list[str]:
+    """Comma-separated projection; defaults exclude large text columns. Always includes id."""
+    _, default, optional = LISTABLE[kind]
+    if not fields:
+        return list(default)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in default and f not in optional]
+    if unknown:
+        raise ValueError(f"Unknown field(s) for {kind}: {', '.join(unknown)}")
+    return ["id"] + [f for f in requested if f != "id"]
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _query(kind: str, fields: list[str], after_id: int = 0, filters: Optional[dict] = None):
+    model = LISTABLE[kind][0]
+    stmt = select(*[getattr(model, f) for f in fields]).where(model.id > after_id)
+    for column, value in (filters or {}).items():
+        if value is not None:
+            stmt = stmt.where(getattr(model, column) == value)
+    return stmt.order_by(model.id)
+
+
+def list_page(kind: str, after_id: int = 0, limit: int = 50, fields: Optional[str] = None,
+              filters: Optional[dict] = None) -> dict:
+    cols = parse_fields(kind, fields)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    db = SessionLocal()
+    try:
+        rows = db.execute(_query(kind, cols, after_id, filters).limit(limit + 1)).all()
+    finally:
+        db.close()
+    has_more = len(rows) > limit
+    items = [{c: _jsonable(v) for c, v in zip(cols, row)} for row in rows[:limit]]
+    return {
+        "items": items,
+        "next_after_id": items[-1]["id"] if has_more else None,
+    }
+
+
+def iter_rows(kind: str, fields: list[str], filters: Optional[dict] = None,
+              chunk_size: int = 1000) -> Iterator[list[tuple]]:
+    """Yield chunks of row tuples from a server-side cursor."""
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            _query(kind, fields, 0, filters).execution_options(stream_results=True, yield_per=chunk_size)
+        )
+        for chunk in result.partitions(chunk_size):
+            yield chunk
+    finally:
+        db.close()
+
+
+def export_ndjson(kind: str, fields: Optional[str] = None, filters: Optional[dict] = None) -> Iterator[bytes]:
+    cols = parse_fields(kind, fields)
+    for chunk in iter_rows(kind, cols, filters):
+        yield "".join(
+            json.dumps({c: _jsonable(v) for c, v in zip(cols, row)}, ensure_ascii=False) + "\n"
+            for row in chunk
+        ).encode("utf-8")
+
+
+def export_csv(kind: str, fields: Optional[str] = None, filters: Optional[dict] = None) -> Iterator[bytes]:
+    cols = parse_fields(kind, fields)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(cols)
+    for chunk in iter_rows(kind, cols, filters):
+        writer.writerows([_jsonable(v) for v in row] for row in chunk)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def export_response(kind: str, fmt: str = "ndjson", fields: Optional[str] = None,
+                    filters: Optional[dict] = None) -> StreamingResponse:
+    try:
+        parse_fields(kind, fields)  # fail with 400 before the stream starts
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if fmt == "csv":
+        body, media_type = export_csv(kind, fields, filters), "text/csv"
+    elif fmt == "ndjson":
+        body, media_type = export_ndjson(kind, fields, filters), "application/x-ndjson"
+    else:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{fmt}"'},
+    )
+
+
+def list_response(kind: str, after_id: int, limit: int, fields: Optional[str],
+                  filters: Optional[dict] = None) -> dict:
+    try:
+        return list_page(kind, after_id=after_id, limit=limit, fields=fields, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,163 @@
+"""
+Circuit breaker around the LLM provider.
+
+Outcomes of the last LLM_BREAKER_WINDOW calls are kept. Once at least
+LLM_BREAKER_MIN_CALLS are in the window and the share of failed calls, or of
+calls slower than LLM_BREAKER_SLOW_SECONDS, reaches LLM_BREAKER_FAILURE_RATE,
+the circuit opens: every call fails immediately with LLMUnavailable for
+LLM_BREAKER_OPEN_SECONDS. Then a single probe call is let through (half-open);
+success closes the circuit, failure opens it again.
+
+Callers degrade instead of waiting on a dead dependency (question bank,
+deferred scoring), and listeners registered with on_close() run once the
+provider is healthy again.
+
+The breaker wraps the base provider inside the rate limiter, so time spent
+waiting for admission is never counted as a slow call, and admission-control
+rejections (LLMRateLimited) are never counted as failures.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from app.core.config import settings
+from app.core.metrics import LLM_BREAKER_STATE
+from app.services.llm_limiter import LLMRateLimited
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class LLMUnavailable(RuntimeError):
+    """The circuit is open: the LLM provider is considered down."""
+
+
+class CircuitBreaker:
+    def __init__(self, window: int, min_calls: int, failure_rate: float, slow_seconds: float,
+                 open_seconds: float):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_seconds = slow_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)  # True = bad (failed or slow)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._listeners = []
+        LLM_BREAKER_STATE.set(0)
+
+    def on_close(self, fn):
+        """Register fn() to run (in a background thread) whenever the circuit closes."""
+        self._listeners.append(fn)
+        return fn
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning("LLM circuit %s -> %s", self.state, state)
+            self.state = state
+            LLM_BREAKER_STATE.set(_STATE_VALUE[state])
+
+    def before_call(self):
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    raise LLMUnavailable("LLM circuit is open")
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    raise LLMUnavailable("LLM circuit is half-open; probe in flight")
+                self._probe_in_flight = True
+
+    def after_call(self, ok: bool, seconds: float):
+        bad = not ok or seconds > self.slow_seconds
+        closed_now = False
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if bad:
+                    self._trip()
+                else:
+                    self._outcomes.clear()
+                    self._set_state(CLOSED)
+                    closed_now = True
+            else:
+                self._outcomes.append(bad)
+                if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                        and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate):
+                    self._trip()
+        if closed_now:
+            for fn in self._listeners:
+                threading.Thread(target=fn, name="llm-breaker-close", daemon=True).start()
+
+    def release_probe(self):
+        """The admitted call never reached the provider (e.g. rate limited)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _trip(self):
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._set_state(OPEN)
+
+    def call(self, fn):
+        self.before_call()
+        started = time.perf_counter()
+        try:
+            response = fn()
+        except LLMRateLimited:
+            self.release_probe()
+            raise
+        except Exception:
+            self.after_call(False, time.perf_counter() - started)
+            raise
+        self.after_call(True, time.perf_counter() - started)
+        return response
+
+
+breaker = CircuitBreaker(
+    window=settings.LLM_BREAKER_WINDOW,
+    min_calls=settings.LLM_BREAKER_MIN_CALLS,
+    failure_rate=settings.LLM_BREAKER_FAILURE_RATE,
+    slow_seconds=settings.LLM_BREAKER_SLOW_SECONDS,
+    open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+)
+
+
+# ---------- Provider wrapper ----------
+class _BreakerChat:
+    def __init__(self, breaker: CircuitBreaker, inner):
+        self._breaker = breaker
+        self._inner = inner
+
+    @property
+    def history(self):
+        return self._inner.history
+
+    def send_message(self, message: str):
+        return self._breaker.call(lambda: self._inner.send_message(message))
+
+    def rewind(self):
+        return self._inner.rewind()
+
+
+class BreakerProvider:
+    def __init__(self, inner, breaker: CircuitBreaker):
+        self.inner = inner
+        self.breaker = breaker
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    @property
+    def model_id(self) -> str:
+        return self.inner.model_id
+
+    def generate(self, prompt: str):
+        return self.breaker.call(lambda: self.inner.generate(prompt))
+
+    def start_chat(self, history: list[dict]):
+        return _BreakerChat(self.breaker, self.inner.start_chat(history))
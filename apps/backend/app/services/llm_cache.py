@@ -0,0 +1,96 @@
+"""
+Result cache for deterministic LLM prompts.
+
+Entries are keyed by (model, prompt template id, template version, hash of the
+inputs), so bumping a template's version invalidates its old entries without a
+flush. Caching is opt-in per call site:
+
+    result = llm_cache.cached(ANALYZE_PROMPT, {"resume_text": text}, lambda: _call(...),
+                              cacheable=lambda r: r["complete"])
+
+Backends: "memory" (per-process LRU), "sql" (llm_cache_entries table, shared
+across workers) or "none". Chosen by LLM_CACHE_BACKEND.
+"""
+import hashlib
+import json
+import logging
+from typing import Callable, NamedTuple, Optional
+from app.core.config import settings
+from app.core.ttl_store import MemoryTTLStore, SQLTTLStore
+from app.models.llm_cache import LLMCacheEntry
+from app.services.llm_provider import get_llm
+
+logger = logging.getLogger(__name__)
+
+
+class PromptTemplate(NamedTuple):
+    id: str
+    version: int
+
+
+def make_key(model: str, template: PromptTemplate, inputs: dict) -> str:
+    payload = json.dumps(
+        {"model": model, "template": template.id, "version": template.version, "inputs": inputs},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------- Backends ----------
+class MemoryLRUBackend(MemoryTTLStore):
+    """Size-bounded in-process LRU with per-entry expiry."""
+
+
+class SQLBackend(SQLTTLStore):
+    """Shared cache in the llm_cache_entries table (SQLite or Postgres)."""
+
+    def __init__(self, max_entries: int):
+        super().__init__(LLMCacheEntry, "template_id", max_entries)
+
+
+def _build_backend(name: str):
+    if name == "memory":
+        return MemoryLRUBackend(settings.LLM_CACHE_MAX_ENTRIES)
+    if name == "sql":
+        return SQLBackend(settings.LLM_CACHE_MAX_ENTRIES)
+    return None
+
+
+_backend = _build_backend(settings.LLM_CACHE_BACKEND)
+
+
+def set_backend(backend):
+    """Swap the backend at runtime (e.g. MemoryLRUBackend in scripts)."""
+    global _backend
+    _backend = backend
+
+
+# ---------- Public API ----------
+def cached(template: PromptTemplate, inputs: dict, compute: Callable[[], dict],
+           ttl: Optional[int] = None, model: Optional[str] = None,
+           cacheable: Optional[Callable[[dict], bool]] = None) -> dict:
+    """Return the cached result for (model, template, inputs) or compute and store it.
+    Results containing an "error" key, or for which cacheable(result) is false
+    (e.g. parser fallbacks), are never stored."""
+    if _backend is None:
+        return compute()
+
+    # fake/real providers never share entries
+    model = model or get_llm().model_id
+    key = make_key(model, template, inputs)
+    try:
+        hit = _backend.get(key)
+    except Exception as e:
+        logger.warning("LLM cache read failed (%s): %s", template.id, e)
+        hit = None
+    if hit is not None:
+        logger.debug("LLM cache hit: %s v%d", template.id, template.version)
+        return hit
+
+    result = compute()
+    if isinstance(result, dict) and "error" not in result and (cacheable is None or cacheable(result)):
+        try:
+            _backend.set(key, template.id, result, ttl or settings.LLM_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("LLM cache write failed (%s): %s", template.id, e)
+    return result
@@ -0,0 +1,152 @@
+"""
+Record/replay cassette for LLM calls.
+
+Wraps any provider from llm_provider (selected with LLM_CASSETTE_MODE):
+  - record: calls go to the real provider; each call appends one JSON line
+            {"k": prompt hash, "t": text, "ms": latency, "u": [prompt, completion, total tokens]}
+            (or "err" for a failed attempt) to LLM_CASSETTE_PATH (.gz = gzip)
+  - replay: calls are served from the cassette, sleeping the recorded latency
+            times LLM_CASSETTE_TIME_SCALE (0 = no delay); recorded failures are
+            raised again, so retry behaviour replays too
+
+Chat turns are keyed by the whole conversation so far plus the new message,
+one-shot prompts by the prompt text. Identical keys are served in recorded
+order (the last entry repeats), so whole interview traces replay offline
+against new builds.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+
+class CassetteMiss(LookupError):
+    """Replay mode got a call that was never recorded."""
+
+
+class ReplayedError(RuntimeError):
+    """A failure recorded from the real provider, raised again on replay."""
+
+
+def _key(*parts) -> str:
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _usage(response) -> list | None:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    return [getattr(usage, a, 0) or 0 for a in ("prompt_token_count", "candidates_token_count", "total_token_count")]
+
+
+def _as_response(entry: dict):
+    usage = entry.get("u")
+    return SimpleNamespace(
+        text=entry["t"],
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=usage[0], candidates_token_count=usage[1], total_token_count=usage[2]
+        ) if usage else None,
+    )
+
+
+class _CassetteChat:
+    """Chat wrapper that tracks its own plain-dict history so keys match across record/replay."""
+
+    def __init__(self, cassette: "CassetteProvider", history: list[dict], inner=None):
+        self._cassette = cassette
+        self._inner = inner
+        self.history = [{"role": h["role"], "parts": list(h["parts"])} for h in history or []]
+
+    def send_message(self, message: str):
+        key = _key("chat", self.history, message)
+        call = (lambda: self._inner.send_message(message)) if self._inner is not None else None
+        response = self._cassette._call(key, call)
+        self.history += [{"role": "user", "parts": [message]}, {"role": "model", "parts": [response.text]}]
+        return response
+
+    def rewind(self):
+        removed = self.history[-2:]
+        self.history = self.history[:-2]
+        if self._inner is not None:
+            self._inner.rewind()
+        return removed
+
+
+class CassetteProvider:
+    def __init__(self, path: str, mode: str, inner=None, time_scale: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("record mode needs a provider to record from")
+        self.path = path
+        self.mode = mode
+        self.inner = inner
+        self.time_scale = time_scale
+        self.name = f"cassette:{mode}"
+        self._lock = threading.Lock()
+        self._entries = defaultdict(list)  # key -> [entry, ...] in recorded order
+        self._cursor = defaultdict(int)
+        if mode == "replay":
+            self._load()
+
+    @property
+    def model_id(self) -> str:
+        return self.inner.model_id if self.inner is not None else f"cassette:{self.path}"
+
+    def _load(self):
+        with _open(self.path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["k"]].append(entry)
+
+    def _append(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock, _open(self.path, "a") as f:
+            f.write(line)
+
+    def _call(self, key: str, call):
+        if self.mode == "replay":
+            return self._replay(key)
+        started = time.perf_counter()
+        try:
+            response = call()
+        except Exception as e:
+            self._append({"k": key, "err": str(e), "ms": round((time.perf_counter() - started) * 1000, 1)})
+            raise
+        self._append({"k": key, "t": response.text, "ms": round((time.perf_counter() - started) * 1000, 1),
+                      "u": _usage(response)})
+        return response
+
+    def _replay(self, key: str):
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(f"no cassette entry for call {key}")
+            idx = min(self._cursor[key], len(entries) - 1)
+            self._cursor[key] += 1
+        entry = entries[idx]
+        if self.time_scale:
+            time.sleep(entry.get("ms", 0) / 1000 * self.time_scale)
+        if "err" in entry:
+            raise ReplayedError(entry["err"])
+        return _as_response(entry)
+
+    # ---------- provider interface ----------
+    def generate(self, prompt: str):
+        call = (lambda: self.inner.generate(prompt)) if self.inner is not None else None
+        return self._call(_key("generate", prompt), call)
+
+    def start_chat(self, history: list[dict]):
+        inner_chat = self.inner.start_chat(history) if self.mode == "record" else None
+        return _CassetteChat(self, history, inner_chat)
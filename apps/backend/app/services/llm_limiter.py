@@ -0,0 +1,322 @@
+"""
+Admission control for LLM calls: token buckets plus a priority queue.
+
+Two buckets refill continuously: requests per minute (LLM_RPM) and tokens per
+minute (LLM_TPM, estimated from the prompt size plus LLM_EST_OUTPUT_TOKENS and
+corrected with the real usage_metadata afterwards). A limit of 0 disables that
+bucket. With LLM_RATE_LIMIT_BACKEND=sql the buckets live in llm_rate_buckets and
+are shared by every worker; "memory" keeps them per process.
+
+Callers queue in priority order, taken from the prompt type of the call:
+    live      next, evaluate, detailed        (a candidate is waiting)
+    analysis  analyze, summary, other
+    batch     rolling_summary, explain,       (background work)
+              batch_score
+Only the head of the queue draws from the buckets, so a burst of /analyze or
+re-scoring calls cannot starve interview turns. An interactive call that would
+wait longer than LLM_QUEUE_MAX_WAIT_SECONDS (batch: LLM_BATCH_MAX_WAIT_SECONDS),
+or finds LLM_QUEUE_MAX calls of equal or higher priority ahead of it, fails
+fast with LLMRateLimited (HTTP 429 + Retry-After) instead of piling up retries.
+"""
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import LLM_QUEUE_WAIT, LLM_REJECTED, current_prompt
+from app.models.rate_limit import LLMRateBucket
+
+logger = logging.getLogger(__name__)
+
+LIVE, ANALYSIS, BATCH = 0, 1, 2
+PRIORITY_NAMES = ("live", "analysis", "batch")
+PROMPT_PRIORITY = {
+    "next": LIVE, "evaluate": LIVE, "detailed": LIVE,
+    "analyze": ANALYSIS, "summary": ANALYSIS,
+    "rolling_summary": BATCH, "explain": BATCH, "batch_score": BATCH,
+}
+
+
+class LLMRateLimited(HTTPException):
+    """LLM capacity is exhausted; rendered as 429 with Retry-After."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=429,
+            detail="The AI service is busy, please retry shortly.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+# set by background jobs that reuse live code paths (e.g. replaying deferred scores)
+_forced_priority: ContextVar[int | None] = ContextVar("llm_forced_priority", default=None)
+
+
+@contextmanager
+def batch_priority():
+    token = _forced_priority.set(BATCH)
+    try:
+        yield
+    finally:
+        _forced_priority.reset(token)
+
+
+def priority_for(prompt: str) -> int:
+    forced = _forced_priority.get()
+    return forced if forced is not None else PROMPT_PRIORITY.get(prompt, ANALYSIS)
+
+
+# ---------- Buckets ----------
+def _refill(tokens: float, updated_at: float, now: float, per_minute: float) -> float:
+    return min(per_minute, tokens + (now - updated_at) * per_minute / 60)
+
+
+def _shortfall_wait(level: float, cost: float, per_minute: float) -> float:
+    return 0.0 if level >= cost else (cost - level) * 60 / per_minute
+
+
+class MemoryBuckets:
+    """Per-process buckets; capacity is one minute of budget."""
+
+    def __init__(self, limits: dict[str, float]):
+        self.limits = {name: rate for name, rate in limits.items() if rate > 0}
+        now = time.monotonic()
+        self._state = {name: [rate, now] for name, rate in self.limits.items()}
+        self._lock = threading.Lock()
+
+    def try_take(self, costs: dict[str, float]) -> float:
+        """Take every cost, or nothing; returns 0 or the seconds until they would fit."""
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            for name, rate in self.limits.items():
+                state = self._state[name]
+                state[0], state[1] = _refill(state[0], state[1], now, rate), now
+                wait = max(wait, _shortfall_wait(state[0], min(costs.get(name, 0), rate), rate))
+            if wait:
+                return wait
+            for name, rate in self.limits.items():
+                self._state[name][0] -= min(costs.get(name, 0), rate)
+            return 0.0
+
+    def adjust(self, name: str, delta: float):
+        """Charge (positive) or refund (negative) the difference to an estimate."""
+        if name in self.limits:
+            with self._lock:
+                state = self._state[name]
+                state[0] = min(self.limits[name], state[0] - delta)
+
+
+class SQLBuckets:
+    """Buckets shared across workers through the llm_rate_buckets table."""
+
+    def __init__(self, limits: dict[str, float]):
+        self.limits = {name: rate for name, rate in limits.items() if rate > 0}
+
+    def try_take(self, costs: dict[str, float]) -> float:
+        db = SessionLocal()
+        try:
+            rows = {
+                row.name: row for row in
+                db.query(LLMRateBucket).filter(LLMRateBucket.name.in_(list(self.limits))).with_for_update()
+            }
+            now = time.time()
+            wait = 0.0
+            for name, rate in self.limits.items():
+                row = rows.get(name)
+                if row is None:
+                    row = rows[name] = LLMRateBucket(name=name, tokens=rate, updated_at=now)
+                    db.add(row)
+                row.tokens, row.updated_at = _refill(row.tokens, row.updated_at, now, rate), now
+                wait = max(wait, _shortfall_wait(row.tokens, min(costs.get(name, 0), rate), rate))
+            if not wait:
+                for name, rate in self.limits.items():
+                    rows[name].tokens -= min(costs.get(name, 0), rate)
+            db.commit()
+            return wait
+        except IntegrityError:
+            db.rollback()  # another worker created the row first
+            return 0.05
+        finally:
+            db.close()
+
+    def adjust(self, name: str, delta: float):
+        if name not in self.limits:
+            return
+        db = SessionLocal()
+        try:
+            db.query(LLMRateBucket).filter(LLMRateBucket.name == name).update(
+                {LLMRateBucket.tokens: LLMRateBucket.tokens - delta}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+
+# ---------- Priority queue ----------
+class _Waiter:
+    __slots__ = ("priority", "seq", "rejected", "taking")
+
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.rejected = False
+        self.taking = False  # drawing from the buckets right now; cannot be displaced
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Admission:
+    """Only the head of the queue draws from the buckets, one draw at a time.
+    The draw itself runs without the condition lock: with SQLBuckets it is a
+    database round-trip, and other callers must still be able to queue, time
+    out or be displaced meanwhile."""
+
+    def __init__(self, buckets, max_queue: int, max_wait: dict[int, float]):
+        self.buckets = buckets
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._last_wait = 1.0
+        self._taking = False
+
+    def _remove(self, waiter: _Waiter):
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+        self._cond.notify_all()
+
+    def _enqueue(self, waiter: _Waiter):
+        if len(self._queue) >= self.max_queue:
+            displaceable = [w for w in self._queue if not w.taking]
+            worst = max(displaceable) if displaceable else None
+            if worst is None or not waiter < worst:
+                raise LLMRateLimited(self._last_wait)
+            # a more urgent call displaces the least urgent queued one
+            worst.rejected = True
+            self._remove(worst)
+        heapq.heappush(self._queue, waiter)
+
+    def _wait_for_turn(self, waiter: _Waiter, deadline: float):
+        """Block (holding the lock on return) until waiter is the head and nobody is drawing."""
+        while True:
+            if waiter.rejected:
+                raise LLMRateLimited(self._last_wait)
+            if self._queue[0] is waiter and not self._taking:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMRateLimited(self._last_wait)
+            self._cond.wait(remaining)
+
+    def acquire(self, priority: int, tokens: int):
+        label = PRIORITY_NAMES[priority]
+        started = time.monotonic()
+        deadline = started + self.max_wait[priority]
+        waiter = _Waiter(priority, next(self._seq))
+        try:
+            with self._cond:
+                self._enqueue(waiter)
+            while True:
+                with self._cond:
+                    self._wait_for_turn(waiter, deadline)
+                    self._taking = waiter.taking = True
+                wait = None
+                try:
+                    wait = self.buckets.try_take({"requests": 1, "tokens": tokens})
+                finally:
+                    with self._cond:
+                        self._taking = waiter.taking = False
+                        if wait == 0:
+                            self._remove(waiter)
+                        else:
+                            self._cond.notify_all()  # a newer, more urgent head may draw now
+                if wait == 0:
+                    break
+                with self._cond:
+                    self._last_wait = wait
+                    remaining = deadline - time.monotonic()
+                    if wait > remaining:
+                        raise LLMRateLimited(wait)
+                    self._cond.wait(wait)
+        except BaseException as e:
+            with self._cond:
+                self._remove(waiter)
+            if isinstance(e, LLMRateLimited):
+                LLM_REJECTED.labels(priority=label).inc()
+                logger.warning("LLM call rejected by admission control", extra={"priority": label})
+            raise
+        LLM_QUEUE_WAIT.labels(priority=label).observe(time.monotonic() - started)
+
+    def settle(self, estimate: int, response):
+        usage = getattr(response, "usage_metadata", None)
+        actual = getattr(usage, "total_token_count", None) if usage is not None else None
+        if actual:
+            self.buckets.adjust("tokens", actual - estimate)
+
+
+# ---------- Provider wrapper ----------
+class _RateLimitedChat:
+    def __init__(self, provider: "RateLimitedProvider", inner, history: list[dict]):
+        self._provider = provider
+        self._inner = inner
+        # Gemini bills the whole conversation on every turn
+        self._chars = sum(len(str(p)) for h in history or [] for p in h.get("parts", []))
+
+    @property
+    def history(self):
+        return self._inner.history
+
+    def send_message(self, message: str):
+        response = self._provider._admit(self._chars + len(message), lambda: self._inner.send_message(message))
+        self._chars += len(message) + len(response.text or "")
+        return response
+
+    def rewind(self):
+        return self._inner.rewind()
+
+
+class RateLimitedProvider:
+    def __init__(self, inner, admission: Admission):
+        self.inner = inner
+        self.admission = admission
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+    @property
+    def model_id(self) -> str:
+        return self.inner.model_id
+
+    def _admit(self, chars: int, call):
+        estimate = chars // 4 + settings.LLM_EST_OUTPUT_TOKENS
+        self.admission.acquire(priority_for(current_prompt()), estimate)
+        response = call()
+        self.admission.settle(estimate, response)
+        return response
+
+    def generate(self, prompt: str):
+        return self._admit(len(prompt), lambda: self.inner.generate(prompt))
+
+    def start_chat(self, history: list[dict]):
+        return _RateLimitedChat(self, self.inner.start_chat(history), history)
+
+
+def build_admission() -> Admission:
+    limits = {"requests": settings.LLM_RPM, "tokens": settings.LLM_TPM}
+    buckets = SQLBuckets(limits) if settings.LLM_RATE_LIMIT_BACKEND == "sql" else MemoryBuckets(limits)
+    interactive = settings.LLM_QUEUE_MAX_WAIT_SECONDS
+    return Admission(buckets, settings.LLM_QUEUE_MAX,
+                     {LIVE: interactive, ANALYSIS: interactive, BATCH: settings.LLM_BATCH_MAX_WAIT_SECONDS})
@@ -0,0 +1,252 @@
+"""
+Pluggable LLM provider.
+
+All model calls go through get_llm():
+    get_llm().generate(prompt)          -> response with .text (and .usage_metadata)
+    get_llm().start_chat(history)       -> chat with .send_message(text), .rewind(), .history
+
+LLM_PROVIDER selects the implementation:
+  - "gemini": google-generativeai (default)
+  - "fake":   deterministic local stand-in for load tests. Replies are schema-valid
+              for each prompt type (analyze, next, evaluate, detailed, summary, ...),
+              with latency drawn from LLM_FAKE_LATENCY and failures injected at
+              LLM_FAKE_ERROR_RATE. No network, no quota.
+
+LLM_FAKE_LATENCY formats (milliseconds):
+    fixed:300 | uniform:200,1200 | normal:800,150 | lognormal:800,0.5 (median, sigma)
+
+Wrapping order, innermost first:
+  1. the base provider, or the cassette around it (LLM_CASSETTE_MODE=record|replay,
+     see llm_cassette)
+  2. BreakerProvider: the circuit breaker (see llm_breaker) times upstream calls only
+  3. RateLimitedProvider: admission control for LLM_RPM / LLM_TPM (see llm_limiter)
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+from app.core.config import settings
+from app.core.metrics import current_prompt
+
+
+# ---------- Gemini ----------
+class GeminiProvider:
+    name = "gemini"
+
+    def __init__(self, model_name: str = None):
+        import google.generativeai as genai
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self._genai = genai
+        self.model_name = model_name or settings.GEMINI_MODEL
+
+    @property
+    def model_id(self) -> str:
+        return self.model_name
+
+    def generate(self, prompt: str):
+        return self._genai.GenerativeModel(self.model_name).generate_content(prompt)
+
+    def start_chat(self, history: list[dict]):
+        return self._genai.GenerativeModel(self.model_name).start_chat(history=history)
+
+
+# ---------- Fake ----------
+class FakeLLMError(RuntimeError):
+    """Injected failure (stands in for a 429/503 from the real API)."""
+
+
+_QUESTIONS = [
+    "What motivated you to apply for this kind of role?",
+    "Can you walk me through a project you are particularly proud of?",
+    "How do you usually approach a problem you have never seen before?",
+    "Tell me about a time you disagreed with a teammate. How did you resolve it?",
+    "Which technical skill have you improved the most over the last year?",
+    "How do you prioritize when several deadlines collide?",
+    "What would your previous manager say is your biggest strength?",
+    "Describe a mistake you made at work and what you learned from it.",
+    "Where do you see your career in the next three years?",
+    "How do you keep up with changes in your field?",
+]
+_FEEDBACK = [
+    "Clear answer; a concrete metric would make it stronger.",
+    "Good structure, but go deeper into your own contribution.",
+    "Confident delivery; tie the example back to the role.",
+    "Relevant example; keep it a little more concise.",
+]
+
+
+def parse_latency(spec: str):
+    """'lognormal:800,0.5' -> callable(rng) returning seconds."""
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] or [0.0]
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal":
+        import math
+        mu = math.log(max(values[0], 1e-3))
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Unknown LLM_FAKE_LATENCY distribution: {spec}")
+
+
+def _response(text: str, prompt: str):
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(text) // 4
+    return SimpleNamespace(text=text, usage_metadata=SimpleNamespace(
+        prompt_token_count=prompt_tokens,
+        candidates_token_count=completion_tokens,
+        total_token_count=prompt_tokens + completion_tokens,
+    ))
+
+
+class FakeChat:
+    def __init__(self, provider: "FakeProvider", history: list[dict]):
+        self._provider = provider
+        self.history = [dict(h) for h in history or []]
+
+    def send_message(self, message: str):
+        turn = sum(1 for h in self.history if h["role"] == "model")
+        seed = self.history[0]["parts"][0] if self.history else ""
+        self._provider._simulate()
+        offset = int(hashlib.sha256(seed.encode("utf-8")).hexdigest(), 16) % len(_QUESTIONS)
+        text = _QUESTIONS[(offset + turn) % len(_QUESTIONS)]
+        self.history += [{"role": "user", "parts": [message]}, {"role": "model", "parts": [text]}]
+        return _response(text, message)
+
+    def rewind(self):
+        removed = self.history[-2:]
+        self.history = self.history[:-2]
+        return removed
+
+
+class FakeProvider:
+    name = "fake"
+
+    def __init__(self, latency: str = None, error_rate: float = None, seed: int = None):
+        self._latency = parse_latency(latency if latency is not None else settings.LLM_FAKE_LATENCY)
+        self.error_rate = settings.LLM_FAKE_ERROR_RATE if error_rate is None else error_rate
+        self.seed = settings.LLM_FAKE_SEED if seed is None else seed
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return f"fake-{self.seed}"
+
+    def _simulate(self):
+        with self._rng_lock:
+            delay = self._latency(self._rng)
+            fail = self._rng.random() < self.error_rate
+        time.sleep(delay)
+        if fail:
+            raise FakeLLMError("injected fake LLM failure")
+
+    def _prompt_rng(self, prompt: str) -> random.Random:
+        # content-derived: the same prompt always gets the same reply
+        return random.Random(f"{self.seed}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}")
+
+    def generate(self, prompt: str):
+        self._simulate()
+        rng = self._prompt_rng(prompt)
+        kind = current_prompt()
+        if kind == "analyze":
+            text = json.dumps({
+                "score": rng.randint(45, 95),
+                "intro": "A motivated professional with solid hands-on experience and clear communication.",
+                "digest": {
+                    "skills": rng.sample(["Python", "SQL", "React", "Docker", "AWS", "Leadership", "Testing"], 4),
+                    "roles": ["Software Engineer @ Example Corp"],
+                    "years_experience": rng.randint(1, 12),
+                    "highlights": ["Shipped a customer-facing feature used by thousands of users"],
+                },
+            }, indent=2)
+        elif kind == "evaluate":
+            text = f"Score (0-20): {rng.randint(6, 19)}\nFeedback: {rng.choice(_FEEDBACK)}"
+        elif kind == "detailed":
+            dims = {d: rng.randint(6, 19) for d in ("clarity", "coherence", "confidence", "technical_depth", "engagement")}
+            text = json.dumps({**dims, "feedback": rng.choice(_FEEDBACK)})
+        elif kind == "rolling_summary":
+            text = "- Gives relevant examples\n- Could quantify impact more often"
+        elif kind == "summary":
+            text = (
+                "**Overall Impression:** The candidate answered consistently and with relevant examples.\n"
+                "**Key Strengths:**\n• Clear communication\n• Practical experience\n"
+                "**Areas for Improvement:**\n• Quantify results\n• Go deeper on technical trade-offs"
+            )
+        elif kind == "batch_score":
+            answers = []
+            for index in range(1, prompt.count("[answer=") + 1):
+                dims = {d: rng.randint(6, 19) for d in ("clarity", "coherence", "confidence", "technical_depth", "engagement")}
+                answers.append({"index": index, "sub_score": rng.randint(6, 19), **dims, "feedback": rng.choice(_FEEDBACK)})
+            text = json.dumps({"answers": answers})
+        elif kind == "explain":
+            job_ids = [int(part.split("]")[0]) for part in prompt.split("[job_id=")[1:]]
+            text = json.dumps({"reasons": [
+                {"job_id": j, "reason": "Overlapping skills and comparable seniority."} for j in job_ids
+            ]})
+        else:
+            text = "OK"
+        return _response(text, prompt)
+
+    def start_chat(self, history: list[dict]):
+        return FakeChat(self, history)
+
+
+# ---------- Selection ----------
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def _build_base_provider(name: str):
+    mode = settings.LLM_CASSETTE_MODE
+    if mode == "replay":
+        # served entirely from the cassette: no API key or quota needed
+        from app.services.llm_cassette import CassetteProvider
+        return CassetteProvider(settings.LLM_CASSETTE_PATH, "replay", time_scale=settings.LLM_CASSETTE_TIME_SCALE)
+
+    if name == "fake":
+        provider = FakeProvider()
+    elif name == "gemini":
+        provider = GeminiProvider()
+    else:
+        raise ValueError(f"Unknown LLM_PROVIDER: {name}")
+
+    if mode == "record":
+        from app.services.llm_cassette import CassetteProvider
+        return CassetteProvider(settings.LLM_CASSETTE_PATH, "record", inner=provider)
+    return provider
+
+
+def _build_provider(name: str):
+    provider = _build_base_provider(name)
+    # the breaker sits inside the limiter: it times the upstream call only,
+    # never the admission-queue wait
+    if settings.LLM_BREAKER_ENABLED:
+        from app.services.llm_breaker import BreakerProvider, breaker
+        provider = BreakerProvider(provider, breaker)
+    if settings.LLM_RPM > 0 or settings.LLM_TPM > 0:
+        from app.services.llm_limiter import RateLimitedProvider, build_admission
+        provider = RateLimitedProvider(provider, build_admission())
+    return provider
+
+
+def get_llm():
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = _build_provider(settings.LLM_PROVIDER)
+    return _provider
+
+
+def set_llm(provider) -> Optional[object]:
+    """Swap the process-wide provider (e.g. wrap it); returns the previous one."""
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    return previous
@@ -0,0 +1,177 @@
+"""
+Lazy, batched explanations for job matches.
+
+/api/jobs/match returns immediately; with explain=true the missing reasons for
+all top-k jobs are generated afterwards in ONE structured LLM call and
+written to job_matches.reason. Reasons are reused for every later match of
+the same (resume hash, job id), and clients poll /api/jobs/match/reasons.
+
+The "pending" state is job_matches.reason_status, so a poll served by another
+worker sees it too; a row left pending by a crashed worker stops reporting
+pending after PENDING_TIMEOUT_SECONDS.
+"""
+import html
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from app.core.database import SessionLocal
+from app.core.metrics import instrument
+from app.models.job import JobMatch, JobPosting
+from app.services.interviewer_service import _gen_with_retry, get_resume_context
+
+logger = logging.getLogger(__name__)
+
+MAX_DESCRIPTION_CHARS = 700
+_TAG_RE = re.compile(r"<[^>]+>")
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+PENDING_TIMEOUT_SECONDS = 300
+
+
+def mark_pending(match_ids: list[int]):
+    db = SessionLocal()
+    try:
+        db.query(JobMatch).filter(JobMatch.id.in_(match_ids), JobMatch.reason.is_(None)).update(
+            {JobMatch.reason_status: PENDING}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _finish(match_ids: list[int]):
+    """Settle the requested rows: done if a reason was written, failed otherwise."""
+    db = SessionLocal()
+    try:
+        for status, has_reason in ((DONE, JobMatch.reason.isnot(None)), (FAILED, JobMatch.reason.is_(None))):
+            db.query(JobMatch).filter(JobMatch.id.in_(match_ids), has_reason).update(
+                {JobMatch.reason_status: status}, synchronize_session=False
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _plain(text: str, limit: int) -> str:
+    text = html.unescape(_TAG_RE.sub(" ", text or ""))
+    return " ".join(text.split())[:limit]
+
+
+def _build_prompt(candidate: str, jobs: list[JobPosting]) -> str:
+    listing = "\n\n".join(
+        f"[job_id={j.id}] {j.title} @ {j.company or 'Unknown'}\n{_plain(j.description, MAX_DESCRIPTION_CHARS)}"
+        for j in jobs
+    )
+    return f"""
+    You are a career advisor. For EACH job below, explain in 1-2 sentences why it
+    fits (or partly fits) the candidate, citing concrete skills or experience.
+
+    🎯 Output strictly in this JSON format, one entry per job:
+    {{"reasons": [{{"job_id": <id>, "reason": "<1-2 sentences>"}}, ...]}}
+
+    Candidate:
+    {candidate}
+
+    Jobs:
+    {listing}
+    """
+
+
+def _parse_reasons(text: str, job_ids: set[int]) -> dict[int, str]:
+    m = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not m:
+        return {}
+    try:
+        items = json.loads(m.group(0)).get("reasons") or []
+    except (ValueError, AttributeError):
+        return {}
+    reasons = {}
+    for item in items:
+        try:
+            job_id = int(item.get("job_id"))
+        except (TypeError, ValueError, AttributeError):
+            continue
+        reason = str(item.get("reason") or "").strip()
+        if job_id in job_ids and reason:
+            reasons[job_id] = reason
+    return reasons
+
+
+@instrument("explain")
+def explain_matches(match_ids: list[int], session_id: Optional[int] = None, resume_text: str = ""):
+    """Fill job_matches.reason for the given rows with a single LLM call. Runs as a background task."""
+    db = SessionLocal()
+    try:
+        matches = db.query(JobMatch).filter(JobMatch.id.in_(match_ids), JobMatch.reason.is_(None)).all()
+        if not matches:
+            return
+        resume_hash = matches[0].resume_hash
+        job_ids = {m.job_id for m in matches}
+
+        # another request may have explained some of these jobs meanwhile
+        cached = dict(
+            db.query(JobMatch.job_id, JobMatch.reason).filter(
+                JobMatch.resume_hash == resume_hash,
+                JobMatch.job_id.in_(job_ids),
+                JobMatch.reason.isnot(None),
+            )
+        )
+        todo = job_ids - cached.keys()
+
+        reasons = dict(cached)
+        if todo:
+            jobs = db.query(JobPosting).filter(JobPosting.id.in_(todo)).order_by(JobPosting.id).all()
+            candidate = get_resume_context(session_id, resume_text) if session_id else (resume_text or "")[:2000]
+            logger.info("Explaining %d job matches in one call", len(jobs))
+            response = _gen_with_retry(_build_prompt(candidate, jobs))
+            generated = _parse_reasons(response.text, todo)
+            if len(generated) < len(todo):
+                logger.warning("Missing reasons for jobs: %s", sorted(todo - generated.keys()))
+            reasons.update(generated)
+
+        # write to every unexplained row of this resume, so older matches benefit too
+        for job_id, reason in reasons.items():
+            db.query(JobMatch).filter(
+                JobMatch.resume_hash == resume_hash,
+                JobMatch.job_id == job_id,
+                JobMatch.reason.is_(None),
+            ).update({JobMatch.reason: reason, JobMatch.reason_status: DONE}, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.exception("Error explaining matches: %s", e)
+    finally:
+        db.close()
+        try:
+            _finish(match_ids)
+        except Exception as e:
+            logger.warning("Could not settle reason status: %s", e)
+
+
+def match_reasons(match_ids: list[int]) -> list[dict]:
+    """Poll view: reason per match, `pending` while it is still being generated."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(JobMatch.id, JobMatch.job_id, JobMatch.reason, JobMatch.reason_status, JobMatch.created_at)
+            .filter(JobMatch.id.in_(match_ids))
+            .order_by(JobMatch.id)
+            .all()
+        )
+    finally:
+        db.close()
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=PENDING_TIMEOUT_SECONDS)
+
+    def _pending(reason, status, created_at):
+        if reason is not None or status != PENDING:
+            return False
+        if created_at is not None and created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return created_at is None or created_at > cutoff
+
+    return [
+        {"match_id": mid, "job_id": job_id, "reason": reason, "pending": _pending(reason, status, created_at)}
+        for mid, job_id, reason, status, created_at in rows
+    ]
@@ -0,0 +1,102 @@
+"""
+KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+A small, mergeable summary of a stream of numbers that answers rank/quantile
+queries with error ~O(1/k), independent of how many values were added. Stored
+as compact JSON in cohort_sketches.
+"""
+import json
+import math
+import random
+
+_C = 2.0 / 3.0  # capacity decay per level
+
+
+class KLLSketch:
+    def __init__(self, k: int = 200):
+        self.k = k
+        self.compactors: list[list[float]] = []
+        self.n = 0
+        self._size = 0
+        self._max_size = 0
+        self._grow()
+
+    # ---------- internals ----------
+    def _capacity(self, level: int) -> int:
+        height = len(self.compactors)
+        return int(math.ceil(self.k * (_C ** (height - level - 1)))) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self):
+        for level, items in enumerate(self.compactors):
+            if len(items) >= self._capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                items.sort()
+                offset = random.random() < 0.5
+                promoted = items[offset::2]
+                self.compactors[level + 1].extend(promoted)
+                self._size += len(promoted) - len(items)
+                self.compactors[level] = []
+                if self._size < self._max_size:
+                    break
+
+    # ---------- public API ----------
+    def update(self, value: float):
+        self.compactors[0].append(float(value))
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.n += other.n
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def rank(self, value: float) -> float:
+        """Fraction of values <= value (0..1)."""
+        if not self.n:
+            return 0.0
+        below = total = 0
+        for level, items in enumerate(self.compactors):
+            weight = 1 << level
+            total += len(items) * weight
+            below += sum(weight for x in items if x <= value)
+        return below / total if total else 0.0
+
+    def quantile(self, q: float) -> float | None:
+        weighted = sorted(
+            (x, 1 << level) for level, items in enumerate(self.compactors) for x in items
+        )
+        if not weighted:
+            return None
+        total = sum(w for _, w in weighted)
+        target, acc = q * total, 0
+        for x, w in weighted:
+            acc += w
+            if acc >= target:
+                return x
+        return weighted[-1][0]
+
+    def to_json(self) -> str:
+        return json.dumps({"k": self.k, "n": self.n, "c": self.compactors}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "KLLSketch":
+        data = json.loads(raw)
+        sketch = cls(k=data["k"])
+        while len(sketch.compactors) < len(data["c"]):
+            sketch._grow()
+        sketch.compactors[:len(data["c"])] = data["c"]
+        sketch.n = data["n"]
+        sketch._size = sum(len(c) for c in sketch.compactors)
+        return sketch
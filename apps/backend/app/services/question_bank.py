@@ -0,0 +1,90 @@
+"""
+Local question bank used when the LLM is unavailable (circuit open).
+
+Questions are embedded once per process with the default embedding model; the
+next question is the unasked one closest to the candidate's profile (resume
+digest or truncated resume), so a degraded interview still follows the resume.
+"""
+import logging
+import math
+import threading
+from app.services.embeddings_service import encode
+
+logger = logging.getLogger(__name__)
+
+QUESTIONS = [
+    # general / behavioural
+    "Can you briefly walk me through your background and what brought you to this role?",
+    "Tell me about a project you are particularly proud of and your specific contribution to it.",
+    "Describe a time you disagreed with a teammate. How did you resolve it?",
+    "Tell me about a mistake you made at work and what you changed afterwards.",
+    "How do you prioritize when several deadlines collide?",
+    "Describe a situation where you had to learn a new skill quickly to deliver something.",
+    "How do you keep your skills up to date in your field?",
+    "What kind of feedback have you received recently, and how did you act on it?",
+    # software engineering
+    "How do you approach designing a REST API that other teams will depend on?",
+    "Walk me through how you would debug a production issue you cannot reproduce locally.",
+    "How do you decide what to cover with unit tests versus integration tests?",
+    "Describe a time you improved the performance of a slow service or query. How did you find the bottleneck?",
+    "How do you keep a growing codebase maintainable when many people contribute to it?",
+    "Tell me about a time you had to make a trade-off between shipping fast and code quality.",
+    # data / ML
+    "How do you validate that a machine learning model is ready for production?",
+    "Describe a data pipeline you built. How did you handle bad or late data?",
+    "How would you explain a model's predictions to a non-technical stakeholder?",
+    "Tell me about an analysis where the data contradicted what the business expected.",
+    # frontend
+    "How do you make a web application feel fast on slow devices and networks?",
+    "How do you manage state in a large frontend application?",
+    "How do you approach accessibility when building user interfaces?",
+    # infrastructure / devops
+    "How would you design the deployment pipeline for a service that must not go down?",
+    "Describe an incident you handled. What did the post-mortem change?",
+    "How do you decide what to monitor and alert on for a new service?",
+    "How have you used infrastructure as code, and what problems did it solve for you?",
+    # product / management
+    "How do you decide what goes into the next release when everything seems important?",
+    "Tell me about a time you had to say no to a stakeholder.",
+    "How do you measure whether a feature you shipped was successful?",
+    "How do you help a struggling team member improve?",
+    "Describe how you run a project from kickoff to delivery with several teams involved.",
+    # sales / customer-facing
+    "Tell me about a difficult customer conversation and how you handled it.",
+    "How do you build trust with a new client or partner?",
+]
+
+_vectors = None
+_lock = threading.Lock()
+
+
+def _question_vectors() -> list[list[float]]:
+    global _vectors
+    if _vectors is None:
+        with _lock:
+            if _vectors is None:
+                _vectors = encode(QUESTIONS)
+    return _vectors
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def pick_question(profile_text: str, asked: list[str]) -> str | None:
+    """Most relevant question not asked yet; falls back to bank order if embedding fails."""
+    remaining = [i for i, q in enumerate(QUESTIONS) if q not in asked]
+    if not remaining:
+        return None
+    if not asked:
+        return QUESTIONS[0]  # always open with the introduction
+    try:
+        profile = encode([profile_text or ""])[0]
+        vectors = _question_vectors()
+        best = max(remaining, key=lambda i: _cosine(profile, vectors[i]))
+    except Exception as e:
+        logger.warning("Question bank ranking failed, using bank order: %s", e)
+        best = remaining[0]
+    return QUESTIONS[best]
@@ -0,0 +1,250 @@
+"""
+Keeps the Chroma collections in sync with the SQL tables.
+
+For each table and every collection it is written to (the active one, plus
+the pending one while a re-embedding run fills it, each with its own model),
+the reconciler:
+  1. walks the table in id order, chunk by chunk, and compares each row's
+     content hash with the one stored in the vector metadata
+     -> missing or stale vectors are batch-embedded and upserted
+  2. walks the collection ids chunk by chunk and looks them up in SQL
+     -> vectors without a row (orphans) are deleted
+
+Run once:      python -m app.services.reconcile_service [--dry-run]
+Run regularly: set RECONCILE_INTERVAL_SECONDS (see app.main); every worker runs
+               the loop, but a Postgres advisory lock lets only one of them
+               reconcile at a time (the others skip that run)
+"""
+import argparse
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.logging_config import setup_logging
+from app.models.job import JobPosting
+from app.models.resume import Resume
+from app.services.embeddings_service import content_hash, encode, write_targets
+from app.services.job_service import _job_metadata
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- Table <-> collection bindings ----------
+class IndexBinding:
+    def __init__(self, kind, model_cls, text_attr,
+                 to_vector_id: Callable[[int], str],
+                 from_vector_id: Callable[[str], Optional[int]],
+                 metadata: Callable[[object], dict],
+                 indexed=None):
+        self.kind = kind
+        self.model_cls = model_cls
+        self.text_attr = text_attr
+        self.to_vector_id = to_vector_id
+        self.from_vector_id = from_vector_id
+        self.metadata = metadata
+        # optional SQL criterion: rows that should have a vector (others count as orphans)
+        self.indexed = indexed
+
+    def rows_query(self, db: Session, *columns):
+        q = db.query(*(columns or (self.model_cls,)))
+        return q.filter(self.indexed) if self.indexed is not None else q
+
+
+def _parse_int(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+BINDINGS = {
+    "jobs": IndexBinding(
+        kind="jobs",
+        model_cls=JobPosting,
+        text_attr="description",
+        to_vector_id=lambda i: f"job:{i}",
+        from_vector_id=lambda v: _parse_int(v.replace("job:", "", 1)),
+        metadata=_job_metadata,
+        # near-duplicates are folded into their canonical job and not embedded
+        indexed=JobPosting.canonical_job_id.is_(None),
+    ),
+    "resumes": IndexBinding(
+        kind="resumes",
+        model_cls=Resume,
+        text_attr="text_content",
+        to_vector_id=lambda i: str(i),
+        from_vector_id=_parse_int,
+        metadata=lambda r: {"resume_id": r.id, "content_hash": content_hash(r.text_content)},
+    ),
+}
+
+
+# ---------- Pass 1: rows -> vectors ----------
+def _sync_rows(db: Session, b: IndexBinding, col, model_name: str,
+               chunk_size: int, dry_run: bool, report: dict):
+    last_id = 0
+    while True:
+        rows = (
+            b.rows_query(db)
+            .filter(b.model_cls.id > last_id)
+            .order_by(b.model_cls.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+        report["rows"] += len(rows)
+
+        ids = [b.to_vector_id(r.id) for r in rows]
+        existing = col.get(ids=ids, include=["metadatas"])
+        stored = {
+            vid: (meta or {}).get("content_hash")
+            for vid, meta in zip(existing["ids"], existing["metadatas"] or [None] * len(existing["ids"]))
+        }
+
+        to_embed = []
+        for r in rows:
+            vid = b.to_vector_id(r.id)
+            text = getattr(r, b.text_attr) or ""
+            if vid not in stored:
+                report["missing"] += 1
+                to_embed.append(r)
+            elif stored[vid] != content_hash(text):
+                report["stale"] += 1
+                to_embed.append(r)
+
+        if to_embed and not dry_run:
+            texts = [getattr(r, b.text_attr) or "" for r in to_embed]
+            col.upsert(
+                ids=[b.to_vector_id(r.id) for r in to_embed],
+                embeddings=encode(texts, model_name=model_name, batch_size=min(len(texts), 64)),
+                documents=texts,
+                metadatas=[b.metadata(r) for r in to_embed],
+            )
+            report["embedded"] += len(to_embed)
+
+        # keep the identity map small between chunks
+        db.expunge_all()
+
+
+# ---------- Pass 2: vectors -> rows ----------
+def _find_orphans(db: Session, b: IndexBinding, col, chunk_size: int, report: dict) -> list:
+    orphans = []
+    offset = 0
+    while True:
+        page = col.get(include=[], limit=chunk_size, offset=offset)
+        vids = page["ids"]
+        if not vids:
+            break
+        offset += len(vids)
+        report["vectors"] += len(vids)
+
+        parsed = {vid: b.from_vector_id(vid) for vid in vids}
+        row_ids = [i for i in parsed.values() if i is not None]
+        found = {
+            i for (i,) in b.rows_query(db, b.model_cls.id).filter(b.model_cls.id.in_(row_ids)).all()
+        } if row_ids else set()
+        orphans.extend(vid for vid, i in parsed.items() if i is None or i not in found)
+    return orphans
+
+
+_COUNTS = ("rows", "vectors", "missing", "stale", "orphans", "embedded", "deleted")
+
+
+def _reconcile_collection(db: Session, b: IndexBinding, col, model_name: str,
+                          chunk_size: int, dry_run: bool) -> dict:
+    report = {"collection": col.name, "model": model_name, **{k: 0 for k in _COUNTS}}
+    _sync_rows(db, b, col, model_name, chunk_size, dry_run, report)
+    # collected first, deleted afterwards so offset paging stays stable
+    orphans = _find_orphans(db, b, col, chunk_size, report)
+    report["orphans"] = len(orphans)
+    if not dry_run:
+        for i in range(0, len(orphans), chunk_size):
+            col.delete(ids=orphans[i:i + chunk_size])
+        report["deleted"] = len(orphans)
+    return report
+
+
+def reconcile(kind: str, chunk_size: Optional[int] = None, dry_run: bool = False) -> dict:
+    """Reconcile every collection of a kind ('jobs' or 'resumes') and return a drift
+    report: counts summed over the collections, one entry per collection in "targets"."""
+    b = BINDINGS[kind]
+    targets = write_targets(kind)
+    chunk_size = chunk_size or settings.RECONCILE_CHUNK_SIZE
+    report = {
+        "collection": targets[0][0].name, "kind": kind, **{k: 0 for k in _COUNTS},
+        "dry_run": dry_run, "targets": [],
+    }
+    started = time.time()
+    db = SessionLocal()
+    try:
+        for col, model_name in targets:
+            target = _reconcile_collection(db, b, col, model_name, chunk_size, dry_run)
+            report["targets"].append(target)
+            for k in _COUNTS:
+                report[k] += target[k]
+    finally:
+        db.close()
+    report["elapsed_s"] = round(time.time() - started, 3)
+    return report
+
+
+# pg_try_advisory_lock key shared by all workers ("reco")
+RUN_LOCK_KEY = 0x7265636F
+
+
+@contextmanager
+def _run_lock():
+    """Cross-process run lock; yields False when another worker holds it. Session-level,
+    so Postgres releases it if the holder's connection dies."""
+    with engine.connect() as conn:
+        acquired = bool(conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": RUN_LOCK_KEY}).scalar())
+        conn.commit()  # the lock outlives the transaction; do not sit idle in one
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": RUN_LOCK_KEY})
+                conn.commit()
+
+
+def reconcile_all(chunk_size: Optional[int] = None, dry_run: bool = False,
+                  exclusive: bool = False) -> list[dict]:
+    """exclusive=True skips the run (returns []) while another worker is reconciling."""
+    if exclusive:
+        with _run_lock() as acquired:
+            if not acquired:
+                logger.info("Reconciler already running in another worker, skipped")
+                return []
+            return reconcile_all(chunk_size=chunk_size, dry_run=dry_run)
+    reports = []
+    for kind in BINDINGS:
+        report = reconcile(kind, chunk_size=chunk_size, dry_run=dry_run)
+        logger.info(
+            "Reconciled %s: rows=%d vectors=%d missing=%d stale=%d orphans=%d",
+            kind, report["rows"], report["vectors"], report["missing"], report["stale"], report["orphans"],
+            extra={"reconcile": report},
+        )
+        reports.append(report)
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile Chroma collections with SQL tables.")
+    parser.add_argument("--only", choices=["jobs", "resumes"], help="reconcile a single collection")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="report drift without writing")
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.only:
+        result = [reconcile(args.only, chunk_size=args.chunk_size, dry_run=args.dry_run)]
+    else:
+        result = reconcile_all(chunk_size=args.chunk_size, dry_run=args.dry_run)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,181 @@
+"""
+Blue/green re-embedding for embedding-model upgrades.
+
+    python -m app.services.reembed_service --model all-mpnet-base-v2 [--switch]
+
+1. `start` registers a *pending* collection named after the new model
+   (e.g. "jobs__all-mpnet-base-v2"); from then on every write goes to both the
+   active and the pending collection (embeddings_service.write_targets).
+2. The table is read in keyset-paginated chunks (id > last_id) and embedded by a
+   pool of workers; the highest fully-written id is checkpointed in the index
+   state, so an interrupted run resumes where it stopped.
+3. `switch` atomically moves reads to the pending collection. The previous one is
+   kept as "previous" so `--rollback` can move reads back.
+"""
+import argparse
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from sqlalchemy import func
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging_config import setup_logging
+from app.services.embeddings_service import (
+    collection_name, encode, get_chroma_client, index_state, update_index_state
+)
+from app.services.reconcile_service import BINDINGS
+
+logger = logging.getLogger(__name__)
+
+
+def start(kind: str, model_name: str) -> dict:
+    """Register (or resume) a pending collection for model_name."""
+    def _start(state):
+        pending = state.get("pending")
+        if pending and pending["model"] == model_name:
+            return  # resume the existing run
+        if state["active"]["model"] == model_name:
+            raise ValueError(f"'{kind}' is already served by {model_name}")
+        state["pending"] = {
+            "model": model_name,
+            "collection": collection_name(kind, model_name),
+            "last_id": 0,
+            "done": False,
+        }
+    return update_index_state(kind, _start)["pending"]
+
+
+def _checkpoint(kind: str, last_id: int, done: bool = False):
+    def _update(state):
+        state["pending"]["last_id"] = last_id
+        state["pending"]["done"] = done
+    update_index_state(kind, _update)
+
+
+def _embed_chunk(col, model_name: str, b, rows: list, batch_size: int) -> int:
+    texts = [r[1] or "" for r in rows]
+    col.upsert(
+        ids=[b.to_vector_id(r[0]) for r in rows],
+        embeddings=encode(texts, model_name=model_name, batch_size=batch_size),
+        documents=texts,
+        metadatas=[r[2] for r in rows],
+    )
+    return len(rows)
+
+
+def run(kind: str, model_name: str, chunk_size: int = 500, workers: int = 2,
+        batch_size: int = 64) -> dict:
+    """Fill the pending collection for `kind`; returns throughput stats."""
+    b = BINDINGS[kind]
+    pending = start(kind, model_name)
+    col = get_chroma_client().get_or_create_collection(name=pending["collection"])
+    last_id = pending["last_id"]
+
+    db = SessionLocal()
+    try:
+        remaining = b.rows_query(db, func.count(b.model_cls.id)).filter(b.model_cls.id > last_id).scalar() or 0
+        logger.info("Re-embedding %d %s rows into '%s' (from id > %d)", remaining, kind, pending["collection"], last_id)
+
+        done_rows, started = 0, time.time()
+        in_flight = deque()  # (future, chunk_last_id), in submission order
+
+        def _drain(block_until: int):
+            nonlocal done_rows
+            while len(in_flight) > block_until:
+                future, chunk_last_id = in_flight.popleft()
+                done_rows += future.result()
+                # checkpoint only advances over chunks that are fully written
+                _checkpoint(kind, chunk_last_id)
+                elapsed = max(time.time() - started, 1e-6)
+                rate = done_rows / elapsed
+                eta = (remaining - done_rows) / rate if rate else 0
+                logger.info("%s: %d/%d rows | %.1f rows/s | ETA %.0fs", kind, done_rows, remaining, rate, eta)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            cursor = last_id
+            while True:
+                objs = (
+                    b.rows_query(db)
+                    .filter(b.model_cls.id > cursor)
+                    .order_by(b.model_cls.id)
+                    .limit(chunk_size)
+                    .all()
+                )
+                if not objs:
+                    break
+                # materialize plain tuples so workers never touch the session
+                rows = [(o.id, getattr(o, b.text_attr), b.metadata(o)) for o in objs]
+                db.expunge_all()
+                cursor = rows[-1][0]
+                in_flight.append((pool.submit(_embed_chunk, col, model_name, b, rows, batch_size), cursor))
+                _drain(block_until=workers * 2)
+            _drain(block_until=0)
+
+        _checkpoint(kind, cursor, done=True)
+        elapsed = time.time() - started
+        return {
+            "kind": kind,
+            "collection": pending["collection"],
+            "rows": done_rows,
+            "elapsed_s": round(elapsed, 2),
+            "rows_per_s": round(done_rows / elapsed, 1) if elapsed else None,
+        }
+    finally:
+        db.close()
+
+
+def switch(kind: str) -> dict:
+    """Atomically move reads to the completed pending collection."""
+    def _switch(state):
+        pending = state.get("pending")
+        if not pending or not pending.get("done"):
+            raise ValueError(f"No completed re-embedding run for '{kind}'")
+        state["previous"] = state["active"]
+        state["active"] = {"model": pending["model"], "collection": pending["collection"]}
+        del state["pending"]
+    state = update_index_state(kind, _switch)
+    logger.info("'%s' now served by %s", kind, state["active"]["collection"])
+    return state
+
+
+def rollback(kind: str) -> dict:
+    def _rollback(state):
+        if not state.get("previous"):
+            raise ValueError(f"No previous collection recorded for '{kind}'")
+        state["active"], state["previous"] = state["previous"], state["active"]
+    return update_index_state(kind, _rollback)
+
+
+def abort(kind: str) -> Optional[dict]:
+    """Stop dual writes and forget the pending run (its collection is left in place)."""
+    return update_index_state(kind, lambda state: state.pop("pending", None))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-embed resumes/jobs into a versioned collection.")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--kinds", nargs="+", choices=list(BINDINGS), default=list(BINDINGS))
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--switch", action="store_true", help="switch reads once a kind is complete")
+    parser.add_argument("--rollback", action="store_true", help="move reads back to the previous collection")
+    parser.add_argument("--abort", action="store_true", help="drop the pending run")
+    args = parser.parse_args()
+    setup_logging()
+
+    for kind in args.kinds:
+        if args.rollback:
+            print(rollback(kind))
+        elif args.abort:
+            abort(kind)
+            print(f"🛑 Pending re-embedding for '{kind}' aborted")
+        else:
+            print(run(kind, args.model, chunk_size=args.chunk_size,
+                      workers=args.workers, batch_size=args.batch_size))
+            if args.switch:
+                switch(kind)
+            else:
+                print(f"ℹ️ '{kind}' ready; active index is still {index_state(kind)['active']['collection']}")
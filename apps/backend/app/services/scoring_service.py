@@ -1,11 +1,9 @@
-import google.generativeai as genai
-from app.core.config import settings
-
-genai.configure(api_key=settings.GEMINI_API_KEY)
+from app.core.metrics import instrument
+from app.services.llm_provider import get_llm
 
+@instrument("analyze")
 def analyze_resume(resume_text: str):
     """Generate a score and short intro from resume"""
-    model = genai.GenerativeModel(settings.GEMINI_MODEL)
 
     prompt = f"""
     Analyze the following resume and:
@@ -16,7 +14,7 @@ def analyze_resume(resume_text: str):
     {resume_text}
     """
 
-    response = model.generate_content(prompt)
+    response = get_llm().generate(prompt)
     text = response.text.strip()
 
     # crude split, can refine later
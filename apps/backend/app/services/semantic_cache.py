@@ -0,0 +1,149 @@
+"""
+Semantic cache for answer-scoring prompts.
+
+Candidates often give near-identical answers ("I don't know", boilerplate
+intros). The exact-key llm_cache never matches those, so here the answer is
+embedded with the default embedding model and the nearest stored evaluation
+for the same question (exact match on a normalized question hash), prompt type
+and LLM model is reused when its cosine similarity reaches the prompt's
+threshold. Only the answer is embedded: a long question would otherwise
+dominate the vector and make opposite short answers look alike.
+
+    evaluation = semantic_cache.cached("evaluate", question, answer, _score,
+                                       cacheable=lambda r: r["complete"])
+
+Results the parser had to fill with defaults should be marked not cacheable.
+
+Entries live in a Chroma collection per embedding model and expire after the
+prompt's TTL. Opt-in with SEMANTIC_CACHE_ENABLED; lookups are counted in
+semantic_cache_lookups_total{prompt, result} and the best similarity of every
+lookup in semantic_cache_similarity (useful to tune the thresholds).
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Callable, Optional
+from app.core.config import settings
+from app.core.metrics import CHROMA_LATENCY, SEMANTIC_CACHE_LOOKUPS, SEMANTIC_CACHE_SIMILARITY, timed
+from app.services.embeddings_service import collection_name, encode, get_chroma_client
+from app.services.llm_provider import get_llm
+
+logger = logging.getLogger(__name__)
+
+# prompt type -> (min cosine similarity, ttl seconds)
+POLICIES = {
+    "evaluate": (settings.SEMANTIC_CACHE_THRESHOLD_EVALUATE, settings.SEMANTIC_CACHE_TTL_EVALUATE),
+    "detailed": (settings.SEMANTIC_CACHE_THRESHOLD_DETAILED, settings.SEMANTIC_CACHE_TTL_DETAILED),
+}
+
+# prune expired entries on roughly every Nth write
+PRUNE_EVERY = 100
+
+_writes = 0
+_writes_lock = threading.Lock()
+
+
+def enabled(prompt: str) -> bool:
+    return settings.SEMANTIC_CACHE_ENABLED and prompt in POLICIES
+
+
+def _collection():
+    # cosine space, so similarity = 1 - distance
+    return get_chroma_client().get_or_create_collection(
+        name=collection_name("semantic_cache", settings.EMBEDDING_MODEL),
+        metadata={"hnsw:space": "cosine"},
+    )
+
+
+def question_hash(question: str) -> str:
+    normalized = " ".join((question or "").lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def lookup(prompt: str, vector: list[float], model: str, question_key: str) -> dict | None:
+    threshold, _ = POLICIES[prompt]
+    with timed(CHROMA_LATENCY, collection="semantic_cache"):
+        results = _collection().query(
+            query_embeddings=[vector],
+            n_results=1,
+            where={"$and": [
+                {"prompt": prompt},
+                {"model": model},
+                {"question_hash": question_key},
+                {"expires_at": {"$gt": time.time()}},
+            ]},
+        )
+    if not results["ids"] or not results["ids"][0]:
+        return None
+    similarity = 1 - results["distances"][0][0]
+    SEMANTIC_CACHE_SIMILARITY.labels(prompt=prompt).observe(similarity)
+    if similarity < threshold:
+        return None
+    return json.loads(results["metadatas"][0][0]["value"])
+
+
+def store(prompt: str, vector: list[float], model: str, question_key: str, answer: str, value: dict):
+    global _writes
+    _, ttl = POLICIES[prompt]
+    entry_id = hashlib.sha256(f"{prompt}:{model}:{question_key}:{answer}".encode("utf-8")).hexdigest()
+    _collection().upsert(
+        ids=[entry_id],
+        embeddings=[vector],
+        documents=[answer],
+        metadatas=[{
+            "prompt": prompt,
+            "model": model,
+            "question_hash": question_key,
+            "expires_at": time.time() + ttl,
+            "value": json.dumps(value, ensure_ascii=False),
+        }],
+    )
+    with _writes_lock:
+        _writes += 1
+        should_prune = _writes % PRUNE_EVERY == 0
+    if should_prune:
+        prune()
+
+
+def prune():
+    _collection().delete(where={"expires_at": {"$lt": time.time()}})
+
+
+def clear():
+    get_chroma_client().delete_collection(collection_name("semantic_cache", settings.EMBEDDING_MODEL))
+
+
+def cached(prompt: str, question: str, answer: str, compute: Callable[[], dict],
+           cacheable: Optional[Callable[[dict], bool]] = None) -> dict:
+    """Reuse the evaluation of a close enough answer to the same question, or compute
+    and store it (unless cacheable(result) is false). Cache failures never fail the
+    call; errors from compute propagate."""
+    if not enabled(prompt):
+        return compute()
+
+    model = get_llm().model_id  # fake/real providers never share entries
+    answer = (answer or "").strip()
+    question_key = question_hash(question)
+    try:
+        vector = encode([answer])[0]
+        hit = lookup(prompt, vector, model, question_key)
+    except Exception as e:
+        logger.warning("Semantic cache lookup failed (%s): %s", prompt, e)
+        SEMANTIC_CACHE_LOOKUPS.labels(prompt=prompt, result="error").inc()
+        return compute()
+    if hit is not None:
+        SEMANTIC_CACHE_LOOKUPS.labels(prompt=prompt, result="hit").inc()
+        logger.debug("Semantic cache hit: %s", prompt)
+        return hit
+
+    SEMANTIC_CACHE_LOOKUPS.labels(prompt=prompt, result="miss").inc()
+    result = compute()
+    if cacheable is not None and not cacheable(result):
+        return result
+    try:
+        store(prompt, vector, model, question_key, answer, result)
+    except Exception as e:
+        logger.warning("Semantic cache write failed (%s): %s", prompt, e)
+    return result
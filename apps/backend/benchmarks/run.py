@@ -0,0 +1,164 @@
+"""
+Offline micro-benchmarks for the backend hot paths.
+
+    cd apps/backend
+    python -m benchmarks.run                              # all suites, JSON to stdout
+    python -m benchmarks.run --suites parse extract --quick
+    python -m benchmarks.run --output results.json --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.15 --fail-on-regression
+
+Suites: encode (throughput per batch size), match (match_resume_to_jobs latency
+on 1k/10k/100k synthetic jobs), ingest (ingest_jobs_from_list rows/s), extract
+(PDF/DOCX text extraction), parse (parse + clamp of LLM outputs), startup (cold
+import of app.main and warmup time, in fresh interpreters).
+
+Everything runs against a scratch SQLite database and Chroma directory filled
+with seeded synthetic data. --embedder hash swaps the sentence-transformer for a
+token-hashing encoder when the model is not available offline.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUITES = ("parse", "extract", "encode", "ingest", "match", "startup")
+
+
+def _prepare(workdir: str, embedder: str) -> str:
+    """Point the app at scratch storage. Must run before app.services is imported."""
+    os.chdir(workdir)  # chroma_data/ is relative to the working directory
+    from sqlalchemy import create_engine
+    from app.core.database import Base, SessionLocal
+    import app.models.candidate, app.models.resume, app.models.interview  # noqa: F401
+    import app.models.job, app.models.llm_cache, app.models.cohort, app.models.rate_limit  # noqa: F401
+    import app.models.idempotency  # noqa: F401
+
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    SessionLocal.configure(bind=engine)
+
+    from app.core.config import settings
+    from app.services import embeddings_service
+    if embedder == "auto":
+        try:
+            embeddings_service.get_model()
+            return settings.EMBEDDING_MODEL
+        except Exception as e:
+            print(f"embedding model unavailable ({e}); using hash encoder", file=sys.stderr)
+            embedder = "hash"
+    if embedder == "hash":
+        from benchmarks.synthetic import HashEncoder
+        embeddings_service._models[settings.EMBEDDING_MODEL] = HashEncoder()
+        return "hash"
+    embeddings_service.get_model()
+    return settings.EMBEDDING_MODEL
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _key(result: dict) -> str:
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[dict]:
+    """Attach the baseline delta to each result; return the regressions."""
+    base = {_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        ref = base.get(_key(r))
+        if not ref or not ref["value"]:
+            continue
+        change = (r["value"] - ref["value"]) / ref["value"]
+        r["baseline"] = ref["value"]
+        r["change"] = round(change, 4)
+        worse = -change if r["higher_is_better"] else change
+        if worse > tolerance:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend micro-benchmarks.")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--quick", action="store_true", help="smaller inputs, fewer repeats")
+    parser.add_argument("--match-sizes", nargs="+", type=int, default=[1_000, 10_000, 100_000])
+    parser.add_argument("--embedder", choices=["auto", "model", "hash"], default="auto")
+    parser.add_argument("--workdir", help="scratch directory (default: a new temp dir)")
+    parser.add_argument("--output", help="write the JSON report here as well")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--save-baseline", help="write this run as the new baseline")
+    args = parser.parse_args()
+
+    for path in ("output", "baseline", "save_baseline"):
+        if getattr(args, path):
+            setattr(args, path, os.path.abspath(getattr(args, path)))
+    sys.path.insert(0, BACKEND_DIR)
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="hr-bench-"))
+    os.makedirs(workdir, exist_ok=True)
+    embedder = _prepare(workdir, args.embedder)
+
+    from benchmarks import suites
+    runners = {
+        "parse": lambda: suites.bench_parse(args.quick),
+        "extract": lambda: suites.bench_extract(workdir, args.quick),
+        "encode": lambda: suites.bench_encode(args.quick),
+        "ingest": lambda: suites.bench_ingest(args.quick),
+        "match": lambda: suites.bench_match(args.quick, sizes=args.match_sizes),
+        "startup": lambda: suites.bench_startup(workdir, BACKEND_DIR, warmup=embedder != "hash", quick=args.quick),
+    }
+    results = []
+    for name in args.suites:
+        started = time.perf_counter()
+        suite_results = runners[name]()
+        for r in suite_results:
+            r["suite"] = name
+        results.extend(suite_results)
+        print(f"{name}: {len(suite_results)} results in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "embedder": embedder,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        report["regressions"] = [_key(r) for r in regressions]
+        for r in regressions:
+            print(f"REGRESSION {r['name']} {r['params']}: {r['baseline']} -> {r['value']} {r['unit']} "
+                  f"({r['change']:+.1%})", file=sys.stderr)
+
+    out = json.dumps(report, indent=2)
+    print(out)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(out + "\n")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark suites. Each returns a list of result dicts:
+    {"name", "params", "value", "unit", "higher_is_better", "samples"}
+
+App modules are imported inside the suites, after run.py has pointed the
+database and Chroma at a scratch directory.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import synthetic
+
+
+def _result(name, params, value, unit, higher_is_better, samples=None):
+    return {
+        "name": name,
+        "params": params,
+        "value": round(value, 4),
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+        "samples": samples,
+    }
+
+
+def _timings(fn, repeat: int, warmup: int = 1) -> list[float]:
+    for _ in range(warmup):
+        fn()
+    out = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - started)
+    return out
+
+
+def _p95(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+
+# ---------- encode ----------
+def bench_encode(quick: bool = False) -> list[dict]:
+    from app.services.embeddings_service import encode
+    texts = synthetic.make_texts(256 if quick else 1024, seed=1)
+    results = []
+    for batch_size in (1, 8, 32, 128):
+        if quick and batch_size == 1:
+            continue
+        runs = _timings(lambda: encode(texts, batch_size=batch_size), repeat=3)
+        results.append(_result("encode_throughput", {"batch_size": batch_size, "texts": len(texts)},
+                               len(texts) / statistics.median(runs), "texts/s", True, len(runs)))
+    return results
+
+
+# ---------- match_resume_to_jobs ----------
+def _seed_job_corpus(size: int, dim: int, chunk: int = 5000):
+    """Insert `size` canonical jobs (ids 1..size) and a Chroma collection with their vectors."""
+    from sqlalchemy import func, insert
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.models.job import JobPosting
+    from app.services.embeddings_service import get_chroma_client, update_index_state
+    from app.services.job_service import _job_metadata
+
+    db = SessionLocal()
+    try:
+        have = db.query(func.count(JobPosting.id)).scalar() or 0
+        if have < size:
+            for start in range(have, size, chunk):
+                rows = synthetic.make_jobs(min(chunk, size - start), seed=start)
+                db.execute(insert(JobPosting), rows)
+            db.commit()
+        jobs = db.query(JobPosting).order_by(JobPosting.id).limit(size).all()
+        ids = [f"job:{j.id}" for j in jobs]
+        metadatas = [_job_metadata(j) for j in jobs]
+    finally:
+        db.close()
+
+    name = f"bench_jobs_{size}"
+    col = get_chroma_client().get_or_create_collection(name=name)
+    if col.count() < size:
+        vectors = synthetic.unit_vectors(size, dim, seed=size)
+        for start in range(0, size, chunk):
+            col.add(ids=ids[start:start + chunk],
+                    embeddings=vectors[start:start + chunk].tolist(),
+                    metadatas=metadatas[start:start + chunk])
+    # point reads at this corpus
+    update_index_state("jobs", lambda state: state.update(
+        active={"model": settings.EMBEDDING_MODEL, "collection": name}))
+
+
+def bench_match(quick: bool = False, sizes=(1_000, 10_000, 100_000)) -> list[dict]:
+    from app.services.embeddings_service import encode
+    from app.services.job_service import match_resume_to_jobs
+    if quick:
+        sizes = [s for s in sizes if s <= 10_000]
+    dim = len(encode(["probe"])[0])
+    resumes = [synthetic.make_resume(seed) for seed in range(20)]
+    results = []
+    for size in sizes:
+        _seed_job_corpus(size, dim)
+        it = iter(resumes * 10)
+        runs = _timings(lambda: match_resume_to_jobs(resume_text=next(it), top_k=5),
+                        repeat=10 if quick else 30, warmup=2)
+        params = {"corpus": size, "top_k": 5}
+        results.append(_result("match_latency_p50", params, statistics.median(runs) * 1000, "ms", False, len(runs)))
+        results.append(_result("match_latency_p95", params, _p95(runs) * 1000, "ms", False, len(runs)))
+    return results
+
+
+# ---------- ingest_jobs_from_list ----------
+def bench_ingest(quick: bool = False) -> list[dict]:
+    from app.services.job_service import ingest_jobs_from_list
+    total, batch = (500, 100) if quick else (5_000, 250)
+    jobs = synthetic.make_jobs(total, seed=987_654, source="bench-ingest")
+    started = time.perf_counter()
+    for i in range(0, total, batch):
+        ingest_jobs_from_list(jobs[i:i + batch])
+    elapsed = time.perf_counter() - started
+    return [_result("ingest_rows_per_s", {"rows": total, "batch": batch}, total / elapsed, "rows/s", True, 1)]
+
+
+# ---------- resume extraction ----------
+def bench_extract(workdir: str, quick: bool = False) -> list[dict]:
+    from app.routes.resume_routes import extract_text_from_docx, extract_text_from_pdf
+    results = []
+    for pages in ((2,) if quick else (2, 10)):
+        path = os.path.join(workdir, f"resume_{pages}p.pdf")
+        synthetic.make_pdf(path, pages, seed=pages)
+        runs = _timings(lambda: extract_text_from_pdf(path), repeat=5 if quick else 20)
+        results.append(_result("extract_pdf_ms", {"pages": pages}, statistics.median(runs) * 1000, "ms", False, len(runs)))
+    for paragraphs in ((40,) if quick else (40, 200)):
+        path = os.path.join(workdir, f"resume_{paragraphs}.docx")
+        synthetic.make_docx(path, paragraphs, seed=paragraphs)
+        runs = _timings(lambda: extract_text_from_docx(path), repeat=5 if quick else 20)
+        results.append(_result("extract_docx_ms", {"paragraphs": paragraphs},
+                               statistics.median(runs) * 1000, "ms", False, len(runs)))
+    return results
+
+
+# ---------- LLM output parse + clamp ----------
+def bench_parse(quick: bool = False) -> list[dict]:
+    from app.services.interviewer_service import (
+        parse_detailed_evaluation, parse_resume_analysis, parse_simple_evaluation,
+    )
+    cases = {
+        "analyze_json": lambda: parse_resume_analysis(synthetic.LLM_OUTPUTS["analyze_json"]),
+        "analyze_loose": lambda: parse_resume_analysis(synthetic.LLM_OUTPUTS["analyze_loose"]),
+        "simple": lambda: parse_simple_evaluation(synthetic.LLM_OUTPUTS["simple"]),
+        "detailed": lambda: parse_detailed_evaluation(synthetic.LLM_OUTPUTS["detailed"]),
+    }
+    loops = 2_000 if quick else 20_000
+    results = []
+    for case, fn in cases.items():
+        def _loop():
+            for _ in range(loops):
+                fn()
+        runs = _timings(_loop, repeat=3)
+        results.append(_result("parse_ops_per_s", {"case": case}, loops / statistics.median(runs), "ops/s", True, len(runs)))
+    return results
+
+
+# ---------- startup ----------
+_STARTUP_PROBE = """
+import json, time
+started = time.perf_counter()
+import app.main
+out = {"import_ms": (time.perf_counter() - started) * 1000}
+if WARMUP:
+    from app.services.embeddings_service import warmup
+    started = time.perf_counter()
+    warmup()
+    out["warmup_ms"] = (time.perf_counter() - started) * 1000
+print(json.dumps(out))
+"""
+
+
+def bench_startup(workdir: str, backend_dir: str, warmup: bool, quick: bool = False) -> list[dict]:
+    """Cold `import app.main` (what uvicorn waits for before binding) and, with a
+    real model, the warmup behind /readyz, each in a fresh interpreter."""
+    env = {**os.environ, "PYTHONPATH": backend_dir, "WARMUP_ON_STARTUP": "false"}
+    probe = f"WARMUP = {warmup}\n{_STARTUP_PROBE}"
+    runs = []
+    for _ in range(2 if quick else 5):
+        proc = subprocess.run([sys.executable, "-c", probe], cwd=workdir, env=env,
+                              capture_output=True, text=True, check=True)
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    results = [_result("startup_import_ms", {}, statistics.median(r["import_ms"] for r in runs), "ms", False, len(runs))]
+    if warmup:
+        results.append(_result("startup_warmup_ms", {}, statistics.median(r["warmup_ms"] for r in runs),
+                               "ms", False, len(runs)))
+    return results
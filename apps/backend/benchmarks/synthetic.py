@@ -0,0 +1,126 @@
+"""Synthetic, seeded inputs for the benchmarks (no network, no real data)."""
+import json
+import random
+import zlib
+
+import numpy as np
+
+_TITLES = ["Backend Engineer", "Data Scientist", "Frontend Developer", "DevOps Engineer",
+           "Product Manager", "ML Engineer", "QA Analyst", "Site Reliability Engineer"]
+_COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+_WORDS = ("python sql react docker kubernetes aws gcp terraform kafka spark airflow fastapi django "
+          "postgres redis graphql typescript testing ci cd monitoring leadership mentoring agile "
+          "scalable distributed pipelines dashboards experimentation latency reliability security").split()
+
+
+def sentence(rng: random.Random, n: int = 14) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def make_jobs(n: int, seed: int = 0, source: str = "bench") -> list[dict]:
+    rng = random.Random(seed)
+    return [{
+        "title": rng.choice(_TITLES),
+        "company": rng.choice(_COMPANIES),
+        "location": "Remote",
+        "description": f"<p>Job {seed}-{i}.</p> " + " ".join(sentence(rng) for _ in range(12)),
+        "url": f"https://example.com/jobs/{seed}-{i}",
+        "source": source,
+        "external_id": f"{seed}-{i}",
+    } for i in range(n)]
+
+
+def make_texts(n: int, seed: int = 0, sentences: int = 6) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(sentence(rng) for _ in range(sentences)) for _ in range(n)]
+
+
+def make_resume(seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "\n".join([
+        "Jane Doe - Senior Software Engineer",
+        "Skills: " + ", ".join(rng.sample(_WORDS, 10)),
+        *[f"- {sentence(rng)}" for _ in range(15)],
+    ])
+
+
+def unit_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class HashEncoder:
+    """Deterministic stand-in for SentenceTransformer.encode (token hashing, 384-d)."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, batch_size: int = 32):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                out[row, zlib.crc32(token.encode()) % self.dim] += 1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1, norms)
+
+
+# ---------- Documents ----------
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path: str, pages: int, seed: int = 0, lines_per_page: int = 45):
+    """Minimal valid text PDF (Helvetica, one content stream per page)."""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        lines = " ".join(f"({_pdf_escape(sentence(rng, 11))}) Tj T*" for _ in range(lines_per_page))
+        stream = f"BT /F1 10 Tf 14 TL 50 760 Td {lines} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def make_docx(path: str, paragraphs: int, seed: int = 0):
+    import docx
+    rng = random.Random(seed)
+    doc = docx.Document()
+    for _ in range(paragraphs):
+        doc.add_paragraph(" ".join(sentence(rng) for _ in range(3)))
+    doc.save(path)
+
+
+# ---------- LLM outputs ----------
+LLM_OUTPUTS = {
+    "analyze_json": "Here is the evaluation:\n" + json.dumps({
+        "score": 134, "intro": "An experienced engineer with a strong delivery record.",
+        "digest": {"skills": ["Python", "SQL"] * 10, "roles": ["Engineer @ Acme"],
+                   "years_experience": "7", "highlights": ["Cut costs by 30%"]},
+    }, indent=2),
+    "analyze_loose": "Score: 82\nIntro: A pragmatic developer with broad full-stack experience.",
+    "simple": "Score (0-20): 17\nFeedback: Clear and specific, add one measurable outcome.",
+    "detailed": "```json\n" + json.dumps({
+        "clarity": 18, "coherence": "15", "confidence": 25, "technical_depth": -3,
+        "engagement": "n/a", "feedback": "Solid answer.",
+    }) + "\n```",
+}
@@ -0,0 +1,158 @@
+"""
+Load harness: drives scripted interviews against a running backend.
+
+Each virtual candidate runs the same flow as the frontend:
+    /analyze -> 5 x (/next, /score_answer, /analyze_answer_detailed) -> /summary
+
+Start the API against the local LLM stand-in so no Gemini quota is used:
+    LLM_PROVIDER=fake LLM_FAKE_LATENCY=lognormal:800,0.4 uvicorn app.main:app --workers 4
+
+Then:
+    python loadtest/interview_load.py --base-url http://localhost:8000 --interviews 200 --concurrency 20
+
+Prints a JSON report: throughput and p50/p95/p99 latency per route.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+QUESTIONS_PER_INTERVIEW = 5
+
+RESUME_TEMPLATE = """{name}
+Software Engineer, {years} years of experience.
+Skills: {skills}.
+Experience: built and operated REST APIs and data pipelines; led a team of {team} engineers;
+reduced infrastructure costs by {saving}% by consolidating services.
+Education: BSc Computer Science.
+"""
+SKILLS = ["Python", "FastAPI", "PostgreSQL", "React", "Docker", "Kubernetes", "AWS", "Kafka", "Testing"]
+ANSWERS = [
+    "In my last role I owned the billing service end to end and cut incident volume in half.",
+    "I break the problem down, write a small prototype, and validate assumptions with data first.",
+    "We disagreed on the database schema; I proposed a benchmark and we chose based on the results.",
+    "I have been improving my system design skills by leading the architecture reviews on my team.",
+    "I keep a prioritized list, communicate trade-offs early and negotiate scope when needed.",
+]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, http: requests.Session, base_url: str, route: str, payload: dict, timeout: float):
+        started = time.perf_counter()
+        ok = False
+        try:
+            res = http.post(f"{base_url}/api/interview/{route}", json=payload, timeout=timeout,
+                            headers={"X-Request-ID": uuid.uuid4().hex})
+            ok = res.status_code < 400
+            return res.json() if ok else None
+        except (requests.RequestException, ValueError):
+            return None
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.latencies[route].append(elapsed)
+                if not ok:
+                    self.errors[route] += 1
+
+
+def run_interview(idx: int, base_url: str, rec: Recorder, timeout: float, seed: int) -> bool:
+    rng = random.Random(seed + idx)
+    http = requests.Session()
+    resume = RESUME_TEMPLATE.format(
+        name=f"Load Candidate {idx}", years=rng.randint(1, 15),
+        skills=", ".join(rng.sample(SKILLS, 5)), team=rng.randint(2, 9), saving=rng.randint(5, 40),
+    )
+    analyzed = rec.call(http, base_url, "analyze", {"resume_text": resume, "candidate_name": f"Load {idx}"}, timeout)
+    if not analyzed:
+        return False
+    session_id, score = analyzed["session_id"], analyzed["score"]
+
+    last_answer, total = None, 0.0
+    for turn in range(QUESTIONS_PER_INTERVIEW):
+        nxt = rec.call(http, base_url, "next",
+                       {"session_id": session_id, "score": score, "last_answer": last_answer}, timeout)
+        if not nxt or not nxt.get("question"):
+            return False
+        question, answer = nxt["question"], ANSWERS[(idx + turn) % len(ANSWERS)]
+        scored = rec.call(http, base_url, "score_answer",
+                          {"session_id": session_id, "question": question, "answer": answer,
+                           "total_score": total}, timeout)
+        if scored:
+            total = scored.get("total_score", total)
+        rec.call(http, base_url, "analyze_answer_detailed",
+                 {"session_id": session_id, "question": question, "answer": answer}, timeout)
+        last_answer = answer
+
+    return rec.call(http, base_url, "summary", {"session_id": session_id}, timeout) is not None
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def report(rec: Recorder, elapsed: float, completed: int, total: int, concurrency: int) -> dict:
+    routes = {}
+    for route, values in sorted(rec.latencies.items()):
+        values = sorted(values)
+        routes[route] = {
+            "requests": len(values),
+            "errors": rec.errors[route],
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(_percentile(values, 0.50) * 1000, 1),
+            "p95_ms": round(_percentile(values, 0.95) * 1000, 1),
+            "p99_ms": round(_percentile(values, 0.99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1),
+        }
+    return {
+        "interviews": total,
+        "completed": completed,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "interviews_per_s": round(completed / elapsed, 3),
+        "requests_per_s": round(sum(len(v) for v in rec.latencies.values()) / elapsed, 2),
+        "routes": routes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scripted interview load test.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--interviews", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    rec = Recorder()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda i: run_interview(i, args.base_url.rstrip("/"), rec, args.timeout, args.seed),
+            range(args.interviews),
+        ))
+    result = report(rec, time.perf_counter() - started, sum(results), args.interviews, args.concurrency)
+
+    out = json.dumps(result, indent=2)
+    print(out)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(out + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import itertools
+import random
+
+from app.core.config import settings
+from app.services.dedup_service import band_buckets, minhash, shingles, similarity
+
+VOCAB = [f"word{i}" for i in range(2000)]
+
+
+def _posting(rng, words=150):
+    return " ".join(rng.choice(VOCAB) for _ in range(words))
+
+
+def _near_duplicate(rng, text, edits=2):
+    words = text.split()
+    for i in rng.sample(range(len(words)), edits):
+        words[i] = rng.choice(VOCAB)
+    return " ".join(words)
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def _sig(text):
+    return minhash(shingles("Backend Engineer", "Acme", text))
+
+
+def _is_candidate(sig_a, sig_b):
+    return bool(set(band_buckets(sig_a)) & set(band_buckets(sig_b)))
+
+
+def test_signature_estimates_jaccard():
+    rng = random.Random(1)
+    for _ in range(20):
+        a = _posting(rng)
+        b = _near_duplicate(rng, a, edits=rng.randint(1, 15))
+        true_j = _jaccard(shingles("Backend Engineer", "Acme", a), shingles("Backend Engineer", "Acme", b))
+        assert abs(similarity(_sig(a), _sig(b)) - true_j) < 0.2
+
+
+def test_lsh_recall_on_near_duplicates():
+    rng = random.Random(2)
+    found = 0
+    trials = 100
+    for _ in range(trials):
+        a = _posting(rng)
+        b = _near_duplicate(rng, a)  # Jaccard of 3-shingles around 0.9
+        sa, sb = _sig(a), _sig(b)
+        if _is_candidate(sa, sb) and similarity(sa, sb) >= settings.DEDUP_THRESHOLD:
+            found += 1
+    assert found / trials >= 0.95
+
+
+def test_lsh_precision_on_unrelated_postings():
+    rng = random.Random(3)
+    sigs = [_sig(_posting(rng)) for _ in range(60)]
+    pairs = list(itertools.combinations(sigs, 2))
+    candidates = [(a, b) for a, b in pairs if _is_candidate(a, b)]
+    assert len(candidates) / len(pairs) < 0.01
+    assert not any(similarity(a, b) >= settings.DEDUP_THRESHOLD for a, b in candidates)
+
+
+def test_signature_is_stable_and_normalized():
+    text = "<p>Build APIs &amp; data pipelines in Python.</p>"
+    assert _sig(text) == _sig(text)
+    assert shingles("T", None, text) == shingles("t", None, "build apis data pipelines in python")
+    assert len(band_buckets(_sig(text))) == settings.DEDUP_BANDS
+
+
+def test_empty_text_never_matches_real_postings():
+    rng = random.Random(4)
+    assert similarity(minhash(set()), _sig(_posting(rng))) == 0.0
@@ -0,0 +1,174 @@
+import threading
+
+import pytest
+
+from app.services import llm_breaker
+from app.services.llm_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LLMUnavailable
+from app.services.llm_limiter import LLMRateLimited
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_breaker.time, "monotonic", clock)
+    return clock
+
+
+def _breaker(**overrides):
+    params = dict(window=10, min_calls=4, failure_rate=0.5, slow_seconds=2.0, open_seconds=30)
+    params.update(overrides)
+    return CircuitBreaker(**params)
+
+
+def _fail():
+    raise RuntimeError("upstream error")
+
+
+def _trip(breaker):
+    for _ in range(4):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+
+
+def test_opens_when_failure_rate_reached(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+    assert breaker.state == CLOSED  # below min_calls
+
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    assert breaker.state == OPEN
+    with pytest.raises(LLMUnavailable):
+        breaker.call(lambda: "never called")
+
+
+def test_stays_closed_below_failure_rate(clock):
+    breaker = _breaker()
+    for i in range(10):
+        if i % 3 == 2:
+            with pytest.raises(RuntimeError):
+                breaker.call(_fail)
+        else:
+            breaker.call(lambda: "ok")
+    assert breaker.state == CLOSED
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = _breaker()
+    for _ in range(4):
+        breaker.before_call()
+        breaker.after_call(True, seconds=2.5)  # succeeded, but slower than slow_seconds
+    assert breaker.state == OPEN
+
+
+def test_calls_at_the_slow_limit_are_fine(clock):
+    breaker = _breaker()
+    for _ in range(10):
+        breaker.before_call()
+        breaker.after_call(True, seconds=2.0)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = _breaker()
+    _trip(breaker)
+
+    clock.now += 29
+    with pytest.raises(LLMUnavailable):
+        breaker.call(lambda: "too early")
+
+    clock.now += 1
+    probe_started, release_probe = threading.Event(), threading.Event()
+
+    def slow_probe():
+        probe_started.set()
+        release_probe.wait(2)
+        return "ok"
+
+    result = []
+    thread = threading.Thread(target=lambda: result.append(breaker.call(slow_probe)))
+    thread.start()
+    assert probe_started.wait(2)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(LLMUnavailable):  # a single probe at a time
+        breaker.call(lambda: "second caller")
+
+    release_probe.set()
+    thread.join(2)
+    assert result == ["ok"]
+    assert breaker.state == CLOSED
+    assert breaker.call(lambda: "ok") == "ok"
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock.now += 30
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    assert breaker.state == OPEN
+
+    clock.now += 29
+    with pytest.raises(LLMUnavailable):
+        breaker.call(lambda: "open again for a full period")
+
+
+def test_slow_probe_reopens(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock.now += 30
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    breaker.after_call(True, seconds=5.0)
+    assert breaker.state == OPEN
+
+
+def test_rate_limited_probe_is_not_an_outcome(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock.now += 30
+
+    def rejected():
+        raise LLMRateLimited(5)
+
+    with pytest.raises(LLMRateLimited):
+        breaker.call(rejected)
+    assert breaker.state == HALF_OPEN
+    assert breaker.call(lambda: "ok") == "ok"  # the probe slot was released
+    assert breaker.state == CLOSED
+
+
+def test_close_listeners_run(clock):
+    breaker = _breaker()
+    closed = threading.Event()
+    breaker.on_close(closed.set)
+    _trip(breaker)
+    clock.now += 30
+    breaker.call(lambda: "ok")
+    assert closed.wait(2)
+
+
+def test_window_forgets_old_outcomes(clock):
+    breaker = _breaker(window=4)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+    breaker.call(lambda: "ok")
+    assert breaker.state == OPEN  # 3 of 4 bad
+
+    breaker = _breaker(window=4)
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    for _ in range(4):
+        breaker.call(lambda: "ok")
+    assert breaker.state == CLOSED  # the failure slid out of the window
@@ -0,0 +1,178 @@
+import threading
+import time
+
+import pytest
+
+from app.services import llm_limiter
+from app.services.llm_limiter import (
+    ANALYSIS, BATCH, LIVE, Admission, LLMRateLimited, MemoryBuckets, batch_priority, priority_for,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_limiter.time, "monotonic", clock)
+    return clock
+
+
+# ---------- Buckets ----------
+def test_bucket_starts_full_and_refills_continuously(clock):
+    buckets = MemoryBuckets({"requests": 60})  # one per second
+    for _ in range(60):
+        assert buckets.try_take({"requests": 1}) == 0
+    assert buckets.try_take({"requests": 1}) == pytest.approx(1.0)
+
+    clock.now += 0.5
+    assert buckets.try_take({"requests": 1}) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert buckets.try_take({"requests": 1}) == 0
+
+
+def test_bucket_never_exceeds_capacity(clock):
+    buckets = MemoryBuckets({"requests": 60})
+    clock.now += 3600
+    for _ in range(60):
+        assert buckets.try_take({"requests": 1}) == 0
+    assert buckets.try_take({"requests": 1}) > 0
+
+
+def test_take_is_all_or_nothing(clock):
+    buckets = MemoryBuckets({"requests": 60, "tokens": 1000})
+    assert buckets.try_take({"requests": 1, "tokens": 1000}) == 0
+    # tokens are short: the request slot must not be consumed either
+    assert buckets.try_take({"requests": 1, "tokens": 500}) == pytest.approx(30.0)
+    assert buckets._state["requests"][0] == pytest.approx(59)
+
+
+def test_disabled_limit_and_oversized_cost(clock):
+    buckets = MemoryBuckets({"requests": 0, "tokens": 100})
+    assert "requests" not in buckets.limits
+    # a call larger than a whole minute of budget waits for a full bucket, not forever
+    assert buckets.try_take({"tokens": 10_000}) == 0
+
+
+def test_adjust_charges_and_refunds(clock):
+    buckets = MemoryBuckets({"tokens": 1000})
+    assert buckets.try_take({"tokens": 400}) == 0
+    buckets.adjust("tokens", 300)    # real usage was higher than estimated
+    assert buckets._state["tokens"][0] == pytest.approx(300)
+    buckets.adjust("tokens", -5000)  # refunds are capped at capacity
+    assert buckets._state["tokens"][0] == pytest.approx(1000)
+
+
+# ---------- Priority queue ----------
+class GateBuckets:
+    """Admits one call per release(); otherwise asks to retry shortly."""
+
+    def __init__(self):
+        self.permits = 0
+        self.lock = threading.Lock()
+
+    def release(self):
+        with self.lock:
+            self.permits += 1
+
+    def try_take(self, costs):
+        with self.lock:
+            if self.permits:
+                self.permits -= 1
+                return 0.0
+        return 0.01
+
+    def adjust(self, name, delta):
+        pass
+
+
+def _queued(admission):
+    with admission._cond:
+        return len(admission._queue)
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _start(admission, priority, name, admitted, errors):
+    def run():
+        try:
+            admission.acquire(priority, 10)
+            admitted.append(name)
+        except LLMRateLimited:
+            errors.append(name)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_queue_admits_by_priority_then_arrival():
+    buckets = GateBuckets()
+    admission = Admission(buckets, max_queue=10, max_wait={LIVE: 5, ANALYSIS: 5, BATCH: 5})
+    admitted, errors, threads = [], [], []
+    for priority, name in [(BATCH, "batch-1"), (ANALYSIS, "analysis"), (BATCH, "batch-2"),
+                           (LIVE, "live-1"), (LIVE, "live-2")]:
+        threads.append(_start(admission, priority, name, admitted, errors))
+        _wait_until(lambda n=len(threads): _queued(admission) == n)
+
+    for expected in range(1, 6):
+        buckets.release()
+        _wait_until(lambda: len(admitted) == expected)
+    for thread in threads:
+        thread.join(2)
+    assert admitted == ["live-1", "live-2", "analysis", "batch-1", "batch-2"]
+    assert not errors
+
+
+def test_full_queue_displaces_least_urgent_waiter():
+    buckets = GateBuckets()
+    admission = Admission(buckets, max_queue=2, max_wait={LIVE: 5, ANALYSIS: 5, BATCH: 5})
+    admitted, errors = [], []
+    _start(admission, BATCH, "batch", admitted, errors)
+    _start(admission, ANALYSIS, "analysis", admitted, errors)
+    _wait_until(lambda: _queued(admission) == 2)
+
+    _start(admission, LIVE, "live", admitted, errors)
+    _wait_until(lambda: errors == ["batch"])
+
+    # an equally or less urgent newcomer is turned away instead
+    _start(admission, BATCH, "late-batch", admitted, errors)
+    _wait_until(lambda: errors == ["batch", "late-batch"])
+
+    buckets.release()
+    buckets.release()
+    _wait_until(lambda: len(admitted) == 2)
+    assert admitted == ["live", "analysis"]
+
+
+def test_waiter_rejected_when_wait_exceeds_budget():
+    buckets = MemoryBuckets({"requests": 60})
+    buckets.try_take({"requests": 60})
+    admission = Admission(buckets, max_queue=10, max_wait={LIVE: 0.2, ANALYSIS: 0.2, BATCH: 0.2})
+    started = time.monotonic()
+    with pytest.raises(LLMRateLimited) as exc:
+        admission.acquire(LIVE, 1)
+    assert time.monotonic() - started < 0.5  # fails fast instead of sleeping a full second
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
+    assert admission._queue == []
+
+
+def test_priority_from_prompt_type_and_batch_override():
+    assert priority_for("next") == LIVE
+    assert priority_for("summary") == ANALYSIS
+    assert priority_for("unknown") == ANALYSIS
+    assert priority_for("batch_score") == BATCH
+    with batch_priority():
+        assert priority_for("evaluate") == BATCH
+    assert priority_for("evaluate") == LIVE
@@ -0,0 +1,76 @@
+import bisect
+import random
+
+import pytest
+
+from app.services.quantile_sketch import KLLSketch
+
+N = 100_000
+# KLL rank error is ~O(1/k); 2.5/k leaves room for the randomized compaction
+MAX_RANK_ERROR = 2.5 / 200
+
+
+def _exact_rank(sorted_values, value):
+    return bisect.bisect_right(sorted_values, value) / len(sorted_values)
+
+
+@pytest.fixture(autouse=True)
+def _seed():
+    random.seed(42)
+
+
+@pytest.mark.parametrize("draw", [
+    lambda rng: rng.uniform(0, 20),
+    lambda rng: rng.gauss(12, 3),
+    lambda rng: rng.lognormvariate(1, 0.8),
+], ids=["uniform", "normal", "lognormal"])
+def test_rank_error_within_bound(draw):
+    rng = random.Random(7)
+    values = [draw(rng) for _ in range(N)]
+    sketch = KLLSketch(k=200)
+    for v in values:
+        sketch.update(v)
+
+    exact = sorted(values)
+    for q in (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99):
+        probe = exact[int(q * N)]
+        assert abs(sketch.rank(probe) - _exact_rank(exact, probe)) <= MAX_RANK_ERROR
+        assert abs(_exact_rank(exact, sketch.quantile(q)) - q) <= MAX_RANK_ERROR
+
+
+def test_sketch_stays_small():
+    sketch = KLLSketch(k=200)
+    for i in range(N):
+        sketch.update(i)
+    assert sketch.n == N
+    assert sum(len(c) for c in sketch.compactors) < 3 * 200 + 50
+
+
+def test_merge_matches_single_stream():
+    rng = random.Random(3)
+    values = [rng.uniform(0, 100) for _ in range(N)]
+    left, right = KLLSketch(k=200), KLLSketch(k=200)
+    for i, v in enumerate(values):
+        (left if i % 2 else right).update(v)
+    left.merge(right)
+
+    exact = sorted(values)
+    assert left.n == N
+    for probe in (10, 50, 90):
+        assert abs(left.rank(probe) - _exact_rank(exact, probe)) <= MAX_RANK_ERROR
+
+
+def test_json_round_trip():
+    sketch = KLLSketch(k=50)
+    for i in range(5_000):
+        sketch.update(i % 97)
+    restored = KLLSketch.from_json(sketch.to_json())
+    assert restored.n == sketch.n
+    assert restored.rank(40) == sketch.rank(40)
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+
+def test_empty_sketch():
+    sketch = KLLSketch()
+    assert sketch.rank(1.0) == 0.0
+    assert sketch.quantile(0.5) is None
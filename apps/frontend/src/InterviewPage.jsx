@@ -80,7 +80,6 @@ export default function InterviewPage() {
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
           session_id: sessionId,
-          resume_text: resumeText,
           score,
           last_answer: lastAnswer,
         }),
@@ -125,7 +124,7 @@ export default function InterviewPage() {
       const res = await fetch("/api/interview/summary", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ resume_text: resumeText, score, conversation }),
+        body: JSON.stringify({ session_id: sessionId }),
       });
       const data = await res.json();
       if (!res.ok) throw new Error(data?.detail || "Failed to summarize interview");
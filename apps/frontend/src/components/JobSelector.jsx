@@ -8,7 +8,7 @@ export default function JobSelector({ onSelect }) {
   const loadJobs = async () => {
     setLoading(true);
     try {
-      const res = await fetch("/api/jobs");
+      const res = await fetch("/api/jobs?fields=title,company,location,url,description");
       const data = await res.json();
       setJobs(data.jobs || []);
     } catch (err) {